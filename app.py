@@ -6,31 +6,83 @@ Provides a clean, automatic learning experience with no visible session manageme
 
 import os
 import json
-import difflib
-import shutil
+import asyncio
 import base64
 import random
 import uuid
+import sqlite3
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from tempfile import NamedTemporaryFile
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Callable, Tuple
 
 
 # Third-party imports
 from dotenv import load_dotenv
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Depends, Query
 from fastapi.responses import HTMLResponse
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from openai import OpenAI
 from pinecone import Pinecone
 import uvicorn
 from utils import readaloud, mood
+from utils.llm import LLMGateway
+from utils.llm_cache import ResponseCache
+from utils.sse import sse_event, sse_response
+from utils.audio import AudioUploadLimit, transcription_file
+from utils.audio_probe import probe_duration
+from utils.readaloud import OpenAIBackend, reading_metrics
+from utils.embedding_store import EmbeddingStore
+from utils.story_queue import StoryPrefetcher
+from utils.snapshot_sink import SnapshotSink
+from utils.session_store import open_session_store
+from utils.learner_state import LearnerState, is_valid_learner_id
+from utils.snapshot_stats import SnapshotRing, SnapshotStats
+from utils.snapshot_archive import SnapshotArchive
 
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI client
+# Initialize OpenAI clients. The sync client is only used for one-off startup
+# work; request handlers go through the async gateway so they never block the
+# event loop. Repeated prompts can be answered from a response cache that
+# persists across restarts (set LLM_CACHE_PATH="" to keep it in memory only),
+# and texts that were embedded before are looked up in a local vector store.
+# Recordings are remembered in memory by a hash of their bytes, so a retried
+# or duplicate upload is not sent to Whisper again.
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+embedding_store = EmbeddingStore(
+    os.getenv("EMBEDDING_CACHE_DIR", "embedding_cache"),
+    capacity=int(os.getenv("EMBEDDING_CACHE_ROWS", "10000")),
+)
+llm = LLMGateway(
+    cache=ResponseCache(os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3") or None),
+    embeddings=embedding_store,
+    transcripts=ResponseCache(max_entries=int(os.getenv("TRANSCRIPTION_CACHE_ENTRIES", "256"))),
+)
+
+# Per-call-site cache lifetimes in seconds. Call sites not listed here
+# (stories, idea sparks, pitch feedback, mood checks) always get a fresh
+# completion so kids keep seeing variety. Transcriptions and pitch scores
+# only need to outlive the frontend's retries of the same recording.
+LLM_CACHE_TTLS = {
+    "challenge_story": 7 * 24 * 3600,
+    "badge_svg": 30 * 24 * 3600,
+    "shark_questions": 24 * 3600,
+    "transcription": float(os.getenv("TRANSCRIPTION_CACHE_TTL", "3600")),
+    "pitch_score": 3600,
+}
+
+# Completions the caller cannot use are not cached, or the fallback would be
+# served for the whole TTL
+def is_json(text: str) -> bool:
+    try:
+        json.loads(text)
+    except json.JSONDecodeError:
+        return False
+    return True
+
+def has_svg(text: str) -> bool:
+    return '<svg' in text and '</svg>' in text
 
 # Initialize Pinecone
 pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
@@ -40,6 +92,7 @@ OPENAI_TTS_MODEL = os.getenv("OPENAI_TTS_MODEL", "tts-1")
 OPENAI_STT_MODEL = os.getenv("OPENAI_STT_MODEL", "whisper-1")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
 PINECONE_ENVIRONMENT = os.getenv("PINECONE_ENVIRONMENT", "us-east1")
+reading_stt = OpenAIBackend(llm, OPENAI_STT_MODEL, cache_ttl=LLM_CACHE_TTLS["transcription"])
 
 # =============================================================================
 # PYDANTIC MODELS
@@ -106,11 +159,24 @@ class LearnerProfile(BaseModel):
     adhd: bool = True
     modality: ModalityWeights = ModalityWeights()
     motivation_token: str = "new_comic_issue"
-    snapshots: List[LearnerSnapshot] = []
+    snapshots: SnapshotRing = Field(default_factory=SnapshotRing)  # last SNAPSHOT_HISTORY only
+    snapshot_stats: SnapshotStats = Field(default_factory=SnapshotStats)
     preferred_topics: List[str] = []
     badges: List[Badge] = []
     hackathon_sessions: List[HackathonSession] = []
 
+    @model_validator(mode="after")
+    def _backfill_stats(self):
+        # Profiles saved before snapshot_stats existed only have the history
+        if not self.snapshot_stats.count and len(self.snapshots):
+            self.snapshot_stats = SnapshotStats.rebuild(self.snapshots)
+        return self
+
+    def record_snapshot(self, snapshot: LearnerSnapshot) -> None:
+        """Keep the snapshot in the bounded history and update the aggregates."""
+        self.snapshots.append(snapshot)
+        self.snapshot_stats.add(snapshot)
+
 class SessionData(BaseModel):
     session_id: str
     thread_id: str
@@ -126,12 +192,42 @@ class SessionData(BaseModel):
 # GLOBAL STATE
 # =============================================================================
 
-# Global session storage and user profile
-active_sessions: Dict[str, SessionData] = {}
-current_session_id: Optional[str] = None  # Track the active session
-current_hackathon_session: Optional[str] = None  # Track active hackathon
-hackathon_sessions: Dict[str, HackathonSession] = {}
-profile = LearnerProfile()
+# Sessions, hackathons and profiles live in a session store (SQLite by
+# default, see SESSION_STORE) so every worker sees the same state and it
+# survives restarts. Everything is keyed by learner id; values are copies,
+# so write them back after changes.
+session_store = open_session_store()
+# Only seeds the startup banner and the Assistant's instructions; requests
+# without a learner id get a guest id of their own (see remember_learner)
+DEFAULT_LEARNER_ID = "karl"
+LEARNER_HEADER = "X-Learner-Id"
+LEARNER_COOKIE = "learner_id"
+
+def new_learner_profile(learner_id: str) -> LearnerProfile:
+    return LearnerProfile(name=learner_id.replace('_', ' ').replace('-', ' ').title())
+
+learners = LearnerState(session_store, new_learner_profile, LearnerProfile, SessionData, HackathonSession)
+
+# Every snapshot is also appended to the learner's columnar archive, which
+# answers time-window queries (trends, weekly reports) without Pinecone.
+snapshot_archive = SnapshotArchive(os.getenv("SNAPSHOT_ARCHIVE_DIR", "snapshot_archive"))
+
+def requested_learner(request: Request) -> Optional[str]:
+    """The learner id the client sent: X-Learner-Id header, ?learner_id= or cookie."""
+    return (
+        request.headers.get(LEARNER_HEADER)
+        or request.query_params.get(LEARNER_COOKIE)
+        or request.cookies.get(LEARNER_COOKIE)
+    )
+
+def current_learner(request: Request) -> str:
+    """Resolve the learner, or the guest id given to a client that sent none."""
+    learner_id = requested_learner(request) or getattr(request.state, "learner_id", None)
+    if learner_id is None:
+        raise HTTPException(status_code=400, detail="Missing learner id")
+    if not is_valid_learner_id(learner_id):
+        raise HTTPException(status_code=400, detail="Invalid learner id")
+    return learner_id
 
 # Learning topics pool
 LEARNING_TOPICS = [
@@ -160,13 +256,9 @@ CHALLENGE_CARDS = [
 # UTILITY FUNCTIONS
 # =============================================================================
 
-def embed_text(text: str) -> List[float]:
-    """Create text embeddings using OpenAI's embedding model."""
-    response = client.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=text
-    )
-    return response.data[0].embedding
+async def embed_texts(texts: List[str]) -> List[List[float]]:
+    """Create text embeddings for a batch of texts in one request."""
+    return await llm.embed(texts, model=EMBEDDING_MODEL)
 
 def get_random_topics() -> List[str]:
     """Get 4 random learning topics for user selection."""
@@ -183,7 +275,7 @@ def assess_reading_level(wpm: int, accuracy: float) -> str:
     else:
         return "1st_grade"
 
-def generate_challenge_story(topic: str, challenge: str) -> str:
+async def generate_challenge_story(topic: str, challenge: str) -> str:
     """Generate a challenge story using the template."""
     stakeholders = {
         "Food Waste Detective": "families and schools",
@@ -218,17 +310,12 @@ Could an AI that can {ai_power} solve it?"
 Make it exciting and age-appropriate for 9-10 year olds. Focus on how {topic} connects to the {challenge} challenge."""
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=100
-        )
-        return response.choices[0].message.content.strip()
+        return await llm.chat(prompt, max_tokens=100, cache_ttl=LLM_CACHE_TTLS["challenge_story"])
     except Exception:
         return f"While exploring {topic.lower()}, {stakeholder} struggle with important challenges. Could an AI that can {ai_power} help solve it?"
 
-def generate_story_for_topic(topic: str, reading_level: str, current_wpm: int) -> dict:
-    """Generate a custom story based on topic and reading level."""
+def build_story_prompt(topic: str, reading_level: str) -> str:
+    """Build the story-writing prompt for a topic and reading level."""
     
     # Define reading level parameters 
     level_params = {
@@ -240,7 +327,7 @@ def generate_story_for_topic(topic: str, reading_level: str, current_wpm: int) -
     
     params = level_params.get(reading_level, level_params["2nd_grade"])
     
-    prompt = f"""Create a fun, engaging short story about {topic} for a {reading_level.replace('_', ' ')} reader.
+    return f"""Create a fun, engaging short story about {topic} for a {reading_level.replace('_', ' ')} reader.
 
 Requirements:
 - {params['words']} words total
@@ -252,33 +339,38 @@ Requirements:
 
 Return ONLY the story text, no title or extra formatting."""
 
+def story_metadata(topic: str, reading_level: str, current_wpm: int) -> dict:
+    """Everything about a generated story except its text."""
+    return {
+        "id": f"story_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}",
+        "title": f"{topic} Adventure",
+        "topic": topic,
+        "reading_level": reading_level,
+        "target_wpm": current_wpm + 5  # Slight challenge increase
+    }
+
+def fallback_story(topic: str, reading_level: str, current_wpm: int) -> dict:
+    """Story used when the model is unavailable."""
+    return {
+        "id": "fallback_story",
+        "title": "Adventure Story",
+        "topic": topic,
+        "reading_level": reading_level,
+        "text": "There once was a brave explorer who discovered amazing things. They faced challenges with courage and learned something new every day. The adventure taught them that learning can be the greatest treasure of all.",
+        "target_wpm": current_wpm
+    }
+
+async def generate_story_for_topic(topic: str, reading_level: str, current_wpm: int) -> dict:
+    """Generate a custom story based on topic and reading level."""
+    prompt = build_story_prompt(topic, reading_level)
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        story_text = response.choices[0].message.content.strip()
-        
-        return {
-            "id": f"story_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}",
-            "title": f"{topic} Adventure",
-            "topic": topic,
-            "reading_level": reading_level,
-            "text": story_text,
-            "target_wpm": current_wpm + 5  # Slight challenge increase
-        }
+        story_text = await llm.chat(prompt)
+        return {**story_metadata(topic, reading_level, current_wpm), "text": story_text}
     except Exception:
-        # Fallback story
-        return {
-            "id": "fallback_story",
-            "title": "Adventure Story",
-            "topic": topic,
-            "reading_level": reading_level,
-            "text": "There once was a brave explorer who discovered amazing things. They faced challenges with courage and learned something new every day. The adventure taught them that learning can be the greatest treasure of all.",
-            "target_wpm": current_wpm
-        }
+        return fallback_story(topic, reading_level, current_wpm)
 
-def generate_badge_svg(challenge: str, topic: str) -> str:
+async def generate_badge_svg(challenge: str, topic: str) -> str:
     """Generate an SVG badge using GPT-4o."""
     prompt = f"""Create a simple, colorful SVG badge for a kid who completed the "{challenge}" mini-hackathon about {topic}.
 
@@ -292,12 +384,9 @@ Requirements:
 Return ONLY the SVG code, no explanations."""
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=500
+        svg_code = await llm.chat(
+            prompt, max_tokens=500, cache_ttl=LLM_CACHE_TTLS["badge_svg"], cacheable=has_svg
         )
-        svg_code = response.choices[0].message.content.strip()
         
         # Clean up the response to extract just the SVG
         if '<svg' in svg_code and '</svg>' in svg_code:
@@ -322,103 +411,84 @@ Return ONLY the SVG code, no explanations."""
 
 
 
+async def completion_events(
+    prompt: Optional[str],
+    fallback: str,
+    done: Callable[[str], dict],
+    **params
+) -> AsyncIterator[str]:
+    """Yield a ``delta`` event per streamed chunk, then one ``done`` event.
+
+    ``done`` turns the full text into the final payload, which matches the
+    non-streaming endpoint's response body. If the stream fails partway, an
+    ``error`` event tells the client to drop the partial text and ``done``
+    carries ``fallback``, as the non-streaming endpoint would return.
+    Without a ``prompt`` only the fallback is sent.
+    """
+    text = ""
+    try:
+        if prompt is not None:
+            async for piece in llm.stream_chat(prompt, **params):
+                text += piece
+                yield sse_event("delta", {"text": piece})
+    except Exception as e:
+        print(f"⚠️ Streaming completion failed: {e}")
+        if text:
+            yield sse_event("error", {"detail": "completion interrupted"})
+            yield sse_event("done", done(fallback))
+            return
+    if not text.strip():
+        text = fallback
+        yield sse_event("delta", {"text": fallback})
+    yield sse_event("done", done(text.strip()))
+
+
+async def transcribe_upload(upload: UploadFile, **params) -> str:
+    """Transcribe an uploaded recording straight from the request's spool."""
+    return await llm.transcribe(
+        transcription_file(upload),
+        model=OPENAI_STT_MODEL,
+        cache_ttl=LLM_CACHE_TTLS["transcription"],
+        language="en",  # Specify English for better accuracy
+        **params
+    )
+
+async def transcribe_reading(upload: UploadFile) -> Tuple[str, List[Dict[str, Any]]]:
+    """Transcribe a read-aloud, with word timestamps when the model has them."""
+    return await reading_stt.transcribe(upload)
+
 #part 2
-def score_reading(uploaded_file, passage_text: str) -> dict:
+async def score_reading(uploaded_file, passage_text: str) -> dict:
     """Score read-aloud performance using Whisper transcription."""
     target = passage_text.strip()
     
-    tmp = NamedTemporaryFile(delete=False, suffix=".webm")
-    try:
-        uploaded_file.file.seek(0)
-        shutil.copyfileobj(uploaded_file.file, tmp)
-        tmp.flush()
-        
-        # Get audio file duration for accurate WPM calculation
-        with open(tmp.name, "rb") as audio_fp:
-            # Record start time for processing duration (not reading duration)
-            process_start = datetime.now(timezone.utc)
-            
-            resp = client.audio.transcriptions.create(
-                file=audio_fp,
-                model=OPENAI_STT_MODEL,
-                language="en",  # Specify English for better accuracy
-                temperature=0.0  # More deterministic transcription
-            )
-            transcription = resp.text.strip()
-            
-            process_duration = (datetime.now(timezone.utc) - process_start).total_seconds()
-            print(f"🕒 Processing took {process_duration:.2f}s")
-        
-        print(f"🎤 Transcription: '{transcription}'")
-        print(f"🎯 Target text: '{target}'")
-        
-        # Calculate reading duration based on typical speaking pace
-        # Average speaking pace is 125-150 WPM, we'll estimate based on word count
-        target_words = target.split()
-        transcribed_words = transcription.split()
-        
-        # Estimate reading duration (assume normal speaking pace of 120-140 WPM)
-        estimated_duration = len(target_words) / 130 * 60  # 130 WPM average, convert to seconds
-        
-        # Use a minimum duration to prevent artificially high WPM
-        min_duration = max(len(target_words) * 0.3, 5.0)  # At least 0.3 seconds per word, minimum 5 seconds
-        reading_duration = max(estimated_duration, min_duration)
-        
-        print(f"📊 Estimated reading duration: {reading_duration:.1f} seconds")
-        
-        # Calculate WPM based on actual words read (transcribed words)
-        wpm = int((len(transcribed_words) / reading_duration) * 60) if reading_duration > 0 else 0
-        
-        # Improved accuracy calculation using sequence matching
-        target_words_lower = [word.lower().strip('.,!?;:"()') for word in target_words]
-        transcribed_words_lower = [word.lower().strip('.,!?;:"()') for word in transcribed_words]
-        
-        # Use difflib for better word matching
-        matcher = difflib.SequenceMatcher(None, target_words_lower, transcribed_words_lower)
-        similarity = matcher.ratio()
-        
-        # Alternative accuracy: count exact word matches
-        correct_words = 0
-        min_length = min(len(target_words_lower), len(transcribed_words_lower))
-        
-        for i in range(min_length):
-            if i < len(target_words_lower) and i < len(transcribed_words_lower):
-                if target_words_lower[i] == transcribed_words_lower[i]:
-                    correct_words += 1
-        
-        # Use the higher of the two accuracy measures
-        position_accuracy = correct_words / len(target_words_lower) if target_words_lower else 0
-        accuracy = max(similarity, position_accuracy)
-        
-        # Cap WPM at reasonable maximum (200 WPM is very fast reading aloud)
-        wpm = min(wpm, 200)
-        
-        print(f"📈 Final metrics: {wpm} WPM, {accuracy:.1%} accuracy")
-        
-        return {
-            "transcription": transcription,
-            "words_per_minute": wpm,
-            "words_correct": correct_words,
-            "words_total": len(target_words),
-            "accuracy": round(accuracy, 3),
-            "similarity_score": round(similarity, 3),
-            "reading_duration": round(reading_duration, 1)
-        }
+    # Record start time for processing duration (not reading duration)
+    process_start = datetime.now(timezone.utc)
+    transcription, timed_words = await transcribe_reading(uploaded_file)
+    process_duration = (datetime.now(timezone.utc) - process_start).total_seconds()
+    print(f"🕒 Processing took {process_duration:.2f}s")
+    
+    print(f"🎤 Transcription: '{transcription}'")
+    print(f"🎯 Target text: '{target}'")
+    
+    # Real speaking time from word timestamps, else the recording's length
+    # from its container headers, else an estimate from the passage
+    metrics = reading_metrics(target, transcription, timed_words, probe_duration(uploaded_file.file))
     
-    finally:
-        tmp.close()
-        os.unlink(tmp.name)
+    print(f"📊 Reading duration ({metrics['duration_source']}): {metrics['reading_duration']:.1f} seconds")
+    print(f"📈 Final metrics: {metrics['words_per_minute']} WPM, {metrics['accuracy']:.1%} accuracy")
+    
+    return metrics
 
-def assess_mood_from_image(image_file) -> float:
+async def assess_mood_from_image(image_file) -> float:
     """Analyze facial expression using OpenAI Vision API."""
     try:
         image_file.file.seek(0)
         image_data = image_file.file.read()
         base64_image = base64.b64encode(image_data).decode('utf-8')
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        mood_text = await llm.chat(
+            [
                 {
                     "role": "user",
                     "content": [
@@ -446,7 +516,6 @@ def assess_mood_from_image(image_file) -> float:
             max_tokens=10
         )
         
-        mood_text = response.choices[0].message.content.strip()
         try:
             mood_score = float(mood_text)
             return max(-1.0, min(1.0, mood_score))
@@ -457,24 +526,10 @@ def assess_mood_from_image(image_file) -> float:
         print(f"Mood assessment error: {e}")
         return 0.0
 
-def score_pitch_audio(audio_file, challenge: str) -> Dict[str, Any]:
+async def score_pitch_audio(audio_file, challenge: str) -> Dict[str, Any]:
     """Score pitch audio and return metrics."""
     try:
-        # Transcribe audio
-        tmp = NamedTemporaryFile(delete=False, suffix=".webm")
-        audio_file.file.seek(0)
-        shutil.copyfileobj(audio_file.file, tmp)
-        tmp.flush()
-        
-        with open(tmp.name, "rb") as audio_fp:
-            resp = client.audio.transcriptions.create(
-                file=audio_fp,
-                model=OPENAI_STT_MODEL,
-                language="en"
-            )
-            transcription = resp.text.strip()
-        
-        os.unlink(tmp.name)
+        transcription = await transcribe_upload(audio_file)
         
         # Score the pitch
         prompt = f"""Score this kid's pitch for their "{challenge}" AI project. The transcription is: "{transcription}"
@@ -492,14 +547,12 @@ Return a JSON response with scores and brief kid-friendly feedback:
   "feedback": "Great job explaining your idea! Your solution is very creative..."
 }}"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=200
+        content = await llm.chat(
+            prompt, max_tokens=200, cache_ttl=LLM_CACHE_TTLS["pitch_score"], cacheable=is_json
         )
         
         try:
-            scores = json.loads(response.choices[0].message.content)
+            scores = json.loads(content)
             scores["transcription"] = transcription
             return scores
         except json.JSONDecodeError:
@@ -511,6 +564,8 @@ Return a JSON response with scores and brief kid-friendly feedback:
                 "transcription": transcription
             }
             
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Pitch scoring error: {e}")
         return {
@@ -521,45 +576,103 @@ Return a JSON response with scores and brief kid-friendly feedback:
             "transcription": "Could not transcribe audio"
         }
 
-def store_snapshot_in_pinecone(snapshot: LearnerSnapshot, profile_name: str = "Karl") -> bool:
-    """Store learning snapshot in Pinecone."""
+# Snapshots are embedded and upserted in batches by a background worker that
+# reuses one index handle and spools to disk while Pinecone is unreachable.
+snapshot_sink = SnapshotSink(
+    lambda: pc.Index("karl-profile"),
+    embed_texts,
+    spool_path=os.getenv("SNAPSHOT_SPOOL_PATH", "snapshot_spool.jsonl"),
+)
+
+def store_snapshot_in_pinecone(snapshot: LearnerSnapshot, learner_id: str = DEFAULT_LEARNER_ID,
+                               profile_name: str = "Karl") -> bool:
+    """Queue a learning snapshot for storage in Pinecone."""
     try:
-        index = pc.Index("karl-profile")
-        
+        # The timestamp lives in the metadata only, so repeated activities
+        # produce identical text and reuse a cached embedding.
         snapshot_text = f"""
         Learner: {profile_name}
         Activity: {snapshot.activity_id}
         Topic: {snapshot.topic or 'General'}
-        Timestamp: {snapshot.timestamp.isoformat()}
         WPM: {snapshot.wpm if snapshot.wpm else 'N/A'}
         Mood Score: {snapshot.mood_score if snapshot.mood_score else 'N/A'}
         Reading Level: {snapshot.reading_level}
         """
         
-        embedding = embed_text(snapshot_text)
+        metadata = {
+            "text": snapshot_text,
+            "learner": profile_name,
+            "learner_id": learner_id,
+            "activity_id": snapshot.activity_id,
+            "topic": snapshot.topic,
+            "wpm": snapshot.wpm,
+            "mood_score": snapshot.mood_score,
+            "timestamp": snapshot.timestamp.isoformat()
+        }
         
-        index.upsert([
-            (f"karl-snapshot-{snapshot.timestamp.isoformat()}", embedding, {
-                "text": snapshot_text,
-                "learner": profile_name,
-                "activity_id": snapshot.activity_id,
-                "topic": snapshot.topic,
-                "wpm": snapshot.wpm,
-                "mood_score": snapshot.mood_score,
-                "timestamp": snapshot.timestamp.isoformat()
-            })
-        ])
+        # Pinecone rejects null metadata values
+        snapshot_sink.submit(
+            f"{learner_id}-snapshot-{snapshot.timestamp.isoformat()}",
+            snapshot_text,
+            {key: value for key, value in metadata.items() if value is not None}
+        )
         
         return True
     except Exception as e:
         print(f"Error storing snapshot: {e}")
         return False
 
+# Reading passages are generated ahead of time for each learning session so
+# /api/get-current-story can answer from memory.
+story_queue = StoryPrefetcher(generate_story_for_topic)
+
 # =============================================================================
 # FASTAPI APPLICATION
 # =============================================================================
 
-app = FastAPI(title="Karl Learning GPT - with Mini Hackathon", version="2.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers and flush them on shutdown."""
+    await snapshot_sink.start()
+    yield
+    story_queue.clear()
+    await snapshot_sink.stop()
+    session_store.flush()
+
+app = FastAPI(title="Karl Learning GPT - with Mini Hackathon", version="2.1.0", lifespan=lifespan)
+# Recordings are refused as soon as the upload passes MAX_AUDIO_BYTES
+app.add_middleware(AudioUploadLimit, paths=["/api/score-reading", "/api/score-pitch"])
+
+@app.middleware("http")
+async def flush_session_writes(request: Request, call_next):
+    """Commit the request's session writes before the client sees the reply.
+
+    Whichever worker serves the client's next request then reads them.
+    Writes made while a streamed body is still being sent are left to the
+    store's background flush.
+    """
+    response = await call_next(request)
+    try:
+        await asyncio.to_thread(session_store.flush)
+    except sqlite3.Error as e:
+        # Still pending; the background flush retries
+        print(f"⚠️ Session store flush failed: {e}")
+    return response
+
+@app.middleware("http")
+async def remember_learner(request: Request, call_next):
+    """Keep ?learner_id= in a cookie so the page's own API calls carry it.
+
+    A client that sends no learner id gets its own guest id in the cookie,
+    so anonymous browsers never share one profile.
+    """
+    learner_id = request.query_params.get(LEARNER_COOKIE)
+    if requested_learner(request) is None:
+        learner_id = request.state.learner_id = f"guest-{uuid.uuid4().hex[:16]}"
+    response = await call_next(request)
+    if learner_id and is_valid_learner_id(learner_id):
+        response.set_cookie(LEARNER_COOKIE, learner_id, samesite="lax")
+    return response
 
 # =============================================================================
 # MAIN INTERFACE ENDPOINTS
@@ -2089,6 +2202,12 @@ async def learning_session():
             }
 
             async function loadCurrentStory() {
+                try {
+                    await streamCurrentStory();
+                    return;
+                } catch (streamError) {
+                    console.warn('Story stream unavailable, loading the whole story instead:', streamError);
+                }
                 try {
                     const response = await fetch('/api/get-current-story');
                     if (response.ok) {
@@ -2102,12 +2221,62 @@ async def learning_session():
                 }
             }
 
-            function displayStory(story) {
+            async function streamCurrentStory() {
+                // Render the passage sentence by sentence as the server streams it
+                const response = await fetch('/api/get-current-story/stream');
+                if (!response.ok || !response.body) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                let text = '';
+                let finished = false;
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    let boundary;
+                    while ((boundary = buffer.indexOf('\\n\\n')) !== -1) {
+                        const lines = buffer.slice(0, boundary).split('\\n');
+                        buffer = buffer.slice(boundary + 2);
+                        const eventLine = lines.find(line => line.startsWith('event: '));
+                        const dataLine = lines.find(line => line.startsWith('data: '));
+                        if (!eventLine || !dataLine) continue;
+                        const event = eventLine.slice(7);
+                        const data = JSON.parse(dataLine.slice(6));
+                        if (event === 'meta') {
+                            showStoryHeader(data);
+                            updateStatus('✍️ Writing your story...', 'info');
+                        } else if (event === 'error') {
+                            text = '';
+                        } else if (event === 'delta') {
+                            text += data.text;
+                            document.getElementById('story-text').textContent = text;
+                        } else if (event === 'done') {
+                            currentStory = data;
+                            displayStory(currentStory);
+                            finished = true;
+                        }
+                    }
+                }
+                if (!finished) {
+                    throw new Error('Story stream ended early');
+                }
+            }
+
+            function showStoryHeader(story) {
                 document.getElementById('session-title').textContent = `📖 ${story.title}`;
                 document.getElementById('session-subtitle').textContent = `Reading Level: ${story.reading_level.replace('_', ' ')} • Topic: ${story.topic}`;
                 document.getElementById('story-title').textContent = story.title;
-                document.getElementById('story-text').textContent = story.text;
+                document.getElementById('story-text').textContent = '';
                 document.getElementById('story-section').style.display = 'block';
+                document.getElementById('start-reading').style.display = 'none';
+            }
+
+            function displayStory(story) {
+                showStoryHeader(story);
+                document.getElementById('story-text').textContent = story.text;
                 document.getElementById('start-reading').style.display = 'inline-block';
                 updateStatus('Story loaded! Click "Start Reading Aloud" when ready 🎤', 'info');
             }
@@ -2744,31 +2913,33 @@ async def review_sessions():
 @app.post("/start_session")
 async def start_session():
     """Create a new Assistant thread and return the thread ID."""
-    thread = client.beta.threads.create()
+    thread = await llm.client.beta.threads.create()
     return {"thread_id": thread.id}
 
 @app.post("/submit_audio")
 async def submit_audio(
     thread_id: str = Form(...),
-    audio: UploadFile = File(...)
+    audio: UploadFile = File(...),
+    learner_id: str = Depends(current_learner)
 ):
     """Score read-aloud audio and send the result to the Assistant."""
     metrics = readaloud.score(audio, passage_id="p1")
     wpm = metrics["words_per_minute"]
     errors = metrics["words_total"] - metrics["words_correct"]
 
-    profile.snapshots.append(
-        LearnerSnapshot(
-            timestamp=datetime.utcnow(),
-            wpm=wpm,
-            activity_id="read_snippet",
-        )
+    snapshot = LearnerSnapshot(
+        timestamp=datetime.utcnow(),
+        wpm=wpm,
+        activity_id="read_snippet",
     )
+    async with learners.update_profile(learner_id) as profile:
+        profile.record_snapshot(snapshot)
+    await asyncio.to_thread(snapshot_archive.append, learner_id, [snapshot])
 
-    client.beta.threads.messages.create(
+    await llm.client.beta.threads.messages.create(
         thread_id=thread_id,
         role="user",
-        content=f"Here is Karl's read-aloud result: {wpm} WPM, {errors} mistakes."
+        content=f"Here is {profile.name}'s read-aloud result: {wpm} WPM, {errors} mistakes."
     )
 
     return {"status": "ok", **metrics}
@@ -2776,30 +2947,32 @@ async def submit_audio(
 @app.post("/submit_mood")
 async def submit_mood(
     thread_id: str = Form(...),
-    image: UploadFile = File(...)
+    image: UploadFile = File(...),
+    learner_id: str = Depends(current_learner)
 ):
     """Assess mood from an image and record the snapshot."""
     mood_score = mood.assess_image(image)
 
-    profile.snapshots.append(
-        LearnerSnapshot(
-            timestamp=datetime.utcnow(),
-            mood_score=mood_score,
-            activity_id="face_snapshot",
-        )
+    snapshot = LearnerSnapshot(
+        timestamp=datetime.utcnow(),
+        mood_score=mood_score,
+        activity_id="face_snapshot",
     )
+    async with learners.update_profile(learner_id) as profile:
+        profile.record_snapshot(snapshot)
+    await asyncio.to_thread(snapshot_archive.append, learner_id, [snapshot])
 
     return {"mood_score": mood_score}
 
 @app.get("/next_activity")
 async def next_activity(thread_id: str):
     """Advance the Assistant thread and return the latest activity JSON."""
-    client.beta.threads.runs.create_and_poll(
+    await llm.client.beta.threads.runs.create_and_poll(
         thread_id=thread_id,
         assistant_id=assistant_id,
     )
 
-    messages = client.beta.threads.messages.list(thread_id=thread_id).data
+    messages = (await llm.client.beta.threads.messages.list(thread_id=thread_id)).data
     if not messages:
         return {"activity": "No activity generated yet."}
 
@@ -2829,33 +3002,36 @@ async def next_activity(thread_id: str):
     return {"activity": reply}
 
 @app.post("/api/start-adventure")
-async def start_adventure(request: Request):
+async def start_adventure(request: Request, learner_id: str = Depends(current_learner)):
     """Start a new learning adventure with selected topic."""
-    global current_session_id
-    
     try:
         data = await request.json()
         topic = data.get('topic', 'General Learning')
         
         # Create new session
-        thread = client.beta.threads.create()
+        thread = await llm.client.beta.threads.create()
         session_id = thread.id
-        current_session_id = session_id
         
-        # Store session data
-        active_sessions[session_id] = SessionData(
-            session_id=session_id,
-            thread_id=session_id,
-            start_time=datetime.now(timezone.utc),
-            current_topic=topic,
-            last_mood_check=datetime.now(timezone.utc),
-            reading_level=profile.reading_band.lower().replace(' ', '_'),
-            current_wpm=profile.current_wpm
-        )
+        async with learners.update_profile(learner_id) as profile:
+            # Store session data
+            session = SessionData(
+                session_id=session_id,
+                thread_id=session_id,
+                start_time=datetime.now(timezone.utc),
+                current_topic=topic,
+                last_mood_check=datetime.now(timezone.utc),
+                reading_level=profile.reading_band.lower().replace(' ', '_'),
+                current_wpm=profile.current_wpm
+            )
+            learners.save_session(learner_id, session_id, session)
+            learners.set_pointer(learner_id, "current_session", session_id)
+            
+            # Add topic to preferred topics
+            if topic not in profile.preferred_topics:
+                profile.preferred_topics.append(topic)
         
-        # Add topic to preferred topics
-        if topic not in profile.preferred_topics:
-            profile.preferred_topics.append(topic)
+        # Start writing the first stories while the page loads
+        story_queue.prime(session_id, topic, session.reading_level, session.current_wpm)
         
         print(f"✅ Started new adventure: {topic} (Session: {session_id})")
         return {"success": True, "session_id": session_id, "topic": topic}
@@ -2864,20 +3040,17 @@ async def start_adventure(request: Request):
         return {"success": False, "message": str(e)}
 
 @app.post("/api/start-hackathon")
-async def start_hackathon(request: Request):
+async def start_hackathon(request: Request, learner_id: str = Depends(current_learner)):
     """Start a new Mini Hackathon session."""
-    global current_hackathon_session
-    
     try:
         data = await request.json()
         topic = data.get('topic', 'General Learning')
         
         # Create new hackathon session
         session_id = str(uuid.uuid4())
-        current_hackathon_session = session_id
         
         # Generate challenge story
-        challenge_story = generate_challenge_story(topic, "General Challenge")
+        challenge_story = await generate_challenge_story(topic, "General Challenge")
         
         # Create hackathon session
         hackathon_session = HackathonSession(
@@ -2888,7 +3061,8 @@ async def start_hackathon(request: Request):
             metrics=HackathonMetrics(topic=topic)
         )
         
-        hackathon_sessions[session_id] = hackathon_session
+        learners.save_hackathon(learner_id, session_id, hackathon_session)
+        learners.set_pointer(learner_id, "current_hackathon", session_id)
         
         print(f"✅ Started new hackathon: {topic} (Session: {session_id})")
         return {"success": True, "session_id": session_id, "topic": topic}
@@ -2897,14 +3071,12 @@ async def start_hackathon(request: Request):
         return {"success": False, "message": str(e)}
 
 @app.get("/api/get-hackathon-session")
-async def get_hackathon_session():
+async def get_hackathon_session(learner_id: str = Depends(current_learner)):
     """Get current hackathon session data."""
-    global current_hackathon_session
-    
-    if not current_hackathon_session or current_hackathon_session not in hackathon_sessions:
+    session = await learners.acurrent_hackathon(learner_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="No active hackathon session")
     
-    session = hackathon_sessions[current_hackathon_session]
     return {
         "session_id": session.session_id,
         "topic": session.topic,
@@ -2913,16 +3085,16 @@ async def get_hackathon_session():
         "completed": session.completed
     }
 
-@app.post("/api/get-idea-spark")
-async def get_idea_spark(request: Request):
-    """Generate AI idea sparks for brainstorming."""
-    try:
-        data = await request.json()
-        challenge = data.get('challenge', '')
-        notes = data.get('notes', '')
-        topic = data.get('topic', '')
-        
-        prompt = f"""You are the IdeaSpark Coach for kids aged 9-10. Based on their challenge "{challenge}" and their notes: "{notes}", provide a 20-word encouraging nudge that helps them think deeper about the problem.
+IDEA_SPARK_FALLBACK = "Great thinking! Keep exploring how AI could help solve this challenge in creative ways!"
+PITCH_COACH_FALLBACK = "<ul><li>Your pitch is off to a great start!</li><li>Try adding more details about how your AI will help people.</li><li>Make sure to explain why your solution is special!</li></ul>"
+
+def build_idea_spark_prompt(data: dict) -> str:
+    """Build the IdeaSpark Coach prompt from the brainstorm request body."""
+    challenge = data.get('challenge', '')
+    notes = data.get('notes', '')
+    topic = data.get('topic', '')
+    
+    return f"""You are the IdeaSpark Coach for kids aged 9-10. Based on their challenge "{challenge}" and their notes: "{notes}", provide a 20-word encouraging nudge that helps them think deeper about the problem.
 
 Be enthusiastic, use simple language, and ask one thought-provoking question. Focus on the connection between {topic} and {challenge}.
 
@@ -2930,27 +3102,12 @@ Example: "Great thinking! How might people in {topic} face this challenge differ
 
 Provide just the encouraging spark, no extra text."""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=50
-        )
-        
-        spark = response.choices[0].message.content.strip()
-        return {"spark": spark}
-        
-    except Exception:
-        return {"spark": "Great thinking! Keep exploring how AI could help solve this challenge in creative ways!"}
-
-@app.post("/api/improve-pitch")
-async def improve_pitch(request: Request):
-    """Get AI writing coach suggestions for pitch improvement."""
-    try:
-        data = await request.json()
-        pitch = data.get('pitch', '')
-        challenge = data.get('challenge', '')
-        
-        prompt = f"""You are a friendly writing coach for a 9-10 year old. They wrote this pitch for their "{challenge}" AI solution:
+def build_pitch_coach_prompt(data: dict) -> str:
+    """Build the writing-coach prompt from the improve-pitch request body."""
+    pitch = data.get('pitch', '')
+    challenge = data.get('challenge', '')
+    
+    return f"""You are a friendly writing coach for a 9-10 year old. They wrote this pitch for their "{challenge}" AI solution:
 
 "{pitch}"
 
@@ -2962,17 +3119,55 @@ Format as HTML with bullet points. Example:
 <li>Your idea is creative! Can you explain the "wow factor" in one exciting sentence?</li>
 </ul>"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=150
-        )
+@app.post("/api/get-idea-spark")
+async def get_idea_spark(request: Request):
+    """Generate AI idea sparks for brainstorming."""
+    try:
+        data = await request.json()
+        spark = await llm.chat(build_idea_spark_prompt(data), max_tokens=50)
+        return {"spark": spark}
         
-        suggestions = response.choices[0].message.content.strip()
+    except Exception:
+        return {"spark": IDEA_SPARK_FALLBACK}
+
+@app.post("/api/get-idea-spark/stream")
+async def stream_idea_spark(request: Request):
+    """Stream an idea spark as server-sent events."""
+    try:
+        prompt = build_idea_spark_prompt(await request.json())
+    except Exception:
+        prompt = None  # Bad body: send the fallback, like the non-streaming route
+    return sse_response(completion_events(
+        prompt,
+        IDEA_SPARK_FALLBACK,
+        lambda text: {"spark": text},
+        max_tokens=50
+    ))
+
+@app.post("/api/improve-pitch")
+async def improve_pitch(request: Request):
+    """Get AI writing coach suggestions for pitch improvement."""
+    try:
+        data = await request.json()
+        suggestions = await llm.chat(build_pitch_coach_prompt(data), max_tokens=150)
         return {"suggestions": suggestions}
         
     except Exception:
-        return {"suggestions": "<ul><li>Your pitch is off to a great start!</li><li>Try adding more details about how your AI will help people.</li><li>Make sure to explain why your solution is special!</li></ul>"}
+        return {"suggestions": PITCH_COACH_FALLBACK}
+
+@app.post("/api/improve-pitch/stream")
+async def stream_improve_pitch(request: Request):
+    """Stream writing-coach suggestions as server-sent events."""
+    try:
+        prompt = build_pitch_coach_prompt(await request.json())
+    except Exception:
+        prompt = None  # Bad body: send the fallback, like the non-streaming route
+    return sse_response(completion_events(
+        prompt,
+        PITCH_COACH_FALLBACK,
+        lambda text: {"suggestions": text},
+        max_tokens=150
+    ))
 
 @app.post("/api/ai-render-sketch")
 async def ai_render_sketch(request: Request):
@@ -2996,22 +3191,27 @@ async def ai_render_sketch(request: Request):
 @app.post("/api/score-pitch")
 async def score_pitch(
     audio: UploadFile = File(...),
-    challenge: str = Form(...)
+    challenge: str = Form(...),
+    learner_id: str = Depends(current_learner)
 ):
     """Score pitch audio and return metrics."""
     try:
-        scores = score_pitch_audio(audio, challenge)
+        scores = await score_pitch_audio(audio, challenge)
         
         # Update hackathon session with scores
-        if current_hackathon_session and current_hackathon_session in hackathon_sessions:
-            session = hackathon_sessions[current_hackathon_session]
-            session.metrics.clarity_score = scores.get('clarity_score', 7.0)
-            session.metrics.creativity_score = scores.get('creativity_score', 7.0)
-            session.metrics.feasibility_score = scores.get('feasibility_score', 7.0)
-            session.pitch_transcription = scores.get('transcription', '')
+        async with learners.lock(learner_id):
+            session = await learners.acurrent_hackathon(learner_id)
+            if session is not None:
+                session.metrics.clarity_score = scores.get('clarity_score', 7.0)
+                session.metrics.creativity_score = scores.get('creativity_score', 7.0)
+                session.metrics.feasibility_score = scores.get('feasibility_score', 7.0)
+                session.metrics.pitch_transcription = scores.get('transcription', '')
+                learners.save_hackathon(learner_id, session.session_id, session)
         
         return scores
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error scoring pitch: {e}")
         return {
@@ -3047,14 +3247,12 @@ Return as JSON:
   {{"investor": "Impact Shark", "question": "How would you know if your AI is really helping people?"}}
 ]}}"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=300
+        content = await llm.chat(
+            prompt, max_tokens=300, cache_ttl=LLM_CACHE_TTLS["shark_questions"], cacheable=is_json
         )
         
         try:
-            questions_data = json.loads(response.choices[0].message.content)
+            questions_data = json.loads(content)
             return questions_data
         except json.JSONDecodeError:
             # Fallback questions
@@ -3076,7 +3274,7 @@ Return as JSON:
         }
 
 @app.post("/api/generate-badge")
-async def generate_badge(request: Request):
+async def generate_badge(request: Request, learner_id: str = Depends(current_learner)):
     """Generate achievement badge for completed hackathon."""
     try:
         data = await request.json()
@@ -3084,7 +3282,7 @@ async def generate_badge(request: Request):
         topic = data.get('topic', 'Technology')
         
         # Generate SVG badge
-        svg_data = generate_badge_svg(challenge, topic)
+        svg_data = await generate_badge_svg(challenge, topic)
         
         # Create badge object
         badge = Badge(
@@ -3097,7 +3295,8 @@ async def generate_badge(request: Request):
         )
         
         # Add to profile
-        profile.badges.append(badge)
+        async with learners.update_profile(learner_id) as profile:
+            profile.badges.append(badge)
         
         return {
             "name": badge.name,
@@ -3117,10 +3316,10 @@ async def generate_badge(request: Request):
         }
 
 @app.get("/api/get-badges")
-async def get_badges():
+async def get_badges(learner_id: str = Depends(current_learner)):
     """Get all earned badges."""
     badges_data = []
-    for badge in profile.badges:
+    for badge in (await learners.aload_profile(learner_id)).badges:
         badges_data.append({
             "id": badge.id,
             "name": badge.name,
@@ -3133,10 +3332,10 @@ async def get_badges():
     return {"badges": badges_data}
 
 @app.get("/api/get-final-scores")
-async def get_final_scores():
+async def get_final_scores(learner_id: str = Depends(current_learner)):
     """Get final hackathon scores."""
-    if current_hackathon_session and current_hackathon_session in hackathon_sessions:
-        session = hackathon_sessions[current_hackathon_session]
+    session = await learners.acurrent_hackathon(learner_id)
+    if session is not None:
         return {
             "clarity_score": session.metrics.clarity_score,
             "creativity_score": session.metrics.creativity_score,
@@ -3152,7 +3351,7 @@ async def get_final_scores():
     }
 
 @app.post("/api/save-hackathon-progress")
-async def save_hackathon_progress(request: Request):
+async def save_hackathon_progress(request: Request, learner_id: str = Depends(current_learner)):
     """Save hackathon progress."""
     try:
         data = await request.json()
@@ -3160,23 +3359,25 @@ async def save_hackathon_progress(request: Request):
         phase = data.get('phase')
         hackathon_data = data.get('data')
         
-        if session_id in hackathon_sessions:
-            session = hackathon_sessions[session_id]
-            session.current_phase = phase
-            
-            # Update session data based on phase
-            if 'avatar' in hackathon_data:
-                session.avatar = hackathon_data['avatar']
-            if 'selectedChallenge' in hackathon_data:
-                session.selected_challenge = hackathon_data['selectedChallenge']
-            if 'brainstormNotes' in hackathon_data:
-                session.brainstorm_notes = hackathon_data['brainstormNotes']
-            if 'conceptData' in hackathon_data:
-                session.concept_data = hackathon_data['conceptData']
-            if 'sketchData' in hackathon_data:
-                session.sketch_data = hackathon_data['sketchData']
-            if 'onePagerText' in hackathon_data:
-                session.one_pager_text = hackathon_data['onePagerText']
+        async with learners.lock(learner_id):
+            session = await learners.aget_hackathon(learner_id, session_id)
+            if session is not None:
+                session.current_phase = phase
+                
+                # Update session data based on phase
+                if 'avatar' in hackathon_data:
+                    session.avatar = hackathon_data['avatar']
+                if 'selectedChallenge' in hackathon_data:
+                    session.selected_challenge = hackathon_data['selectedChallenge']
+                if 'brainstormNotes' in hackathon_data:
+                    session.brainstorm_notes = hackathon_data['brainstormNotes']
+                if 'conceptData' in hackathon_data:
+                    session.concept_data = hackathon_data['conceptData']
+                if 'sketchData' in hackathon_data:
+                    session.sketch_data = hackathon_data['sketchData']
+                if 'onePagerText' in hackathon_data:
+                    session.one_pager_text = hackathon_data['onePagerText']
+                learners.save_hackathon(learner_id, session_id, session)
         
         return {"success": True}
         
@@ -3184,21 +3385,25 @@ async def save_hackathon_progress(request: Request):
         return {"success": False, "message": str(e)}
 
 @app.post("/api/complete-hackathon")
-async def complete_hackathon(request: Request):
+async def complete_hackathon(request: Request, learner_id: str = Depends(current_learner)):
     """Complete hackathon and save final metrics."""
     try:
         data = await request.json()
         session_id = data.get('session_id')
         
-        if session_id in hackathon_sessions:
-            session = hackathon_sessions[session_id]
+        async with learners.lock(learner_id):
+            session = await learners.aget_hackathon(learner_id, session_id)
+            if session is None:
+                return {"success": True}
             session.completed = True
             
             # Calculate completion time
             completion_time = (datetime.now(timezone.utc) - session.start_time).total_seconds() / 60
             session.metrics.completion_time = int(completion_time)
+            learners.save_hackathon(learner_id, session_id, session)
             
             # Add to profile
+            profile = await learners.aload_profile(learner_id)
             profile.hackathon_sessions.append(session)
             
             # Create learning snapshot
@@ -3208,10 +3413,12 @@ async def complete_hackathon(request: Request):
                 topic=session.topic,
                 reading_level=profile.reading_band.lower().replace(' ', '_')
             )
-            profile.snapshots.append(snapshot)
-            
-            # Store in Pinecone
-            store_snapshot_in_pinecone(snapshot, profile.name)
+            profile.record_snapshot(snapshot)
+            learners.save_profile(learner_id, profile)
+        
+        # Archive locally for trend queries and store in Pinecone
+        await asyncio.to_thread(snapshot_archive.append, learner_id, [snapshot])
+        store_snapshot_in_pinecone(snapshot, learner_id, profile.name)
         
         return {"success": True}
         
@@ -3219,46 +3426,77 @@ async def complete_hackathon(request: Request):
         return {"success": False, "message": str(e)}
 
 @app.get("/api/get-current-story")
-async def get_current_story():
+async def get_current_story(learner_id: str = Depends(current_learner)):
     """Get current story for the active session."""
-    global current_session_id
-    
-    if not current_session_id or current_session_id not in active_sessions:
+    session = await learners.acurrent_session(learner_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="No active session")
     
-    session = active_sessions[current_session_id]
-    
-    # Generate new story based on current topic and reading level
-    story = generate_story_for_topic(
-        session.current_topic, 
+    # Serve the next prefetched story for the current topic and reading level
+    story = await story_queue.next(
+        session.session_id,
+        session.current_topic,
         session.reading_level,
         session.current_wpm
     )
     
     return story
 
+@app.get("/api/get-current-story/stream")
+async def stream_current_story(learner_id: str = Depends(current_learner)):
+    """Stream the current story as server-sent events: meta, delta..., done."""
+    session = await learners.acurrent_session(learner_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="No active session")
+    
+    session_id = session.session_id
+    topic, reading_level, wpm = session.current_topic, session.reading_level, session.current_wpm
+    
+    async def events():
+        # A prefetched story is already complete; send it in one go
+        if story_queue.ready_count(session_id):
+            story = await story_queue.next(session_id, topic, reading_level, wpm)
+            yield sse_event("meta", {key: value for key, value in story.items() if key != "text"})
+            yield sse_event("delta", {"text": story["text"]})
+            yield sse_event("done", story)
+            return
+        
+        # Otherwise stream a fresh one and keep the queue filling for next time
+        story_queue.prime(session_id, topic, reading_level, wpm)
+        meta = story_metadata(topic, reading_level, wpm)
+        yield sse_event("meta", meta)
+        async for event in completion_events(
+            build_story_prompt(topic, reading_level),
+            fallback_story(topic, reading_level, wpm)["text"],
+            lambda text: {**meta, "text": text}
+        ):
+            yield event
+    
+    return sse_response(events())
+
 @app.post("/api/score-reading")
 async def score_reading_api(
     audio: UploadFile = File(...),
     passage: str = Form(...),
-    actual_duration: Optional[str] = Form(None)
+    actual_duration: Optional[str] = Form(None),
+    learner_id: str = Depends(current_learner)
 ):
     """Score reading performance and update user profile."""
-    global current_session_id
-    
-    if not current_session_id:
+    session_id = await learners.aget_pointer(learner_id, "current_session")
+    if not session_id:
         raise HTTPException(status_code=404, detail="No active session")
     
     try:
         print(f"🎤 Processing audio file: {audio.filename}, size: {audio.size} bytes")
         
         # Score the reading
-        metrics = score_reading(audio, passage_text=passage)
+        metrics = await score_reading(audio, passage_text=passage)
         wpm = metrics["words_per_minute"]
         accuracy = metrics["accuracy"]
         
-        # If we have actual duration from frontend, use it to double-check
-        if actual_duration:
+        # Without word timestamps or a readable recording the duration is a
+        # guess, so check it against the frontend's timer
+        if actual_duration and metrics["duration_source"] == "estimate":
             try:
                 frontend_duration = float(actual_duration)
                 target_words = len(passage.split())
@@ -3277,72 +3515,91 @@ async def score_reading_api(
             except ValueError:
                 print("⚠️ Could not parse frontend duration")
         
-        # Update session data
-        session = active_sessions[current_session_id]
-        session.current_wpm = wpm
-        session.stories_completed += 1
-        
-        # Assess and update reading level
-        new_reading_level = assess_reading_level(wpm, accuracy)
-        session.reading_level = new_reading_level
-        
-        # Update global profile
-        profile.current_wpm = wpm
-        profile.reading_band = new_reading_level.replace('_', ' ').title()
+        async with learners.lock(learner_id):
+            # Update session data
+            session = await learners.aget_session(learner_id, session_id)
+            if session is None:
+                raise KeyError(session_id)
+            session.current_wpm = wpm
+            session.stories_completed += 1
+            
+            # Assess and update reading level
+            previous_reading_level = session.reading_level
+            new_reading_level = assess_reading_level(wpm, accuracy)
+            session.reading_level = new_reading_level
+            learners.save_session(learner_id, session_id, session)
+            
+            # Update the learner's profile
+            profile = await learners.aload_profile(learner_id)
+            profile.current_wpm = wpm
+            profile.reading_band = new_reading_level.replace('_', ' ').title()
+            
+            # Record snapshot
+            snapshot = LearnerSnapshot(
+                timestamp=datetime.now(timezone.utc),
+                wpm=wpm,
+                activity_id="story_reading",
+                topic=session.current_topic,
+                reading_level=new_reading_level
+            )
+            profile.record_snapshot(snapshot)
+            learners.save_profile(learner_id, profile)
         
-        # Record snapshot
-        snapshot = LearnerSnapshot(
-            timestamp=datetime.now(timezone.utc),
-            wpm=wpm,
-            activity_id="story_reading",
-            topic=session.current_topic,
-            reading_level=new_reading_level
-        )
-        profile.snapshots.append(snapshot)
+        # Regenerate queued stories if the level changed
+        story_queue.retarget(session_id, session.current_topic, new_reading_level, wpm)
         
-        # Store in Pinecone
-        store_snapshot_in_pinecone(snapshot, profile.name)
+        # Archive locally for trend queries and store in Pinecone
+        await asyncio.to_thread(snapshot_archive.append, learner_id, [snapshot])
+        store_snapshot_in_pinecone(snapshot, learner_id, profile.name)
         
         print(f"✅ Reading scored: {wpm} WPM, {accuracy:.1%} accuracy, level: {new_reading_level}")
         return {
             "status": "success",
             **metrics,
             "reading_level": new_reading_level,
-            "level_updated": new_reading_level != session.reading_level
+            "level_updated": new_reading_level != previous_reading_level
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error scoring reading: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to score reading: {e}")
 
 @app.post("/api/auto-mood-check")
-async def auto_mood_check(image: UploadFile = File(...)):
+async def auto_mood_check(image: UploadFile = File(...), learner_id: str = Depends(current_learner)):
     """Automatic mood assessment from webcam."""
-    global current_session_id
-    
-    if not current_session_id:
+    session_id = await learners.aget_pointer(learner_id, "current_session")
+    if not session_id:
         return {"mood_score": 0.0, "message": "No active session"}
     
     try:
         # Assess mood
-        mood_score = assess_mood_from_image(image)
-        
-        # Update session
-        session = active_sessions[current_session_id]
-        session.last_mood_check = datetime.now(timezone.utc)
-        session.mood_check_count += 1
-        
-        # Record snapshot
-        snapshot = LearnerSnapshot(
-            timestamp=datetime.now(timezone.utc),
-            mood_score=mood_score,
-            activity_id="auto_mood_check",
-            topic=session.current_topic
-        )
-        profile.snapshots.append(snapshot)
+        mood_score = await assess_mood_from_image(image)
+        
+        async with learners.lock(learner_id):
+            # Update session
+            session = await learners.aget_session(learner_id, session_id)
+            if session is None:
+                raise KeyError(session_id)
+            session.last_mood_check = datetime.now(timezone.utc)
+            session.mood_check_count += 1
+            learners.save_session(learner_id, session_id, session)
+            
+            # Record snapshot
+            snapshot = LearnerSnapshot(
+                timestamp=datetime.now(timezone.utc),
+                mood_score=mood_score,
+                activity_id="auto_mood_check",
+                topic=session.current_topic
+            )
+            profile = await learners.aload_profile(learner_id)
+            profile.record_snapshot(snapshot)
+            learners.save_profile(learner_id, profile)
         
-        # Store in Pinecone
-        store_snapshot_in_pinecone(snapshot, profile.name)
+        # Archive locally for trend queries and store in Pinecone
+        await asyncio.to_thread(snapshot_archive.append, learner_id, [snapshot])
+        store_snapshot_in_pinecone(snapshot, learner_id, profile.name)
         
         # Check if intervention needed
         needs_break = mood_score < -0.5
@@ -3358,39 +3615,38 @@ async def auto_mood_check(image: UploadFile = File(...)):
         return {"mood_score": 0.0, "message": "Mood check failed"}
 
 @app.get("/api/get-stats")
-async def get_stats():
+async def get_stats(learner_id: str = Depends(current_learner)):
     """Get learning statistics for review page."""
-    if not profile.snapshots and not profile.hackathon_sessions:
+    profile = await learners.aload_profile(learner_id)
+    totals = profile.snapshot_stats
+    if not totals.count and not profile.hackathon_sessions:
         return {"total_sessions": 0, "message": "No learning data available yet"}
     
-    # Calculate statistics
-    reading_snapshots = [s for s in profile.snapshots if s.wpm is not None]
-    mood_snapshots = [s for s in profile.snapshots if s.mood_score is not None]
+    # Read the running aggregates instead of rescanning the snapshots
     hackathon_count = len(profile.hackathon_sessions)
     
     stats = {
-        "total_sessions": len(profile.snapshots) + hackathon_count,
-        "reading_sessions": len(reading_snapshots),
+        "total_sessions": totals.count + hackathon_count,
+        "reading_sessions": totals.reading_count,
         "hackathon_sessions": hackathon_count,
-        "mood_checks": len(mood_snapshots),
+        "mood_checks": totals.mood_count,
         "current_reading_level": profile.reading_band,
-        "favorite_topics": profile.preferred_topics[:3] if profile.preferred_topics else []
+        "favorite_topics": profile.preferred_topics[:3] if profile.preferred_topics else [],
+        "topic_counts": totals.topic_counts
     }
     
-    if reading_snapshots:
-        wpms = [s.wpm for s in reading_snapshots]
+    if totals.reading_count:
         stats.update({
-            "avg_wpm": round(sum(wpms) / len(wpms), 1),
-            "max_wpm": max(wpms),
-            "latest_wpm": wpms[-1],
-            "wpm_improvement": wpms[-1] - wpms[0] if len(wpms) > 1 else 0
+            "avg_wpm": round(totals.avg_wpm, 1),
+            "max_wpm": totals.wpm_max,
+            "latest_wpm": totals.latest_wpm,
+            "wpm_improvement": totals.latest_wpm - totals.first_wpm if totals.reading_count > 1 else 0
         })
     
-    if mood_snapshots:
-        moods = [s.mood_score for s in mood_snapshots]
+    if totals.mood_count:
         stats.update({
-            "avg_mood": round(sum(moods) / len(moods), 2),
-            "latest_mood": moods[-1]
+            "avg_mood": round(totals.avg_mood, 2),
+            "latest_mood": totals.latest_mood
         })
     
     # Hackathon metrics
@@ -3411,33 +3667,68 @@ async def get_stats():
                 "badges_earned": len(profile.badges)
             }
     
+    # Recent trends come from the columnar snapshot archive
+    stats["wpm_trend_7_days"], stats["mood_by_topic_30_days"] = await asyncio.to_thread(
+        lambda: (
+            snapshot_archive.last_days(learner_id, 7).wpm_by_day(),
+            snapshot_archive.last_days(learner_id, 30).mood_by_topic(),
+        )
+    )
+    
     return stats
 
+@app.get("/api/get-trends")
+async def get_trends(days: int = Query(7, ge=1, le=3650), learner_id: str = Depends(current_learner)):
+    """Summaries over the last ``days`` days from the snapshot archive."""
+    def trends() -> dict:
+        window = snapshot_archive.last_days(learner_id, days)
+        return {
+            "days": days,
+            **window.summary(),
+            "wpm_by_day": window.wpm_by_day(),
+            "mood_by_topic": window.mood_by_topic(),
+            "activities": window.activity_counts()
+        }
+    
+    return await asyncio.to_thread(trends)
+
 # =============================================================================
 # SYSTEM ENDPOINTS
 # =============================================================================
 
 @app.get("/health")
-async def health_check():
+async def health_check(learner_id: str = Depends(current_learner)):
     """System health check."""
+    profile = await learners.aload_profile(learner_id)
+    # Counting scans the session store and the response caches; keep it off the event loop
+    counts = await asyncio.to_thread(
+        lambda: (
+            len(learners.profiles), len(learners.sessions), len(learners.hackathons),
+            llm.cache.stats(), llm.transcripts.stats(),
+        )
+    )
     return {
         "status": "healthy",
-        "active_sessions": len(active_sessions),
-        "current_session": current_session_id,
-        "hackathon_sessions": len(hackathon_sessions),
-        "current_hackathon": current_hackathon_session,
-        "total_snapshots": len(profile.snapshots),
-        "badges_earned": len(profile.badges)
+        "learners": counts[0],
+        "active_sessions": counts[1],
+        "current_session": await learners.aget_pointer(learner_id, "current_session"),
+        "hackathon_sessions": counts[2],
+        "current_hackathon": await learners.aget_pointer(learner_id, "current_hackathon"),
+        "total_snapshots": profile.snapshot_stats.count,
+        "badges_earned": len(profile.badges),
+        "llm_cache": counts[3],
+        "transcription_cache": counts[4],
+        "snapshot_sink": snapshot_sink.stats(),
+        "embedding_cache": embedding_store.stats()
     }
 
 @app.get("/api/reset-session")
-async def reset_session():
-    """Reset current session (for testing)."""
-    global current_session_id, active_sessions, current_hackathon_session, hackathon_sessions
-    current_session_id = None
-    current_hackathon_session = None
-    active_sessions.clear()
-    hackathon_sessions.clear()
+async def reset_session(learner_id: str = Depends(current_learner)):
+    """Reset the learner's sessions (for testing)."""
+    async with learners.lock(learner_id):
+        session_ids = await learners.areset(learner_id)
+    for session_id in session_ids:
+        story_queue.discard(session_id)
     return {"message": "All sessions reset successfully"}
 
 # =============================================================================
@@ -3475,7 +3766,7 @@ try:
         name="Karl-Learning-Adaptive-Coach",
         model="gpt-4o-mini",
         tools=[{"type": "code_interpreter"}],
-        instructions=SYSTEM_PROMPT.replace("{profile}", json.dumps(profile.model_dump())).replace("{topic}", "General Learning")
+        instructions=SYSTEM_PROMPT.replace("{profile}", learners.load_profile(DEFAULT_LEARNER_ID).model_dump_json(exclude={"snapshots"})).replace("{topic}", "General Learning")
     )
     assistant_id = assistant.id
     print(f"✅ Created Adaptive Learning Assistant: {assistant_id}")
@@ -3489,6 +3780,7 @@ except Exception as e:
 
 if __name__ == "__main__":
     print("🚀 Starting Karl Learning GPT - with Mini Hackathon...")
+    profile = learners.load_profile(DEFAULT_LEARNER_ID)
     print(f"👤 Profile: {profile.name}, Grade {profile.grade}")
     print(f"📈 Current Reading Level: {profile.reading_band}")
     print(f"🎯 Current WPM Target: {profile.current_wpm}")
@@ -3511,7 +3803,15 @@ if __name__ == "__main__":
             Hackathons Completed: {len(profile.hackathon_sessions)}
             """
             
-            embedding = embed_text(profile_text)
+            cached = embedding_store.get(EMBEDDING_MODEL, profile_text)
+            if cached is not None:
+                embedding = cached.tolist()
+            else:
+                embedding = client.embeddings.create(
+                    model=EMBEDDING_MODEL,
+                    input=profile_text
+                ).data[0].embedding
+                embedding_store.put_many(EMBEDDING_MODEL, [profile_text], [embedding])
             index.upsert([
                 (f"karl-profile-initial-{datetime.now(timezone.utc).isoformat()}", embedding, {
                     "text": profile_text,
@@ -3534,4 +3834,6 @@ if __name__ == "__main__":
         port=8000,
         reload=False,
         log_level="info",
+        # Session state is in the shared session store, so workers can scale out
+        workers=int(os.getenv("UVICORN_WORKERS", "1")),
     )
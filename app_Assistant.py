@@ -2,7 +2,7 @@ import os
 import json
 from datetime import datetime
 
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
@@ -163,15 +163,21 @@ async def story_prompt():
 
 
 @app.post("/submit-story")
-async def submit_story(payload: StoryPayload):
+def submit_story(payload: StoryPayload):
     """Save a story and generate an illustration."""
     story = save_story(payload.user_id, payload.prompt, payload.story_text)
-    img_url = generate_image(payload.prompt, payload.story_text, story["id"])
+    try:
+        img_url = generate_image(payload.prompt, payload.story_text, story["id"])
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Failed to illustrate story: {e}")
     return {"story_id": story["id"], "img_url": img_url}
 
 
 @app.post("/add-story-badge")
 async def add_story_badge_endpoint(payload: BadgePayload):
     """Copy image to badge collection and update profile."""
-    badge = add_story_badge(payload.profile, payload.story_id, payload.img_url)
+    try:
+        badge = add_story_badge(payload.profile, payload.story_id, payload.img_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"badge": badge, "profile": payload.profile}
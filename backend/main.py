@@ -1,21 +1,18 @@
-from fastapi import FastAPI, UploadFile, File, Form
-from uuid import uuid4
-
-from utils import readaloud, mood
-from pathlib import Path
-import random
-
-# Load fun facts data from the backend/data directory
-DATA_DIR = Path(__file__).resolve().parent / "data"
+import asyncio
+import os
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from uuid import UUID, uuid4
 
-def _random_line(path: Path) -> str:
-    with open(path) as f:
-        lines = [ln.strip() for ln in f if ln.strip()]
-    return random.choice(lines) if lines else ""
+from utils import readaloud, mood
+from utils.llm import LLMGateway
+from utils.llm_cache import ResponseCache
+from utils.sse import sse_event, sse_response
 from pydantic import BaseModel
 
-from typing import Dict
+from typing import Dict, Optional
 
 from .models.profile_v2 import LearnerProfile
 from .services.session_builder import build_session
@@ -23,12 +20,64 @@ from .services.badges import evaluate_badges
 from .services.story_forge import (
     get_random_prompt,
     save_story,
+    get_story,
+    list_stories,
     generate_image,
+    find_image,
+    find_thumbnails,
+    media_url,
     add_story_badge,
 )
 from .services.journal import create_entry, add_reflection
+from .services.illustration_jobs import IllustrationJobs, QueueFull
+from .services.media import media_file
+from .services.fun_facts import FunFacts
+from .services.fact_summaries import FactSummaries, SummaryInterrupted
+
+illustrations = IllustrationJobs(generate_image)
+fun_facts = FunFacts()
+
+# Summaries and Whisper need an API key; without one the fun-facts endpoint
+# keeps returning the prompt text as before.
+llm = (
+    LLMGateway(
+        cache=ResponseCache(os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3") or None),
+        transcripts=ResponseCache(max_entries=int(os.getenv("TRANSCRIPTION_CACHE_ENTRIES", "256"))),
+    )
+    if os.getenv("OPENAI_API_KEY") else None
+)
+fact_summaries = FactSummaries(llm)
+
+# Read-alouds are transcribed by the backend READALOUD_STT names: "local"
+# (faster-whisper on the CPU, offline), "openai" or "auto" (local when it is
+# installed, else Whisper). With neither, /submit_audio returns zeroed metrics.
+speech = readaloud.make_backend(
+    os.getenv("READALOUD_STT", "auto"), llm, os.getenv("OPENAI_STT_MODEL", "whisper-1")
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm intro-depth fun-facts summaries and the speech backend.
 
-app = FastAPI()
+    ``FUN_FACTS_WARM`` is how many topics from the top of each pool to warm;
+    it is off by default. Every worker warms on startup, so keep it small.
+    """
+    warm = None
+    per_pool = int(os.getenv("FUN_FACTS_WARM", "0"))
+    if per_pool > 0:
+        topics = [topic for pool in fun_facts.pools.values() for topic in pool.lines()[:per_pool]]
+        warm = asyncio.create_task(fact_summaries.warm(topics))
+    if speech is not None:
+        await speech.start()
+    yield
+    if warm is not None:
+        warm.cancel()
+    if speech is not None:
+        await speech.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 class SessionPayload(BaseModel):
@@ -46,6 +95,8 @@ class StoryPayload(BaseModel):
     user_id: str
     prompt: str
     story_text: str
+    # Chosen by the client so a retried submit reuses the story and its job
+    story_id: Optional[UUID] = None
 
 
 class FactsSummaryPayload(BaseModel):
@@ -89,22 +140,91 @@ async def story_prompt():
 
 
 @app.post("/submit-story")
-async def submit_story(payload: StoryPayload):
-    """Save a story and generate an illustration."""
-    story = save_story(payload.user_id, payload.prompt, payload.story_text)
-    img_url = generate_image(payload.prompt, payload.story_text, story["id"])
-    return {"story_id": story["id"], "img_url": img_url}
+def submit_story(payload: StoryPayload):
+    """Save a story and queue its illustration.
+
+    The illustration job id is the story id; poll
+    ``/illustration-status/{job_id}`` for the image. Submitting the same
+    ``story_id`` again returns the existing story and job.
+    """
+    story_id = str(payload.story_id or uuid4())
+    existing = get_story(story_id)
+    if existing is not None and existing["user_id"] != payload.user_id:
+        raise HTTPException(status_code=409, detail="story_id belongs to another story")
+    try:
+        job = illustrations.submit(story_id, payload.prompt, payload.story_text, story_id)
+    except QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many illustrations in progress, please try again shortly",
+            headers={"Retry-After": "5"},
+        )
+    if existing is None:
+        save_story(payload.user_id, payload.prompt, payload.story_text, story_id)
+    return {"story_id": story_id, "job_id": job["job_id"], "status": job["status"]}
+
+
+@app.get("/illustration-status/{job_id}")
+def illustration_status(job_id: str):
+    """Report an illustration job's progress and, once done, its image."""
+    job = illustrations.status(job_id)
+    if job is None:
+        # Finished before a restart or dropped from the recent-jobs window
+        img_url = find_image(job_id)
+        if img_url is None:
+            raise HTTPException(status_code=404, detail="unknown illustration job")
+        job = {"job_id": job_id, "status": "done", "attempts": None, "img_url": img_url, "error": None}
+    if job["status"] == "done":
+        job["img_url"] = media_url(job["img_url"])
+        job["thumbnails"] = {size: media_url(path) for size, path in find_thumbnails(job_id).items()}
+    return job
+
+
+@app.get("/media/{kind}/{name}")
+async def media(kind: str, name: str, request: Request):
+    """Serve story images and badges with strong ETags and long-lived caching.
+
+    ``FileResponse`` answers Range and If-Range requests and hands the file to
+    the server via the ``http.response.pathsend`` extension where the ASGI
+    server supports it.
+    """
+    found = media_file(kind, name)
+    if found is None:
+        raise HTTPException(status_code=404, detail="media not found")
+    path, etag, cache_control = found
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    if "*" in tags or etag in tags:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, headers=headers)
+
+
+@app.get("/stories")
+def stories(
+    user_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Return a page of the user's stories, newest first."""
+    if cursor is not None and not cursor.isdigit():
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    page, next_cursor = list_stories(user_id, cursor, limit)
+    return {"stories": page, "next_cursor": next_cursor}
 
 
 @app.post("/add-story-badge")
-async def add_story_badge_endpoint(payload: BadgePayload):
-    """Copy image to badge collection and update profile."""
-    badge = add_story_badge(payload.profile, payload.story_id, payload.img_url)
+def add_story_badge_endpoint(payload: BadgePayload):
+    """Add the story's illustration to the badge collection and update profile."""
+    try:
+        badge = add_story_badge(payload.profile, payload.story_id, payload.img_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"badge": badge, "profile": payload.profile}
 
 
 @app.post("/journal-entry")
-async def journal_entry(payload: JournalEntryPayload):
+def journal_entry(payload: JournalEntryPayload):
     """Create a new journal entry and return a reflection question."""
     entry, question, badge = create_entry(payload.user_id, payload.entry)
     resp = {"entry_id": entry["id"], "question": question}
@@ -114,7 +234,7 @@ async def journal_entry(payload: JournalEntryPayload):
 
 
 @app.post("/journal-reflection")
-async def journal_reflection(payload: ReflectionPayload):
+def journal_reflection(payload: ReflectionPayload):
     """Attach a reflection answer to an entry."""
     entry = add_reflection(payload.entry_id, payload.reflection)
     return {"entry": entry}
@@ -125,26 +245,43 @@ async def journal_reflection(payload: ReflectionPayload):
 # ---------------------------------------------------------------------------
 
 @app.get("/fun_facts_options")
-async def fun_facts_options():
-    """Return one random topic from each list."""
-    options = {
-        "history": _random_line(DATA_DIR / "HistoricalPeople.txt"),
-        "science": _random_line(DATA_DIR / "HistoricalScience.txt"),
-        "space": _random_line(DATA_DIR / "SpaceTopics.txt"),
-        "animals": _random_line(DATA_DIR / "AnimalTopics.txt"),
-    }
-    return {"options": options}
+async def fun_facts_options(learner_id: Optional[str] = None):
+    """Return one random topic from each list.
+
+    With ``learner_id`` the learner sees every topic before any repeats.
+    """
+    options = fun_facts.options(1, learner_id)
+    return {"options": {name: picks[0] if picks else "" for name, picks in options.items()}}
+
+
+@app.get("/fun_facts_options/batch")
+async def fun_facts_options_batch(k: int = Query(5, ge=1, le=50), learner_id: Optional[str] = None):
+    """Return up to ``k`` topics from each list in one call."""
+    return {"options": fun_facts.options(k, learner_id)}
 
 
 @app.post("/fun_facts_summary")
 async def fun_facts_summary(payload: FactsSummaryPayload):
     """Return a simple child-friendly summary for a topic."""
-    summary = (
-        f"You are an inspiring educator teaching a 9 year old all about {payload.topic}. "
-        f"This is the {payload.count} time this topic has been introduced to the student so cater your "
-        f"response and level of detail/depth to this. Provide a detailed summary about this topic that is both educational and interesting."
-    )
-    return {"summary": summary}
+    return {"summary": await fact_summaries.summary(payload.topic, payload.count)}
+
+
+@app.post("/fun_facts_summary/stream")
+async def stream_fun_facts_summary(payload: FactsSummaryPayload):
+    """Stream the summary as server-sent ``delta`` events, then ``done``."""
+    async def events():
+        text = ""
+        try:
+            async for piece in fact_summaries.stream(payload.topic, payload.count):
+                text += piece
+                yield sse_event("delta", {"text": piece})
+        except SummaryInterrupted as e:
+            # Drop the partial text, as app.py's completion streams do
+            yield sse_event("error", {"detail": "completion interrupted"})
+            text = e.fallback
+        yield sse_event("done", {"summary": text.strip()})
+
+    return sse_response(events())
 
 
 # ---------------------------------------------------------------------------
@@ -163,9 +300,9 @@ async def submit_audio(
     passage: str = Form(None),
     audio: UploadFile = File(...),
 ):
-    """Score a read-aloud audio clip and return fluency metrics."""
-    metrics = readaloud.score(audio, passage_id="p1")
-    return {"status": "ok", **metrics}
+    """Score a read-aloud audio clip against ``passage`` and return fluency metrics."""
+    metrics = await readaloud.score_audio(audio, passage, speech)
+    return {"status": "ok", "stt_backend": speech.name if speech else None, **metrics}
 
 
 @app.post("/submit_mood")
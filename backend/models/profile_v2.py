@@ -42,6 +42,7 @@ class StoryBadge(BaseModel):
     type: str
     story_id: str
     img_url: str
+    blob: Optional[str] = None
 
 
 class History(BaseModel):
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from .storage import append_line, file_lock
+
+HASH_CHUNK = 1024 * 1024
+
+
+class BlobStore:
+    """Content-addressed files shared by story images and badges.
+
+    Each distinct file is stored once as ``<root>/<aa>/<sha256><suffix>``.
+    Callers refer to blobs through names (``images/<story_id>``,
+    ``badges/<story_id>`` ...) bound in an append-only ``refs.jsonl``; a
+    blob's reference count is the number of names bound to it, so pointing
+    a badge at an existing image is one appended line rather than a copy.
+    :meth:`gc` deletes unreferenced blobs and compacts the ref log. Like
+    :class:`RecordLog`, bindings appended by other processes are picked up
+    on the next call.
+    """
+
+    def __init__(self, root: Union[str, Path], gc_grace: float = 3600.0):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.refs_path = self.root / "refs.jsonl"
+        self.gc_grace = gc_grace
+        self._lock = threading.Lock()
+        self._reset_index()
+
+    def _reset_index(self):
+        self._names: Dict[str, str] = {}
+        self._counts: Dict[str, int] = {}
+        self._end = 0
+        self._inode = None
+
+    # ------------------------------------------------------------------
+    # Blobs
+    # ------------------------------------------------------------------
+
+    def path(self, digest: str, suffix: str = ".jpeg") -> Path:
+        return self.root / digest[:2] / f"{digest}{suffix}"
+
+    def digest_of(self, path: Union[str, Path]) -> Optional[str]:
+        """Return the digest if ``path`` is a blob in this store."""
+        path = Path(path)
+        digest = path.name.split(".", 1)[0]
+        if len(digest) == 64 and path.parent == self.root / digest[:2]:
+            return digest
+        return None
+
+    def _commit(self, tmp: Path, digest: str, suffix: str) -> str:
+        dest = self.path(digest, suffix)
+        dest.parent.mkdir(exist_ok=True)
+        if dest.exists():
+            # Deduplicated; touching it keeps gc from racing the caller's bind
+            tmp.unlink()
+            os.utime(dest)
+        else:
+            os.replace(tmp, dest)
+        return digest
+
+    def put(self, data: bytes, suffix: str = ".jpeg") -> str:
+        """Store ``data`` unless an identical blob exists; return its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        if self.path(digest, suffix).exists():
+            os.utime(self.path(digest, suffix))
+            return digest
+        tmp = self.root / f".{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return self._commit(tmp, digest, suffix)
+
+    def put_file(self, src: Union[str, Path], suffix: str = ".jpeg") -> str:
+        """Store a copy of an existing file, hashing it as it is copied."""
+        digest = self.digest_of(src)
+        if digest is not None:
+            return digest
+        sha = hashlib.sha256()
+        tmp = self.root / f".{uuid.uuid4().hex}.tmp"
+        with open(src, "rb") as fin, open(tmp, "wb") as fout:
+            for chunk in iter(lambda: fin.read(HASH_CHUNK), b""):
+                sha.update(chunk)
+                fout.write(chunk)
+            fout.flush()
+            os.fsync(fout.fileno())
+        return self._commit(tmp, sha.hexdigest(), suffix)
+
+    # ------------------------------------------------------------------
+    # Names and reference counts
+    # ------------------------------------------------------------------
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.refs_path)
+        except FileNotFoundError:
+            self._reset_index()
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._end:
+            # Compacted by another process: reload from scratch
+            self._reset_index()
+            self._inode = stat.st_ino
+        if stat.st_size == self._end:
+            return
+        with open(self.refs_path, "rb") as f:
+            f.seek(self._end)
+            offset = self._end
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    rec = None
+                if isinstance(rec, dict) and "name" in rec and "digest" in rec:
+                    self._apply(rec["name"], rec["digest"])
+                else:
+                    print(f"⚠️ Skipping unreadable ref at {self.refs_path}:{offset}")
+                offset += len(line)
+        self._end = offset
+
+    def _apply(self, name: str, digest: Optional[str]):
+        old = self._names.pop(name, None)
+        if old is not None:
+            self._counts[old] -= 1
+            if not self._counts[old]:
+                del self._counts[old]
+        if digest is not None:
+            self._names[name] = digest
+            self._counts[digest] = self._counts.get(digest, 0) + 1
+
+    def bind(self, bindings: Iterable[Tuple[str, Optional[str]]]):
+        """Point each name at a digest (``None`` unbinds) in one append."""
+        bindings = list(bindings)
+        lines = b"".join(
+            (json.dumps({"name": name, "digest": digest}) + "\n").encode() for name, digest in bindings
+        )
+        with self._lock:
+            append_line(self.refs_path, lines)
+            self._refresh()
+
+    def resolve(self, name: str) -> Optional[str]:
+        with self._lock:
+            self._refresh()
+            return self._names.get(name)
+
+    def refcount(self, digest: str) -> int:
+        with self._lock:
+            self._refresh()
+            return self._counts.get(digest, 0)
+
+    # ------------------------------------------------------------------
+    # Garbage collection
+    # ------------------------------------------------------------------
+
+    def gc(self, now: Optional[float] = None) -> int:
+        """Delete unreferenced blobs older than ``gc_grace`` and compact refs.
+
+        The grace period covers the gap between :meth:`put` and the
+        caller's :meth:`bind`. Returns the number of blobs removed.
+        """
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock, file_lock(self.refs_path):
+            self._refresh()
+            for blob in self.root.glob("??/*"):
+                digest = blob.name.split(".", 1)[0]
+                if self._counts.get(digest) or now - blob.stat().st_mtime < self.gc_grace:
+                    continue
+                blob.unlink(missing_ok=True)
+                removed += 1
+            tmp = self.refs_path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                for name, digest in self._names.items():
+                    f.write(json.dumps({"name": name, "digest": digest}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.refs_path)
+            self._refresh()
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._refresh()
+            return {"names": len(self._names), "blobs": len(self._counts)}
+
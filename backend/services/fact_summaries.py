@@ -0,0 +1,157 @@
+import asyncio
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+from utils.llm import DEFAULT_CHAT_MODEL, LLMGateway
+from utils.llm_cache import make_key
+
+SUMMARY_TTL = 30 * 24 * 3600
+SUMMARY_MAX_TOKENS = 400
+
+DEPTH_GUIDANCE = {
+    "intro": "This is the first time the student meets this topic, so start with the big picture "
+             "and the most surprising facts.",
+    "review": "The student has met this topic a couple of times, so go past the basics with new "
+              "details and examples.",
+    "deeper": "The student knows the basics well, so explore causes, connections and lesser-known facts.",
+    "expert": "The student has studied this topic many times, so share advanced details, open "
+              "questions and links to other subjects.",
+}
+
+
+class SummaryInterrupted(Exception):
+    """The completion failed after part of the summary was already streamed.
+
+    ``fallback`` replaces what the caller received so far.
+    """
+
+    def __init__(self, fallback: str):
+        super().__init__("summary completion interrupted")
+        self.fallback = fallback
+
+
+def depth_bucket(count: int) -> str:
+    """Map how often a learner has seen a topic to a summary depth."""
+    if count <= 1:
+        return "intro"
+    if count <= 3:
+        return "review"
+    if count <= 6:
+        return "deeper"
+    return "expert"
+
+
+def build_prompt(topic: str, depth: str) -> str:
+    return (
+        f"You are an inspiring educator teaching a 9 year old all about {topic}. "
+        f"{DEPTH_GUIDANCE[depth]} Provide a detailed summary about this topic that is both "
+        f"educational and interesting."
+    )
+
+
+def fallback_summary(topic: str, count: int) -> str:
+    """The prompt itself, which the frontend shows when no model is configured."""
+    return (
+        f"You are an inspiring educator teaching a 9 year old all about {topic}. "
+        f"This is the {count} time this topic has been introduced to the student so cater your "
+        f"response and level of detail/depth to this. Provide a detailed summary about this topic that is both educational and interesting."
+    )
+
+
+class FactSummaries:
+    """Fun-facts summaries cached per (topic, depth bucket).
+
+    Every learner who draws the same topic at the same depth gets the same
+    summary, so completions go through the gateway's persistent response
+    cache under the same key whether they were streamed or not. Concurrent
+    misses for one key share a single completion. Without a gateway (no
+    API key) the old prompt text is returned.
+    """
+
+    def __init__(
+        self,
+        llm: Optional[LLMGateway],
+        ttl: float = SUMMARY_TTL,
+        max_tokens: int = SUMMARY_MAX_TOKENS,
+        model: str = DEFAULT_CHAT_MODEL,
+    ):
+        self.llm = llm
+        self.ttl = ttl
+        self.max_tokens = max_tokens
+        self.model = model
+        self._inflight: Dict[str, "asyncio.Future[str]"] = {}
+        self.completions = 0
+
+    def _key(self, prompt: str) -> str:
+        # Same key LLMGateway.chat uses, so both paths share cache entries
+        messages = [{"role": "user", "content": prompt}]
+        return make_key(self.model, messages, {"max_tokens": self.max_tokens})
+
+    async def _cached(self, key: str) -> Optional[str]:
+        return await self.llm.cached(key) if self.llm.cache is not None else None
+
+    async def _store(self, key: str, text: str):
+        if self.llm.cache is not None and text:
+            await self.llm.remember(key, text, self.ttl)
+
+    async def summary(self, topic: str, count: int) -> str:
+        """Return the whole summary, from cache when possible."""
+        try:
+            parts = [piece async for piece in self.stream(topic, count)]
+        except SummaryInterrupted as e:
+            return e.fallback
+        return "".join(parts).strip()
+
+    async def stream(self, topic: str, count: int) -> AsyncIterator[str]:
+        """Yield the summary as it is generated, or all at once if cached.
+
+        If the completion fails after pieces were yielded, raises
+        :class:`SummaryInterrupted` so the caller can replace them.
+        """
+        if self.llm is None:
+            yield fallback_summary(topic, count)
+            return
+        prompt = build_prompt(topic.strip(), depth_bucket(count))
+        key = self._key(prompt)
+        cached = await self._cached(key)
+        if cached is not None:
+            yield cached
+            return
+        pending = self._inflight.get(key)
+        if pending is not None:
+            text = await asyncio.shield(pending)
+            yield text or fallback_summary(topic, count)
+            return
+
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        # Only a finished completion is cached; waiters get "" otherwise
+        streamed, text = "", ""
+        try:
+            async for piece in self.llm.stream_chat(prompt, model=self.model, max_tokens=self.max_tokens):
+                streamed += piece
+                yield piece
+            text = streamed.strip()
+            await self._store(key, text)
+            self.completions += 1
+        except Exception as e:
+            print(f"⚠️ Fun facts summary failed for {topic!r}: {e}")
+        finally:
+            self._inflight.pop(key, None)
+            future.set_result(text)
+        if not text:
+            if streamed.strip():
+                raise SummaryInterrupted(fallback_summary(topic, count))
+            yield fallback_summary(topic, count)
+
+    async def warm(self, topics: Iterable[str], count: int = 1, concurrency: int = 4) -> int:
+        """Fill the cache for ``topics`` at ``count``'s depth; returns misses filled."""
+        if self.llm is None:
+            return 0
+        slots = asyncio.Semaphore(concurrency)
+        before = self.completions
+
+        async def one(topic: str):
+            async with slots:
+                await self.summary(topic, count)
+
+        await asyncio.gather(*(one(topic) for topic in dict.fromkeys(topics)))
+        return self.completions - before
@@ -0,0 +1,120 @@
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+TOPIC_FILES = {
+    "history": "HistoricalPeople.txt",
+    "science": "HistoricalScience.txt",
+    "space": "SpaceTopics.txt",
+    "animals": "AnimalTopics.txt",
+}
+
+
+class TopicPool:
+    """The non-blank lines of one topic file, held as a tuple.
+
+    The file is read on first use and again only when its mtime or size
+    changes; that check runs at most every ``reload_interval`` seconds, so
+    a request normally costs no I/O at all.
+    """
+
+    def __init__(self, path: Path, reload_interval: float = 1.0):
+        self.path = Path(path)
+        self.reload_interval = reload_interval
+        self._state: Tuple[Tuple[str, ...], int] = ((), 0)  # (lines, generation), swapped as one
+        self._stamp = None
+        self._checked = float("-inf")
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Tuple[Tuple[str, ...], int]:
+        """The current lines and a generation number bumped on each reload."""
+        now = time.monotonic()
+        if now - self._checked >= self.reload_interval:
+            with self._lock:
+                self._reload(now)
+        return self._state
+
+    def lines(self) -> Tuple[str, ...]:
+        return self.snapshot()[0]
+
+    def _reload(self, now: float):
+        self._checked = now
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stamp = None
+        else:
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return
+        lines: Tuple[str, ...] = ()
+        if stamp is not None:
+            with open(self.path) as f:
+                lines = tuple(ln.strip() for ln in f if ln.strip())
+        self._state, self._stamp = (lines, self._state[1] + 1), stamp
+
+    def sample(self, k: int = 1) -> List[str]:
+        """Up to ``k`` distinct lines chosen uniformly at random."""
+        lines = self.lines()
+        if k == 1:
+            return [random.choice(lines)] if lines else []
+        return random.sample(lines, min(k, len(lines)))
+
+
+class _Deck:
+    def __init__(self, size: int, generation: int):
+        self.order = list(range(size))
+        random.shuffle(self.order)
+        self.generation = generation
+        self.pos = 0
+
+
+class FunFacts:
+    """Fun-facts topic pools with optional no-repeat sampling per learner.
+
+    With a ``learner_id`` each category deals from that learner's own
+    shuffled deck, so a learner sees every topic once before any repeats;
+    the deck is reshuffled when it runs out or the file is reloaded. Decks
+    for the ``max_learners`` most recent learners are kept in memory.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path = DATA_DIR,
+        topic_files: Optional[Dict[str, str]] = None,
+        reload_interval: float = 1.0,
+        max_learners: int = 10_000,
+    ):
+        files = topic_files or TOPIC_FILES
+        self.pools = {name: TopicPool(Path(data_dir) / fname, reload_interval) for name, fname in files.items()}
+        self.max_learners = max_learners
+        self._decks: "OrderedDict[str, Dict[str, _Deck]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def options(self, k: int = 1, learner_id: Optional[str] = None) -> Dict[str, List[str]]:
+        """Return ``k`` topics per category."""
+        if learner_id is None:
+            return {name: pool.sample(k) for name, pool in self.pools.items()}
+        with self._lock:
+            decks = self._decks.pop(learner_id, None) or {}
+            self._decks[learner_id] = decks
+            while len(self._decks) > self.max_learners:
+                self._decks.popitem(last=False)
+            return {name: self._deal(decks, name, pool, k) for name, pool in self.pools.items()}
+
+    def _deal(self, decks: Dict[str, _Deck], name: str, pool: TopicPool, k: int) -> List[str]:
+        lines, generation = pool.snapshot()
+        dealt: List[str] = []
+        for _ in range(min(k, len(lines))):
+            deck = decks.get(name)
+            if deck is None or deck.generation != generation or deck.pos >= len(deck.order):
+                deck = decks[name] = _Deck(len(lines), generation)
+            dealt.append(lines[deck.order[deck.pos]])
+            deck.pos += 1
+        return dealt
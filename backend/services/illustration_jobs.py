@@ -0,0 +1,171 @@
+"""Background worker pool for Story Forge illustrations.
+
+``/submit-story`` used to wait on DALL·E, the image download and the JPEG
+re-encode before answering. Jobs are now queued here and run by a small
+pool of worker threads; the request returns as soon as the job is queued
+and clients poll for the result.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_WORKERS = int(os.getenv("ILLUSTRATION_WORKERS", "2"))
+DEFAULT_MAX_PENDING = int(os.getenv("ILLUSTRATION_QUEUE_SIZE", "32"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFull(Exception):
+    """Raised by :meth:`IllustrationJobs.submit` when no queue slot is free."""
+
+
+class _Job:
+    def __init__(self, job_id: str, args: tuple):
+        self.id = job_id
+        self.args = args
+        self.status = QUEUED
+        self.attempts = 0
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "img_url": self.result,
+            "error": self.error,
+        }
+
+
+class IllustrationJobs:
+    """Bounded job queue drained by ``workers`` threads.
+
+    ``generate(*args)`` produces the illustration for a job. Job ids are
+    idempotency keys: submitting an id that is already queued, running or
+    done returns the existing job instead of generating a second image, and
+    only a failed job is queued again. A job that raises is retried up to
+    ``retries`` times with exponential backoff. At most ``max_pending`` jobs
+    wait in the queue; beyond that :meth:`submit` raises :class:`QueueFull`
+    so callers can shed load instead of piling up work.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[..., Any],
+        workers: int = DEFAULT_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        retries: int = 2,
+        backoff: float = 0.5,
+        keep_finished: int = 1000,
+    ):
+        self._generate = generate
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.keep_finished = keep_finished
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue(maxsize=max_pending)
+        self._jobs: Dict[str, _Job] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: list = []
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def submit(self, job_id: str, *args) -> Dict[str, Any]:
+        """Queue a job unless one with this id exists; never blocks."""
+        with self._lock:
+            self._ensure_workers()
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != FAILED:
+                return job.to_dict()
+            job = _Job(job_id, args)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.rejected += 1
+                raise QueueFull(f"{self._queue.maxsize} illustrations already queued") from None
+            self._finished.pop(job_id, None)
+            self._jobs[job_id] = job
+            return job.to_dict()
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job's state, or ``None`` if it is unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def _ensure_workers(self):
+        self._threads = [t for t in self._threads if t.is_alive()]
+        for i in range(len(self._threads), self.workers):
+            thread = threading.Thread(target=self._run, name=f"illustration-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self, timeout: Optional[float] = None):
+        """Finish queued jobs, then stop the workers."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self._process(job)
+
+    def _process(self, job: _Job):
+        with self._lock:
+            job.status = RUNNING
+        for attempt in range(self.retries + 1):
+            with self._lock:
+                job.attempts += 1
+            try:
+                result = self._generate(*job.args)
+            except Exception as e:
+                if attempt < self.retries:
+                    time.sleep(self.backoff * (2 ** attempt))
+                    continue
+                self._finish(job, FAILED, error=str(e))
+                return
+            self._finish(job, DONE, result=result)
+            return
+
+    def _finish(self, job: _Job, status: str, result: Any = None, error: Optional[str] = None):
+        with self._lock:
+            job.status, job.result, job.error = status, result, error
+            if status == DONE:
+                self.completed += 1
+            else:
+                self.failed += 1
+            # Keep recent results for polling; older ones fall back to disk
+            self._finished[job.id] = None
+            while len(self._finished) > self.keep_finished:
+                old_id, _ = self._finished.popitem(last=False)
+                self._jobs.pop(old_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "workers": len(self._threads),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
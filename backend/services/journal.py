@@ -1,11 +1,14 @@
-import json
 import random
 import uuid
 from datetime import datetime
 from pathlib import Path
 
+from .record_log import RecordLog
+from .storage import JsonFile
+
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
-JOURNAL_FILE = DATA_DIR / "journal_entries.json"
+JOURNAL_FILE = DATA_DIR / "journal_entries.json"  # pre-log format, imported once
+JOURNAL_LOG_FILE = DATA_DIR / "journal_entries.jsonl"
 BADGES_FILE = DATA_DIR / "journal_badges.json"
 
 REFLECTION_QUESTIONS = [
@@ -17,33 +20,14 @@ REFLECTION_QUESTIONS = [
 ]
 
 
-def _load_entries():
-    if JOURNAL_FILE.exists():
-        with open(JOURNAL_FILE) as f:
-            return json.load(f)
-    return []
-
-
-def _save_entries(entries):
-    with open(JOURNAL_FILE, "w") as f:
-        json.dump(entries, f, indent=2)
+journal_log = RecordLog(JOURNAL_LOG_FILE, legacy_path=JOURNAL_FILE)
 
 
-def _load_badges():
-    if BADGES_FILE.exists():
-        with open(BADGES_FILE) as f:
-            return json.load(f)
-    return {}
-
-
-def _save_badges(badges):
-    with open(BADGES_FILE, "w") as f:
-        json.dump(badges, f, indent=2)
+badges_file = JsonFile(BADGES_FILE, dict)
 
 
 def create_entry(user_id: str, entry: str):
     """Save a journal entry and return the entry and reflection question."""
-    entries = _load_entries()
     entry_id = str(uuid.uuid4())
     rec = {
         "id": entry_id,
@@ -52,14 +36,9 @@ def create_entry(user_id: str, entry: str):
         "entry": entry,
         "reflection": "",
     }
-    entries.append(rec)
-    _save_entries(entries)
-
-    # Calculate badge progress
-    user_entries = [e for e in entries if e["user_id"] == user_id]
-    count = len(user_entries)
-    badges = _load_badges()
-    user_badges = badges.get(user_id, [])
+    # Badge progress counts up to this entry, so concurrent entries each
+    # see their own count
+    count = journal_log.append(rec)
     new_badge = None
     if count % 5 == 0:
         new_badge = {
@@ -67,9 +46,7 @@ def create_entry(user_id: str, entry: str):
             "streak": count,
             "unlocked_at": datetime.utcnow().isoformat(),
         }
-        user_badges.append(new_badge)
-    badges[user_id] = user_badges
-    _save_badges(badges)
+        badges_file.update(lambda badges: badges.setdefault(user_id, []).append(new_badge))
 
     question = random.choice(REFLECTION_QUESTIONS)
     return rec, question, new_badge
@@ -77,10 +54,4 @@ def create_entry(user_id: str, entry: str):
 
 def add_reflection(entry_id: str, reflection: str):
     """Add an optional reflection answer to an existing entry."""
-    entries = _load_entries()
-    for entry in entries:
-        if entry["id"] == entry_id:
-            entry["reflection"] = reflection
-            _save_entries(entries)
-            return entry
-    raise ValueError("entry not found")
+    return journal_log.update(entry_id, reflection=reflection)
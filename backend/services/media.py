@@ -0,0 +1,46 @@
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple
+
+from . import story_forge
+
+HASH_CHUNK = 1024 * 1024
+
+# Blobs never change under their name; legacy files may be regenerated
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=86400"
+
+
+@lru_cache(maxsize=4096)
+def _file_digest(path: Path, mtime_ns: int, size: int) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def media_file(kind: str, name: str) -> Optional[Tuple[Path, str, str]]:
+    """Resolve ``/media/<kind>/<name>`` to ``(path, etag, cache_control)``.
+
+    Blob names are their SHA-256, so the ETag costs nothing; only blobs that
+    a story or badge still references are served. Files from before the
+    blob store are hashed once per (mtime, size) and cached. Returns
+    ``None`` for unknown kinds, hidden names or missing files.
+    """
+    if name != Path(name).name or name.startswith("."):
+        return None
+    if kind == "blobs":
+        blobs = story_forge.blobs
+        digest = name.split(".", 1)[0]
+        path = blobs.path(digest, name[len(digest):])
+        if blobs.digest_of(path) is None or not path.is_file() or not blobs.refcount(digest):
+            return None
+        return path, f'"{digest}"', IMMUTABLE
+    root = story_forge.MEDIA_ROOTS.get(kind)
+    if root is None or not (root / name).is_file():
+        return None
+    path = root / name
+    stat = path.stat()
+    return path, f'"{_file_digest(path, stat.st_mtime_ns, stat.st_size)}"', REVALIDATE
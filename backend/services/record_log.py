@@ -0,0 +1,175 @@
+import bisect
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .storage import append_line, file_lock
+
+
+class RecordLog:
+    """Append-only JSONL store of per-user records (journal entries, stories).
+
+    Every create or update appends one full record as a line. Two indexes
+    map ``user_id -> [offsets]`` (each record's first version, in creation
+    order, which is date order) and ``id -> offset`` (its latest version),
+    so counting a user's records is O(1), an update is a single append
+    instead of a rewrite, and a page of records reads only those lines.
+    Lines appended by other processes are picked up on the next call. A
+    torn final line from a crash is ignored until the next append cuts it
+    off, and a line that is not a valid record is skipped.
+    """
+
+    def __init__(self, path: Path, legacy_path: Optional[Path] = None):
+        self.path = Path(path)
+        self.legacy_path = legacy_path
+        self._lock = threading.Lock()
+        self._reset_index()
+
+    def _reset_index(self):
+        self._by_user: Dict[str, List[int]] = {}
+        self._by_id: Dict[str, int] = {}
+        self._latest: Dict[int, int] = {}  # first offset -> latest offset, once updated
+        self._first: Dict[str, int] = {}
+        self._end = 0
+        self._inode = None
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _import_legacy(self):
+        """One-time copy of the old whole-file JSON list into the log."""
+        if self.legacy_path is None or self.path.exists() or not self.legacy_path.exists():
+            return
+        with file_lock(self.path):
+            if self.path.exists():
+                return
+            with open(self.legacy_path) as f:
+                entries = json.load(f)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                for rec in entries:
+                    f.write(json.dumps(rec) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+
+    def _refresh(self):
+        """Bring the indexes up to date with the file on disk."""
+        self._import_legacy()
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset_index()
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._end:
+            # Replaced or truncated underneath us: index from scratch
+            self._reset_index()
+            self._inode = stat.st_ino
+        if stat.st_size == self._end:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._end)
+            offset = self._end
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    rec = None
+                if isinstance(rec, dict) and "id" in rec and "user_id" in rec:
+                    self._index(offset, rec)
+                else:
+                    print(f"⚠️ Skipping unreadable record at {self.path}:{offset}")
+                offset += len(line)
+        self._end = offset
+
+    def _index(self, offset: int, rec: dict):
+        first = self._first.get(rec["id"])
+        if first is None:
+            self._first[rec["id"]] = offset
+            self._by_user.setdefault(rec["user_id"], []).append(offset)
+        else:
+            self._latest[first] = offset
+        self._by_id[rec["id"]] = offset
+
+    def _read(self, offset: int) -> dict:
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def _read_many(self, first_offsets: List[int]) -> List[dict]:
+        with open(self.path, "rb") as f:
+            records = []
+            for offset in first_offsets:
+                f.seek(self._latest.get(offset, offset))
+                records.append(json.loads(f.readline()))
+            return records
+
+    def _append(self, rec: dict) -> int:
+        offset = append_line(self.path, (json.dumps(rec) + "\n").encode())
+        self._refresh()
+        return offset
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def append(self, rec: dict) -> int:
+        """Store a new entry record; return how many the user has up to it.
+
+        The count is the record's position in the user's index, so it is
+        exact even while other threads or processes are appending.
+        """
+        with self._lock:
+            self._refresh()
+            offset = self._append(rec)
+            return bisect.bisect_right(self._by_user.get(rec["user_id"], []), offset)
+
+    def get(self, entry_id: str) -> Optional[dict]:
+        """Return the latest version of an entry, or ``None``."""
+        with self._lock:
+            self._refresh()
+            offset = self._by_id.get(entry_id)
+            return self._read(offset) if offset is not None else None
+
+    def update(self, entry_id: str, **fields) -> dict:
+        """Change fields of an entry by appending its new version."""
+        with self._lock:
+            self._refresh()
+            offset = self._by_id.get(entry_id)
+            if offset is None:
+                raise ValueError("entry not found")
+            rec = {**self._read(offset), **fields}
+            self._append(rec)
+        return rec
+
+    def count(self, user_id: str) -> int:
+        """Number of entries the user has written."""
+        with self._lock:
+            self._refresh()
+            return len(self._by_user.get(user_id, ()))
+
+    def entries(self, user_id: str) -> List[dict]:
+        """Latest version of each of the user's records, oldest first."""
+        with self._lock:
+            self._refresh()
+            return self._read_many(self._by_user.get(user_id, []))
+
+    def page(self, user_id: str, cursor: Optional[str] = None, limit: int = 20) -> Tuple[List[dict], Optional[str]]:
+        """Return up to ``limit`` of the user's records, newest first.
+
+        ``cursor`` is the value returned with the previous page. It is a
+        position in the user's append-only index, so records added between
+        requests never shift or repeat later pages.
+        """
+        with self._lock:
+            self._refresh()
+            offsets = self._by_user.get(user_id, [])
+            start = len(offsets) if cursor is None else min(int(cursor), len(offsets))
+            stop = max(start - limit, 0)
+            records = self._read_many(offsets[stop:start][::-1])
+        return records, (str(stop) if stop > 0 else None)
@@ -0,0 +1,168 @@
+import copy
+import json
+import os
+import queue
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: only in-process locking
+    fcntl = None
+
+TAIL_CHUNK = 4096
+
+_process_locks: Dict[Path, threading.Lock] = {}
+_process_locks_guard = threading.Lock()
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Exclusive lock on ``path`` shared by threads and processes.
+
+    The lock lives in a ``<name>.lock`` file next to the data so the data
+    file itself can be replaced by rename while the lock is held.
+    """
+    path = Path(path)
+    with _process_locks_guard:
+        thread_lock = _process_locks.setdefault(path.resolve(), threading.Lock())
+    with thread_lock, open(path.with_name(path.name + ".lock"), "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def atomic_write_json(path: Path, data: Any, indent: Optional[int] = 2):
+    """Write JSON to a temp file in the same directory, fsync, then rename.
+
+    Readers see either the old file or the new one, never a partial write.
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _cut_torn_tail(f) -> int:
+    """Truncate ``f`` after its last newline; return the new size.
+
+    Only called under the file lock, when no other writer can be midway
+    through a line, so an unterminated tail is what a crash left behind.
+    """
+    end = f.seek(0, os.SEEK_END)
+    pos = end
+    while pos > 0:
+        start = max(pos - TAIL_CHUNK, 0)
+        f.seek(start)
+        chunk = f.read(pos - start)
+        newline = chunk.rfind(b"\n")
+        if newline != -1:
+            pos = start + newline + 1
+            break
+        pos = start
+    if pos != end:
+        f.truncate(pos)
+    return pos
+
+
+def append_line(path: Path, line: bytes) -> int:
+    """Append one complete line under the file lock; return its offset.
+
+    A torn last line left by a crashed writer is cut off first, so it can
+    never run into the new line.
+    """
+    with file_lock(path), open(path, "a+b") as f:
+        offset = _cut_torn_tail(f)
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    return offset
+
+
+class _Change:
+    def __init__(self, fn: Callable[[Any], Any]):
+        self.fn = fn
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class JsonFile:
+    """A JSON document changed through read-modify-write callbacks.
+
+    ``update(fn)`` queues ``fn``; one writer thread takes every queued change,
+    loads the file once under the file lock, applies the changes in order and
+    writes the result atomically once (group commit). Concurrent callers
+    therefore never lose each other's writes, and a burst of N updates costs
+    one rewrite instead of N. Each change runs on a copy of the document, so
+    one that raises leaves nothing behind.
+    """
+
+    def __init__(self, path: Path, default: Callable[[], Any], indent: Optional[int] = 2):
+        self.path = Path(path)
+        self.default = default
+        self.indent = indent
+        self.commits = 0
+        self._queue: "queue.Queue[_Change]" = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name=f"json-writer-{self.path.name}", daemon=True)
+        self._writer.start()
+
+    def read(self) -> Any:
+        if self.path.exists():
+            with open(self.path) as f:
+                return json.load(f)
+        return self.default()
+
+    def update(self, fn: Callable[[Any], Any]) -> Any:
+        """Apply ``fn(data)`` to the stored document and return its result."""
+        change = _Change(fn)
+        self._queue.put(change)
+        change.done.wait()
+        if change.error is not None:
+            raise change.error
+        return change.result
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit(batch)
+
+    def _commit(self, batch):
+        try:
+            with file_lock(self.path):
+                data = self.read()
+                for change in batch:
+                    draft = copy.deepcopy(data)
+                    try:
+                        change.result = change.fn(draft)
+                    except Exception as e:
+                        change.error = e
+                    else:
+                        data = draft
+                atomic_write_json(self.path, data, self.indent)
+                self.commits += 1
+        except Exception as e:
+            for change in batch:
+                change.error = change.error or e
+        finally:
+            for change in batch:
+                change.done.set()
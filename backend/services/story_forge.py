@@ -1,20 +1,32 @@
-import json
 import random
 import uuid
 from datetime import datetime
+import io
 import os
+import threading
 from pathlib import Path
-import shutil
-from io import BytesIO
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from urllib.request import urlopen
-from PIL import Image
+import httpx
+from PIL import Image, ImageOps
 from openai import OpenAI
 
+from ..models.profile_v2 import StoryBadge
+from .blob_store import BlobStore
+from .record_log import RecordLog
+
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
-STORIES_FILE = DATA_DIR / "stories.json"
-IMAGES_DIR = DATA_DIR / "images"
-BADGES_DIR = DATA_DIR / "badges" / "story_illustrations"
+STORIES_FILE = DATA_DIR / "stories.json"  # pre-log format, imported once
+STORIES_LOG_FILE = DATA_DIR / "stories.jsonl"
+STORIES_PAGE_SIZE = 20
+IMAGES_DIR = DATA_DIR / "images"  # illustrations from before the blob store
+BLOBS_DIR = DATA_DIR / "blobs"
+PLACEHOLDER_SIZE = (512, 512)
+THUMBNAIL_SIZES = (256, 128)  # accomplishments grid at 2x and 1x
+DOWNLOAD_CHUNK = 64 * 1024
+BADGES_DIR = DATA_DIR / "badges" / "story_illustrations"  # pre-blob badge copies
+MEDIA_PREFIX = "/media"
+MEDIA_ROOTS = {"images": IMAGES_DIR, "badges": BADGES_DIR}
 
 IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 BADGES_DIR.mkdir(parents=True, exist_ok=True)
@@ -23,6 +35,9 @@ BADGES_DIR.mkdir(parents=True, exist_ok=True)
 api_key = os.getenv("OPENAI_API_KEY")
 client = OpenAI(api_key=api_key) if api_key else None
 
+# One pooled client for image downloads so workers reuse connections
+http_client = httpx.Client(timeout=httpx.Timeout(30.0), follow_redirects=True)
+
 # Simple prompt list for demonstration
 PROMPTS = [
     "A penguin discovers a glowing compass in an ice cave...",
@@ -31,16 +46,8 @@ PROMPTS = [
 ]
 
 
-def _load_stories():
-    if STORIES_FILE.exists():
-        with open(STORIES_FILE) as f:
-            return json.load(f)
-    return []
-
-
-def _save_stories(stories):
-    with open(STORIES_FILE, "w") as f:
-        json.dump(stories, f, indent=2)
+story_log = RecordLog(STORIES_LOG_FILE, legacy_path=STORIES_FILE)
+blobs = BlobStore(BLOBS_DIR)
 
 
 def get_random_prompt() -> str:
@@ -48,49 +55,246 @@ def get_random_prompt() -> str:
     return random.choice(PROMPTS)
 
 
-def save_story(user_id: str, prompt: str, story_text: str) -> dict:
+def save_story(user_id: str, prompt: str, story_text: str, story_id: Optional[str] = None) -> dict:
     """Persist a new story entry and return it."""
-    stories = _load_stories()
-    story_id = str(uuid.uuid4())
     story = {
-        "id": story_id,
+        "id": story_id or str(uuid.uuid4()),
         "user_id": user_id,
         "date": datetime.utcnow().isoformat(),
         "prompt": prompt,
         "story_text": story_text,
     }
-    stories.append(story)
-    _save_stories(stories)
+    story_log.append(story)
     return story
 
 
+def get_story(story_id: str) -> Optional[dict]:
+    """Return the story with this id, or ``None``."""
+    return story_log.get(story_id)
+
+
+def list_stories(user_id: str, cursor: Optional[str] = None, limit: int = STORIES_PAGE_SIZE):
+    """Return one page of a user's stories, newest first, and the next cursor."""
+    return story_log.page(user_id, cursor, limit)
+
+
+def _rendition_name(story_id: str, size: Optional[int] = None) -> str:
+    return f"images/{story_id}" if size is None else f"thumbs/{story_id}/{size}"
+
+
+def media_url(path: Optional[str]) -> Optional[str]:
+    """Map a stored image path to the URL ``/media/...`` serves it under."""
+    if path is None:
+        return None
+    p = Path(path)
+    if blobs.digest_of(p) is not None:
+        return f"{MEDIA_PREFIX}/blobs/{p.name}"
+    for kind, root in MEDIA_ROOTS.items():
+        if p.parent == root:
+            return f"{MEDIA_PREFIX}/{kind}/{p.name}"
+    return path
+
+
+def media_path(url: str) -> Optional[Path]:
+    """Inverse of :func:`media_url`; ``None`` for anything it does not produce.
+
+    Only ``/media/...`` URLs and files directly inside ``MEDIA_ROOTS`` are
+    mapped, so a URL sent by a client can never name another server file.
+    """
+    if url.startswith(MEDIA_PREFIX + "/"):
+        kind, _, name = url[len(MEDIA_PREFIX) + 1:].partition("/")
+        name = Path(name).name
+        if kind == "blobs":
+            digest = name.split(".", 1)[0]
+            path = blobs.path(digest, name[len(digest):])
+            return path if blobs.digest_of(path) is not None else None
+        if kind in MEDIA_ROOTS and name:
+            return MEDIA_ROOTS[kind] / name
+        return None
+    path = Path(url).resolve()
+    if any(path.parent == root.resolve() for root in MEDIA_ROOTS.values()):
+        return path
+    return None
+
+
+def find_image(story_id: str) -> Optional[str]:
+    """Return the story's illustration if it has been generated."""
+    digest = blobs.resolve(_rendition_name(story_id))
+    if digest is not None:
+        return str(blobs.path(digest))
+    legacy = IMAGES_DIR / f"{Path(story_id).name}.jpeg"
+    return str(legacy) if legacy.exists() else None
+
+
+def find_thumbnails(story_id: str) -> Dict[int, str]:
+    """Return the story's generated thumbnails keyed by size."""
+    digests = {size: blobs.resolve(_rendition_name(story_id, size)) for size in THUMBNAIL_SIZES}
+    return {size: str(blobs.path(digest)) for size, digest in digests.items() if digest is not None}
+
+
+class _StreamReader(io.RawIOBase):
+    """Forward-only file object over a streamed HTTP body.
+
+    Pillow rewinds to sniff the format and re-reads header bytes, so the
+    first ``head`` bytes are kept; after that only unread data is buffered
+    and seeks may only move forward.
+    """
+
+    def __init__(self, chunks: Iterator[bytes], head: int = DOWNLOAD_CHUNK):
+        self._chunks = chunks
+        self._head = head
+        self._window = bytearray()
+        self._start = 0  # stream offset of self._window[0]
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("can only seek from the start")
+        if offset < self._start:
+            raise io.UnsupportedOperation("cannot seek back into discarded data")
+        self._pos = offset
+        return offset
+
+    def readinto(self, buffer) -> int:
+        want = len(buffer)
+        end = self._pos + want
+        while self._start + len(self._window) < end:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._window += chunk
+        begin = self._pos - self._start
+        with memoryview(self._window) as view:
+            data = view[begin:begin + want]
+            n = len(data)
+            buffer[:n] = data
+            data.release()
+        self._pos += n
+        if self._pos > self._head:
+            del self._window[:self._pos - self._start]
+            self._start = self._pos
+        return n
+
+
+def fetch_image(url: str) -> Image.Image:
+    """Download and decode an image as it streams in.
+
+    Pillow reads straight from the response, so the encoded file is never
+    held in memory as a whole next to the decoded image.
+    """
+    with http_client.stream("GET", url) as resp:
+        resp.raise_for_status()
+        img = Image.open(_StreamReader(resp.iter_bytes(DOWNLOAD_CHUNK)))
+        img.load()
+    return img
+
+
+def _renditions(img: Image.Image) -> List[Tuple[Optional[int], bytes]]:
+    """JPEG bytes of the full image (size ``None``) and its thumbnails.
+
+    Each thumbnail is scaled from the next larger one rather than from the
+    full image.
+    """
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    renditions = []
+    thumb = img
+    for size in [None, *sorted(THUMBNAIL_SIZES, reverse=True)]:
+        if size is not None:
+            thumb = ImageOps.contain(thumb, (size, size))
+        buf = io.BytesIO()
+        thumb.save(buf, format="JPEG")
+        renditions.append((size, buf.getvalue()))
+    return renditions
+
+
+def _bind_renditions(story_id: str, digests: Dict[Optional[int], str]) -> str:
+    # One append, so the image and its thumbnails appear together
+    blobs.bind((_rendition_name(story_id, size), digest) for size, digest in digests.items())
+    return str(blobs.path(digests[None]))
+
+
+def save_illustration(img: Image.Image, story_id: str) -> str:
+    """Encode the illustration and its thumbnails from one decoded image."""
+    return _bind_renditions(story_id, {size: blobs.put(data) for size, data in _renditions(img)})
+
+
+_placeholder_lock = threading.Lock()
+_placeholder_digests: Dict[Optional[int], str] = {}
+
+
+def save_placeholder(story_id: str) -> str:
+    """Give the story the shared placeholder without re-encoding it.
+
+    The placeholder renditions are encoded once per process; each offline
+    story then only binds its names to the same blobs.
+    """
+    with _placeholder_lock:
+        if not _placeholder_digests or not all(blobs.path(d).exists() for d in _placeholder_digests.values()):
+            placeholder = Image.new("RGB", PLACEHOLDER_SIZE, color="white")
+            _placeholder_digests.update({size: blobs.put(data) for size, data in _renditions(placeholder)})
+        digests = dict(_placeholder_digests)
+    return _bind_renditions(story_id, digests)
+
+
+def delete_illustration(story_id: str):
+    """Drop the story's references; :meth:`BlobStore.gc` frees the files."""
+    blobs.bind((_rendition_name(story_id, size), None) for size in [None, *THUMBNAIL_SIZES])
+
+
 def generate_image(prompt: str, story_text: str, story_id: str) -> str:
-    """Create an illustration using OpenAI. Falls back to a blank image."""
-    dest = IMAGES_DIR / f"{story_id}.jpeg"
-    try:
-        full_prompt = f"Illustration for this story: {story_text}"
-        if client:
-            resp = client.images.generate(model="dall-e-3", prompt=full_prompt, n=1, size="1024x1024")
-            url = resp.data[0].url
-            img_bytes = urlopen(url).read()
-            img = Image.open(BytesIO(img_bytes))
-            img.convert("RGB").save(dest, format="JPEG")
-        else:
-            raise RuntimeError("openai api_key missing")
-    except Exception:
-        # Offline or API failure - create simple placeholder
-        Image.new("RGB", (512, 512), color="white").save(dest, format="JPEG")
-    return str(dest)
+    """Create an illustration using OpenAI, or a blank image without an API key.
+
+    Runs at most once per story: an existing illustration is returned as is,
+    and the story only points at its blobs once they are fully written. API
+    and download errors propagate so :class:`IllustrationJobs` retries them.
+    """
+    existing = find_image(story_id)
+    if existing:
+        return existing
+    if client is None:
+        # Offline - link the shared placeholder
+        return save_placeholder(story_id)
+    full_prompt = f"Illustration for this story: {story_text}"
+    resp = client.images.generate(model="dall-e-3", prompt=full_prompt, n=1, size="1024x1024")
+    return save_illustration(fetch_image(resp.data[0].url), story_id)
 
 
 def add_story_badge(profile, story_id: str, img_url: str) -> dict:
-    """Add a badge entry and copy the image under badges directory."""
-    dest = BADGES_DIR / Path(img_url).name
-    shutil.copy(img_url, dest)
-    badge = {"type": "story_illustration", "story_id": story_id, "img_url": str(dest)}
+    """Add a badge that references the story's illustration blob.
+
+    Raises ``ValueError`` when the story has no blob yet and ``img_url`` is
+    not one of our media files.
+    """
+    digest = blobs.resolve(_rendition_name(story_id))
+    if digest is None:
+        # Illustration from before the blob store: import it once
+        path = media_path(img_url)
+        if path is None or not path.is_file():
+            raise ValueError(f"not a story illustration: {img_url!r}")
+        digest = blobs.put_file(path)
+    learner_id = getattr(profile, "learner_id", None) or "anonymous"
+    blobs.bind([(f"badges/{learner_id}/{story_id}", digest)])
+    badge = StoryBadge(
+        type="story_illustration",
+        story_id=story_id,
+        img_url=media_url(str(blobs.path(digest))),
+        blob=digest,
+    )
     history = getattr(profile, "history", None)
     if history is not None:
         if not hasattr(history, "story_badges"):
             history.story_badges = []
         history.story_badges.append(badge)
-    return badge
+    return badge.model_dump()
@@ -0,0 +1,64 @@
+"""Recording length from container headers, on the sample recordings in tests.
+
+For each file in ``tests/recordings`` this prints the probe's time and
+error, and the time of a full walk over every WebM cluster for
+comparison. It also shows the WPM ``score_reading`` reported before, when
+it estimated the duration from the passage at 130 WPM, for a child reading
+at ``--wpm`` for the length of the recording.
+
+    python -m benchmarks.bench_audio_probe --repeat 2000 --wpm 70
+"""
+
+import argparse
+import io
+import json
+import time
+from pathlib import Path
+
+from utils import audio_probe
+from utils.audio_probe import probe_duration
+
+RECORDINGS = Path(__file__).resolve().parents[1] / "tests" / "recordings"
+
+
+def timed(data: bytes, repeat: int) -> float:
+    f = io.BytesIO(data)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        probe_duration(f)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def estimated_wpm(words: int) -> int:
+    # score_reading's duration before it read the recording
+    duration = max(words / 130 * 60, words * 0.3, 5.0)
+    return min(int(words / duration * 60), 200)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--wpm", type=int, default=70, help="the simulated reader's real pace")
+    args = parser.parse_args()
+
+    durations = json.loads((RECORDINGS / "durations.json").read_text())
+    print(f"{'recording':26s} {'size':>7s} {'length':>7s} {'error':>7s} {'probe':>9s} {'full walk':>10s}"
+          f" {'WPM before':>11s} {'after':>6s}")
+    for name, seconds in durations.items():
+        data = (RECORDINGS / name).read_bytes()
+        probed = probe_duration(io.BytesIO(data))
+        probe_us = timed(data, args.repeat)
+        walk = "-"
+        if data.startswith(audio_probe.EBML_MAGIC):
+            tail, audio_probe.TAIL_BYTES = audio_probe.TAIL_BYTES, 0
+            try:
+                walk = f"{timed(data, max(1, args.repeat // 20)):.1f}us"
+            finally:
+                audio_probe.TAIL_BYTES = tail
+        words = round(seconds * args.wpm / 60)
+        print(f"{name:26s} {len(data) / 1024:6.1f}K {seconds:6.2f}s {(probed - seconds) * 1000:5.0f}ms"
+              f" {probe_us:7.1f}us {walk:>10s} {estimated_wpm(words):11d} {int(words / probed * 60):6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Audio scoring ingest: temp-file copy vs. passing the upload spool through.
+
+The "before" path is what ``score_reading`` used to do per recording: copy
+the upload into a ``NamedTemporaryFile``, reopen it by name, send it and
+unlink it. The "after" path hands ``transcription_file``'s named spool to
+the client. Both transcribe through ``LLMGateway`` against a local mock
+server with no latency, so the difference is the ingest overhead.
+
+Disk I/O is reported two ways: files opened per request, counted with an
+audit hook, and the process's ``rchar``/``wchar`` from ``/proc/self/io``,
+which also include the socket traffic to the mock server. Recordings over
+1 MB roll Starlette's spool over to disk on both paths.
+
+    python -m benchmarks.bench_audio_upload --requests 200 --size-kb 300
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import time
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile
+
+from fastapi import UploadFile
+from openai import AsyncOpenAI
+from starlette.datastructures import Headers
+
+from benchmarks.mock_openai import MockOpenAIServer
+from utils.audio import transcription_file
+from utils.llm import LLMGateway
+
+
+def make_upload(data: bytes) -> UploadFile:
+    # Starlette's form parser keeps up to 1 MB of each file in memory
+    spool = SpooledTemporaryFile(max_size=1024 * 1024)
+    spool.write(data)
+    spool.seek(0)
+    return UploadFile(spool, size=len(data), filename="blob", headers=Headers({"content-type": "audio/webm"}))
+
+
+async def legacy_transcribe(llm: LLMGateway, upload: UploadFile) -> str:
+    tmp = NamedTemporaryFile(delete=False, suffix=".webm")
+    try:
+        upload.file.seek(0)
+        shutil.copyfileobj(upload.file, tmp)
+        tmp.flush()
+        with open(tmp.name, "rb") as audio_fp:
+            return await llm.transcribe(audio_fp, model="whisper-1", language="en")
+    finally:
+        tmp.close()
+        os.unlink(tmp.name)
+
+
+async def spool_transcribe(llm: LLMGateway, upload: UploadFile) -> str:
+    return await llm.transcribe(transcription_file(upload), model="whisper-1", language="en")
+
+
+FILE_OPENS = [0]
+
+
+def count_file_opens(event: str, args: tuple) -> None:
+    if event == "open" and isinstance(args[0], (str, bytes, os.PathLike)):
+        FILE_OPENS[0] += 1
+
+
+def io_counters() -> dict:
+    try:
+        with open("/proc/self/io") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f)}
+    except OSError:
+        return {}
+
+
+async def timed(transcribe, llm: LLMGateway, data: bytes, requests: int):
+    await transcribe(llm, make_upload(data))  # warm the connection pool
+    opens, before = FILE_OPENS[0], io_counters()
+    start = time.perf_counter()
+    for _ in range(requests):
+        await transcribe(llm, make_upload(data))
+    elapsed = (time.perf_counter() - start) / requests
+    after = io_counters()
+    io = {k: (after[k] - before[k]) / requests / 1024 for k in ("rchar", "wchar")} if after else None
+    return elapsed, (FILE_OPENS[0] - opens) / requests, io
+
+
+async def run(requests: int, size_kb: int) -> None:
+    data = os.urandom(size_kb * 1024)
+    sys.addaudithook(count_file_opens)
+    with MockOpenAIServer(latency=0) as server:
+        llm = LLMGateway(AsyncOpenAI(api_key="bench", base_url=server.base_url))
+        for label, transcribe in (("before (temp file)", legacy_transcribe), ("after (spool)", spool_transcribe)):
+            elapsed, opens, io = await timed(transcribe, llm, data, requests)
+            line = f"{label:20s} {elapsed * 1000:7.2f} ms/request   {opens:4.1f} file opens"
+            if io is not None:
+                line += f"   read {io['rchar']:8.1f} KiB   written {io['wchar']:8.1f} KiB per request"
+            print(line)
+        await llm.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=300, help="recording size (a 30 s WebM/Opus clip is ~300 KB)")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.size_kb))
+
+
+if __name__ == "__main__":
+    main()
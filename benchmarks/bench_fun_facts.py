@@ -0,0 +1,49 @@
+"""Fun-facts option sampling: read-every-file vs. preloaded topic pools.
+
+The "before" path is what ``/fun_facts_options`` used to do per request:
+open each of the four topic files, strip every line into a list and pick
+one. The "after" paths sample from ``FunFacts`` pools, at random and from
+a learner's no-repeat deck.
+
+    python -m benchmarks.bench_fun_facts --requests 20000
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+from backend.services.fun_facts import DATA_DIR, TOPIC_FILES, FunFacts
+
+
+def legacy_options() -> dict:
+    options = {}
+    for name, fname in TOPIC_FILES.items():
+        with open(DATA_DIR / fname) as f:
+            lines = [ln.strip() for ln in f if ln.strip()]
+        options[name] = random.choice(lines) if lines else ""
+    return options
+
+
+def timed(fn, requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        fn(i)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    facts = FunFacts(Path(DATA_DIR))
+    facts.options()
+    print(f"before (read files)     {timed(lambda i: legacy_options(), args.requests):8.2f} us/request")
+    print(f"after (random)          {timed(lambda i: facts.options(), args.requests):8.2f} us/request")
+    print(f"after (no-repeat deck)  {timed(lambda i: facts.options(1, f'learner-{i % 100}'), args.requests):8.2f} us/request")
+    print(f"after (batch k=5)       {timed(lambda i: facts.options(5, f'learner-{i % 100}'), args.requests):8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Fun-facts summary tail latency: a completion per request vs. FactSummaries.
+
+Learners draw topics from the fun-facts files with a Zipf-like skew and
+have seen them 1-8 times. The "before" path asks the model for every
+request, as a plain completion endpoint would. The "after" path goes
+through ``FactSummaries`` with its intro-depth cache warmed first, as the
+backend does at startup. Both talk to the local mock OpenAI server, which
+takes ``--latency`` seconds per completion.
+
+    python -m benchmarks.bench_fun_facts_summary --requests 400 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from openai import AsyncOpenAI
+
+from backend.services.fact_summaries import SUMMARY_MAX_TOKENS, FactSummaries, build_prompt, depth_bucket
+from backend.services.fun_facts import FunFacts
+from benchmarks.mock_openai import MockOpenAIServer
+from utils.llm import LLMGateway
+from utils.llm_cache import ResponseCache
+
+
+def workload(requests: int, seed: int = 7):
+    topics = [topic for pool in FunFacts().pools.values() for topic in pool.lines()]
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(topics))]
+    picks = rng.choices(topics, weights, k=requests)
+    counts = rng.choices(range(1, 9), [8, 4, 3, 2, 2, 1, 1, 1], k=requests)
+    return topics, list(zip(picks, counts))
+
+
+def percentiles(samples):
+    qs = statistics.quantiles(samples, n=100)
+    return f"p50 {qs[49] * 1000:7.1f} ms  p95 {qs[94] * 1000:7.1f} ms  p99 {qs[98] * 1000:7.1f} ms"
+
+
+async def drive(fn, requests, concurrency):
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(topic, count):
+        async with slots:
+            start = time.perf_counter()
+            await fn(topic, count)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(topic, count) for topic, count in requests))
+    return latencies
+
+
+async def run(args):
+    topics, requests = workload(args.requests)
+    with MockOpenAIServer(latency=args.latency) as server:
+        llm = LLMGateway(AsyncOpenAI(api_key="bench", base_url=server.base_url), cache=ResponseCache())
+
+        async def uncached(topic, count):
+            await llm.chat(build_prompt(topic, depth_bucket(count)), max_tokens=SUMMARY_MAX_TOKENS)
+
+        before = await drive(uncached, requests, args.concurrency)
+        calls = server.calls
+        print(f"before (model per request)  {percentiles(before)}  model calls {calls}")
+
+        summaries = FactSummaries(llm)
+        start = time.perf_counter()
+        await summaries.warm(topics, concurrency=args.concurrency)
+        warmed = server.calls - calls
+        print(f"warm-up: {warmed} intro summaries in {time.perf_counter() - start:.1f}s")
+        after = await drive(summaries.summary, requests, args.concurrency)
+        print(f"after (cached + warmed)     {percentiles(after)}  model calls {server.calls - calls - warmed}")
+        await llm.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
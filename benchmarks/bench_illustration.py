@@ -0,0 +1,77 @@
+"""Illustration download cost: read-then-decode vs. streaming transcode.
+
+Both paths fetch the same 1024x1024 PNG from the local mock OpenAI server.
+The "before" path is what ``generate_image`` used to do: ``urlopen().read()``
+on a fresh connection, ``BytesIO``, a full decode, ``convert("RGB")`` and a
+JPEG save. The "after" path is ``fetch_image`` over the pooled client plus
+``save_illustration``, which also writes the accomplishments thumbnails.
+Peak memory is what ``tracemalloc`` sees, i.e. Python-side buffers.
+
+    python -m benchmarks.bench_illustration --images 20
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+from urllib.request import urlopen
+
+from PIL import Image
+from openai import OpenAI
+
+from backend.services import story_forge
+from backend.services.blob_store import BlobStore
+from benchmarks.mock_openai import MockOpenAIServer
+
+
+def legacy_download(url: str, dest: Path) -> None:
+    img_bytes = urlopen(url).read()
+    img = Image.open(BytesIO(img_bytes))
+    img.convert("RGB").save(dest, format="JPEG")
+
+
+def streaming_only(url: str, dest: Path) -> None:
+    story_forge.fetch_image(url).convert("RGB").save(dest, format="JPEG")
+
+
+def streaming_download(url: str, story_id: str) -> None:
+    story_forge.save_illustration(story_forge.fetch_image(url), story_id)
+
+
+def measure(fn, urls):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i, url in enumerate(urls):
+        fn(url, i)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / len(urls), peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=20)
+    args = parser.parse_args()
+
+    with MockOpenAIServer(latency=0) as server, tempfile.TemporaryDirectory() as tmp:
+        client = OpenAI(api_key="bench", base_url=server.base_url)
+        urls = [
+            client.images.generate(model="dall-e-3", prompt="bench", n=1, size="1024x1024").data[0].url
+            for _ in range(args.images)
+        ]
+        story_forge.blobs = BlobStore(Path(tmp) / "blobs")
+        streaming_download(urls[0], "warmup")  # server encodes its PNG once
+
+        before, before_peak = measure(lambda url, i: legacy_download(url, Path(tmp) / f"legacy-{i}.jpeg"), urls)
+        stream, stream_peak = measure(lambda url, i: streaming_only(url, Path(tmp) / f"stream-{i}.jpeg"), urls)
+        after, after_peak = measure(lambda url, i: streaming_download(url, f"story-{i}"), urls)
+        print(f"before (read + decode)  {before * 1000:8.1f} ms/image  peak {before_peak / 2**20:6.2f} MiB")
+        print(f"after (stream only)     {stream * 1000:8.1f} ms/image  peak {stream_peak / 2**20:6.2f} MiB")
+        print(f"after (stream + thumbs) {after * 1000:8.1f} ms/image  peak {after_peak / 2**20:6.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Journal write cost at scale: rewrite-the-JSON-file vs. the JSONL log.
+
+The "before" path is what journal.py used to do per entry: load every
+entry, append one, rewrite the file with ``indent=2`` and filter all
+entries for the user's count. It is timed for a few operations on a file
+that already holds ``--entries`` records. The "after" path writes all
+``--entries`` records through ``RecordLog`` and then adds reflections.
+
+    python -m benchmarks.bench_journal --entries 100000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from backend.services.record_log import RecordLog
+
+USERS = 500
+
+
+def record(i: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": f"user-{i % USERS}",
+        "date": datetime.utcnow().isoformat(),
+        "entry": f"Today I learned fact number {i} about volcanoes and it was fun.",
+        "reflection": "",
+    }
+
+
+def legacy_create(path: Path, rec: dict) -> int:
+    with open(path) as f:
+        entries = json.load(f)
+    entries.append(rec)
+    with open(path, "w") as f:
+        json.dump(entries, f, indent=2)
+    return len([e for e in entries if e["user_id"] == rec["user_id"]])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--legacy-ops", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / "journal_entries.json"
+        with open(legacy, "w") as f:
+            json.dump([record(i) for i in range(args.entries)], f, indent=2)
+        start = time.perf_counter()
+        for i in range(args.legacy_ops):
+            legacy_create(legacy, record(i))
+        per_op = (time.perf_counter() - start) / args.legacy_ops
+        print(f"before (rewrite JSON)  {per_op * 1000:9.2f} ms/entry at {args.entries} entries")
+
+        log = RecordLog(Path(tmp) / "journal_entries.jsonl")
+        records = [record(i) for i in range(args.entries)]
+        start = time.perf_counter()
+        for rec in records:
+            log.append(rec)
+            log.count(rec["user_id"])
+        elapsed = time.perf_counter() - start
+        print(f"after (JSONL log)      {elapsed / args.entries * 1000:9.3f} ms/entry "
+              f"({args.entries} entries in {elapsed:.1f}s)")
+
+        updates = records[:1000]
+        start = time.perf_counter()
+        for rec in updates:
+            log.update(rec["id"], reflection="I felt proud.")
+        elapsed = time.perf_counter() - start
+        print(f"reflection update      {elapsed / len(updates) * 1000:9.3f} ms/update")
+
+        start = time.perf_counter()
+        reopened = RecordLog(log.path)
+        assert reopened.count("user-0") == args.entries // USERS
+        print(f"cold index rebuild     {(time.perf_counter() - start) * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Concurrent-request throughput: sync OpenAI client vs. the async gateway.
+
+Two tiny FastAPI apps expose the same ``async def`` route. The "before" route
+calls the blocking ``OpenAI`` client like app.py used to; the "after" route
+awaits ``LLMGateway.chat``. Both talk to a local mock OpenAI server that
+sleeps ``--latency`` seconds per call.
+
+    python -m benchmarks.bench_llm_gateway --requests 50 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from openai import AsyncOpenAI, OpenAI
+
+from benchmarks.mock_openai import MockOpenAIServer
+from utils.llm import LLMGateway
+
+
+def build_blocking_app(base_url: str) -> FastAPI:
+    client = OpenAI(api_key="bench", base_url=base_url)
+    app = FastAPI()
+
+    @app.post("/api/get-idea-spark")
+    async def spark():
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "spark"}],
+            max_tokens=50,
+        )
+        return {"spark": response.choices[0].message.content.strip()}
+
+    return app
+
+
+def build_gateway_app(base_url: str) -> FastAPI:
+    llm = LLMGateway(AsyncOpenAI(api_key="bench", base_url=base_url))
+    app = FastAPI()
+
+    @app.post("/api/get-idea-spark")
+    async def spark():
+        return {"spark": await llm.chat("spark", max_tokens=50)}
+
+    return app
+
+
+async def drive(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(http.post("/api/get-idea-spark") for _ in range(requests))
+        )
+        elapsed = time.perf_counter() - start
+    assert all(r.status_code == 200 for r in responses)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with MockOpenAIServer(latency=args.latency) as server:
+        for label, factory in (("before (sync client)", build_blocking_app),
+                               ("after (LLMGateway)", build_gateway_app)):
+            elapsed = asyncio.run(drive(factory(server.base_url), args.requests))
+            print(f"{label:22s} {args.requests} requests in {elapsed:6.2f}s "
+                  f"-> {args.requests / elapsed:7.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Multi-worker throughput of the SQLite session store.
+
+Each worker process plays a uvicorn worker: it repeatedly loads a session,
+updates it and writes it back, the way the app.py handlers do. The
+"write-through" run commits after every write; "write-behind" lets the
+background flusher batch commits. After all workers finish, one process
+reads every session back to check that no worker's state was lost.
+
+    python -m benchmarks.bench_session_store --workers 4 --ops 2000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from utils.session_store import InMemorySessionStore, SQLiteSessionStore
+
+SESSIONS_PER_WORKER = 50
+
+
+def session_payload(session_id: str, step: int) -> str:
+    return json.dumps({
+        "session_id": session_id,
+        "thread_id": session_id,
+        "current_topic": "Space Exploration and Astronauts",
+        "reading_level": "2nd_grade_proficient",
+        "stories_completed": step,
+        "current_wpm": 80 + step % 40,
+    })
+
+
+def run_worker(store, worker: int, ops: int, write_through: bool) -> None:
+    for step in range(ops):
+        session_id = f"w{worker}-s{step % SESSIONS_PER_WORKER}"
+        store.get("sessions", session_id)
+        store.put("sessions", session_id, session_payload(session_id, step))
+        if write_through:
+            store.flush()
+    store.close()
+
+
+def sqlite_worker(path: str, worker: int, ops: int, write_through: bool) -> None:
+    run_worker(SQLiteSessionStore(path), worker, ops, write_through)
+
+
+def bench_sqlite(workers: int, ops: int, write_through: bool) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.sqlite3")
+        SQLiteSessionStore(path).close()  # create the schema once
+        processes = [
+            multiprocessing.Process(target=sqlite_worker, args=(path, w, ops, write_through))
+            for w in range(workers)
+        ]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        reader = SQLiteSessionStore(path)
+        expected = workers * min(ops, SESSIONS_PER_WORKER)
+        assert reader.count("sessions") == expected, "a worker's sessions were lost"
+        reader.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=2000, help="updates per worker")
+    args = parser.parse_args()
+    total = args.workers * args.ops
+
+    start = time.perf_counter()
+    run_worker(InMemorySessionStore(), 0, args.ops, write_through=False)
+    elapsed = time.perf_counter() - start
+    print(f"{'in-memory (1 process)':28s} {args.ops} updates in {elapsed:6.2f}s "
+          f"-> {args.ops / elapsed:9.0f} ops/s")
+
+    for label, write_through in (("sqlite write-through", True), ("sqlite write-behind", False)):
+        elapsed = bench_sqlite(args.workers, args.ops, write_through)
+        print(f"{label + f' ({args.workers} procs)':28s} {total} updates in {elapsed:6.2f}s "
+              f"-> {total / elapsed:9.0f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Read-aloud speech-to-text: latency and throughput per backend.
+
+Each backend transcribes the sample recordings in ``tests/recordings``,
+first one at a time (latency) and then ``--concurrency`` at once
+(throughput). While they run, a ticker measures the event loop's lag, to
+show the server stays responsive. The "openai" backend talks to a local
+mock Whisper that takes ``--latency`` seconds, so its numbers are the
+network path's overhead. The "local" backend runs faster-whisper's
+``--model`` for real and is skipped when faster-whisper is not installed.
+
+    python -m benchmarks.bench_stt_backends --requests 20 --concurrency 4 --workers 2
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import statistics
+import time
+from pathlib import Path
+
+from fastapi import UploadFile
+from openai import AsyncOpenAI
+
+from benchmarks.mock_openai import MockOpenAIServer
+from utils.llm import LLMGateway
+from utils.readaloud import LocalBackend, OpenAIBackend, SpeechBackend
+
+RECORDINGS = Path(__file__).resolve().parents[1] / "tests" / "recordings"
+
+
+def uploads(count: int):
+    durations = json.loads((RECORDINGS / "durations.json").read_text())
+    files = [(name, (RECORDINGS / name).read_bytes(), seconds) for name, seconds in durations.items()]
+    for i in range(count):
+        name, data, seconds = files[i % len(files)]
+        yield UploadFile(io.BytesIO(data), size=len(data), filename=name), seconds
+
+
+async def measure(backend: SpeechBackend, requests: int, concurrency: int) -> None:
+    lags = []
+
+    async def ticker():
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+
+    start = time.perf_counter()
+    await backend.start()
+    ready = time.perf_counter() - start
+    await backend.transcribe(next(uploads(1))[0])  # first request warms up both paths
+
+    tick = asyncio.create_task(ticker())
+    latencies, audio = [], 0.0
+    for upload, seconds in uploads(requests):
+        start = time.perf_counter()
+        await backend.transcribe(upload)
+        latencies.append(time.perf_counter() - start)
+        audio += seconds
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(upload):
+        async with slots:
+            await backend.transcribe(upload)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(upload) for upload, _ in uploads(requests)))
+    elapsed = time.perf_counter() - start
+    tick.cancel()
+    await backend.close()
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{backend.name:7s} ready {ready:6.2f}s  p50 {statistics.median(latencies) * 1000:7.1f}ms"
+          f"  p95 {p95 * 1000:7.1f}ms  RTF {sum(latencies) / audio:6.3f}"
+          f"  {requests / elapsed:6.1f} req/s  loop lag max {max(lags, default=0) * 1000:5.1f}ms")
+
+
+async def run(args) -> None:
+    with MockOpenAIServer(latency=args.latency, text="The brave penguin slid across the ice.") as server:
+        llm = LLMGateway(AsyncOpenAI(api_key="bench", base_url=server.base_url))
+        await measure(OpenAIBackend(llm, cache_ttl=None), args.requests, args.concurrency)
+        await llm.aclose()
+    if not LocalBackend.available():
+        print("local   skipped: pip install faster-whisper to benchmark the offline backend")
+        return
+    await measure(LocalBackend(args.model, workers=args.workers, threads=args.threads), args.requests, args.concurrency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.8, help="mock Whisper seconds per call")
+    parser.add_argument("--model", default="base.en", help="faster-whisper model for the local backend")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=2, help="CPU threads per local worker")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
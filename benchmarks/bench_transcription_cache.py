@@ -0,0 +1,88 @@
+"""Retried read-aloud submissions with and without the transcription cache.
+
+``--learners`` kids each submit one recording, and the frontend sends it
+``--retries`` more times: some while the first request is still running (a
+double submit) and the rest after it finished (a retry after a network
+hiccup). Every submission transcribes through ``LLMGateway`` the way
+``transcribe_reading`` does, against a mock Whisper that takes
+``--latency`` seconds. The run reports Whisper calls and how long the
+repeats waited, then the cost of hashing a recording of each size.
+
+    python -m benchmarks.bench_transcription_cache --learners 20 --retries 3 --latency 1.0
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import time
+
+from openai import AsyncOpenAI
+
+from benchmarks.mock_openai import MockOpenAIServer
+from utils.llm import LLMGateway
+from utils.llm_cache import ResponseCache, file_digest
+
+
+async def submit(llm: LLMGateway, data: bytes, cache_ttl) -> float:
+    start = time.perf_counter()
+    await llm.transcribe_words(
+        ("recording.webm", io.BytesIO(data), "audio/webm"),
+        model="whisper-1",
+        cache_ttl=cache_ttl,
+        language="en",
+        temperature=0.0,
+    )
+    return time.perf_counter() - start
+
+
+async def learner(llm: LLMGateway, data: bytes, retries: int, latency: float, cache_ttl):
+    # Half the repeats are double submits, the rest come back later
+    doubles = retries // 2
+    first, *together = await asyncio.gather(*(submit(llm, data, cache_ttl) for _ in range(1 + doubles)))
+    await asyncio.sleep(latency / 2)
+    later = [await submit(llm, data, cache_ttl) for _ in range(retries - doubles)]
+    return together + later
+
+
+async def run(args, cached: bool) -> None:
+    with MockOpenAIServer(latency=args.latency, text="The brave penguin slid across the ice.") as server:
+        llm = LLMGateway(
+            AsyncOpenAI(api_key="bench", base_url=server.base_url),
+            transcripts=ResponseCache(max_entries=256) if cached else None,
+        )
+        recordings = [os.urandom(args.size_kb * 1024) for _ in range(args.learners)]
+        start = time.perf_counter()
+        repeats = await asyncio.gather(*(
+            learner(llm, data, args.retries, args.latency, 3600) for data in recordings
+        ))
+        elapsed = time.perf_counter() - start
+        waits = sorted(w * 1000 for waits in repeats for w in waits)
+        await llm.aclose()
+    label = "after" if cached else "before"
+    print(f"{label:7s} {server.calls:6d} calls {elapsed:6.2f}s total   repeat wait"
+          f" p50 {statistics.median(waits):7.1f}ms  max {waits[-1]:7.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--learners", type=int, default=20)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=1.0, help="mock Whisper seconds per call")
+    parser.add_argument("--size-kb", type=int, default=300, help="recording size (a 30 s WebM/Opus clip is ~300 KB)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args, cached=False))
+    asyncio.run(run(args, cached=True))
+    for size_kb in (300, 1024, 25 * 1024):
+        data = io.BytesIO(os.urandom(size_kb * 1024))
+        repeat = max(1, 20_000 // size_kb)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            file_digest(data)
+        print(f"hash {size_kb:6d} KB  {(time.perf_counter() - start) / repeat * 1000:6.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
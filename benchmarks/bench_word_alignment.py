@@ -0,0 +1,95 @@
+"""Read-aloud scoring: banded word alignment against the old difflib score.
+
+Passages are built from the topic lists in ``backend/data``. Each simulated
+reading drops, swaps and adds words at ``--error-rate``, repeats a few
+lines, and every third reading stops early. For each passage length this
+prints the time per reading and the mean error in correct words reported
+by the old score (``max(difflib ratio, same-position matches)``) and by
+``align_reading``.
+
+    python -m benchmarks.bench_word_alignment --words 1000 2000 4000 --readings 20
+"""
+
+import argparse
+import difflib
+import random
+import time
+from pathlib import Path
+
+from utils.word_alignment import align_reading
+
+DATA = Path(__file__).resolve().parents[1] / "backend" / "data"
+
+
+def passage(rng: random.Random, words: int) -> str:
+    lines = [line for f in sorted(DATA.glob("*Topics.txt")) + sorted(DATA.glob("Historical*.txt"))
+             for line in f.read_text().splitlines() if line.strip()]
+    text = []
+    while len(text) < words:
+        text.extend(rng.choice(lines).split())
+    return " ".join(text[:words])
+
+
+def reading(rng: random.Random, text: str, error_rate: float, stop: bool):
+    """A simulated transcription of ``text`` and how many words it got right."""
+    words = text.split()
+    if stop:
+        words = words[: len(words) * 2 // 3]
+    spoken, correct, i = [], 0, 0
+    while i < len(words):
+        roll = rng.random()
+        if roll < error_rate / 3:
+            pass  # skipped
+        elif roll < error_rate * 2 / 3:
+            spoken.append("uhh" + words[i])  # misread
+        elif roll < error_rate:
+            spoken += [words[i], "okay"]
+            correct += 1
+        else:
+            spoken.append(words[i])
+            correct += 1
+        if rng.random() < 0.005 and i > 10:
+            spoken += words[i - 10:i + 1]  # went back over a line
+        i += 1
+    return " ".join(spoken), correct
+
+
+def old_score(target: str, transcription: str) -> int:
+    # score_reading before the alignment, as correct words of the passage
+    a = [w.lower().strip('.,!?;:"()') for w in target.split()]
+    b = [w.lower().strip('.,!?;:"()') for w in transcription.split()]
+    similarity = difflib.SequenceMatcher(None, a, b).ratio()
+    position = sum(x == y for x, y in zip(a, b)) / len(a)
+    return round(max(similarity, position) * len(a))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[1000, 2000, 4000])
+    parser.add_argument("--readings", type=int, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'words':>6s} {'difflib':>10s} {'error':>7s} {'alignment':>10s} {'error':>7s} {'per word':>9s}")
+    for words in args.words:
+        cases = []
+        for n in range(args.readings):
+            text = passage(rng, words)
+            cases.append((text, *reading(rng, text, args.error_rate, stop=n % 3 == 2)))
+
+        results = {}
+        for name, score in (("difflib", old_score),
+                            ("alignment", lambda t, s: align_reading(t, s)["words_correct"])):
+            start = time.perf_counter()
+            scores = [score(text, spoken) for text, spoken, _ in cases]
+            elapsed = (time.perf_counter() - start) / len(cases) * 1000
+            error = sum(abs(s - c) for s, (_, _, c) in zip(scores, cases)) / len(cases) / words
+            results[name] = elapsed, error
+        (old_ms, old_err), (new_ms, new_err) = results["difflib"], results["alignment"]
+        print(f"{words:6d} {old_ms:8.1f}ms {old_err:6.1%} {new_ms:8.1f}ms {new_err:6.1%}"
+              f" {new_ms / words * 1000:7.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Tiny local stand-in for the OpenAI REST API used by the benchmarks.
+
+Each endpoint sleeps for ``latency`` seconds before answering so the
+benchmarks can show how the app behaves while the model is "thinking".
+Streaming chat requests spread the same latency across the words of the
+reply, so the first token arrives early.
+Image generations return a URL on the same server, which serves a
+noisy 1024x1024 PNG the size of a real DALL·E download. Transcriptions
+carry word timestamps as ``verbose_json`` would.
+Point a client at it with ``base_url=server.base_url``.
+"""
+
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_TEXT = (
+    "The brave penguin slid across the ice. She found a glowing shell. "
+    "Where did it come from?"
+)
+
+
+def _timed_words(text: str) -> list:
+    """Word timestamps for ``text`` read at about 150 WPM, pausing at sentence ends."""
+    words, t = [], 0.6
+    for word in text.split():
+        words.append({"word": word.strip(".,!?"), "start": round(t, 2), "end": round(t + 0.32, 2)})
+        t += 0.32 + (0.9 if word[-1] in ".!?" else 0.08)
+    return words
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_chat(self, request: dict) -> None:
+        server = self.server
+        words = server.text.split(" ")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for i, word in enumerate(words):
+            time.sleep(server.latency / len(words))
+            chunk = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "mock"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else " " + word},
+                    "finish_reason": None,
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def do_GET(self):
+        if not self.path.startswith("/files/"):
+            self.send_error(404)
+            return
+        data = self.server.image_png()
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        for start in range(0, len(data), 16 * 1024):
+            self.wfile.write(data[start:start + 16 * 1024])
+
+    def do_POST(self):
+        raw = self._body()
+        server = self.server
+        with server.lock:
+            server.calls += 1
+
+        if self.path.endswith("/chat/completions"):
+            request = json.loads(raw or b"{}")
+            if request.get("stream"):
+                self._stream_chat(request)
+                return
+
+        time.sleep(server.latency)
+        if self.path.endswith("/chat/completions"):
+            request = json.loads(raw or b"{}")
+            self._send_json({
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "mock"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": server.text},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            })
+        elif self.path.endswith("/embeddings"):
+            request = json.loads(raw or b"{}")
+            texts = request.get("input", [])
+            if isinstance(texts, str):
+                texts = [texts]
+            self._send_json({
+                "object": "list",
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": [0.0] * server.dim}
+                    for i in range(len(texts))
+                ],
+                "model": request.get("model", "mock"),
+                "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            })
+        elif self.path.endswith("/images/generations"):
+            host, port = server.server_address[:2]
+            self._send_json({
+                "created": int(time.time()),
+                "data": [{"url": f"http://{host}:{port}/files/{uuid.uuid4().hex}.png"}],
+            })
+        elif self.path.endswith("/audio/transcriptions"):
+            words = _timed_words(server.text)
+            self._send_json({
+                "text": server.text,
+                "language": "english",
+                "duration": words[-1]["end"] + 0.5 if words else 0.0,
+                "words": words,
+            })
+        elif self.path.endswith("/threads"):
+            self._send_json({
+                "id": f"thread_{uuid.uuid4().hex}",
+                "object": "thread",
+                "created_at": int(time.time()),
+                "metadata": {},
+            })
+        elif self.path.endswith("/assistants"):
+            request = json.loads(raw or b"{}")
+            self._send_json({
+                "id": "asst_mock",
+                "object": "assistant",
+                "created_at": int(time.time()),
+                "model": request.get("model", "mock"),
+                "name": request.get("name"),
+                "instructions": request.get("instructions"),
+                "tools": [],
+                "metadata": {},
+            })
+        else:
+            self.send_error(404)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+    _png = None
+
+    def image_png(self) -> bytes:
+        if self._png is None:
+            from PIL import Image
+
+            # Random pixels compress like a detailed illustration (~3 MB)
+            img = Image.frombytes("RGB", (1024, 1024), os.urandom(1024 * 1024 * 3))
+            buf = io.BytesIO()
+            img.save(buf, format="PNG")
+            self._png = buf.getvalue()
+        return self._png
+
+
+class MockOpenAIServer:
+    """Run the mock API on a background thread (use as a context manager)."""
+
+    def __init__(self, latency: float = 0.2, text: str = DEFAULT_TEXT, dim: int = 8):
+        self.httpd = _Server(("127.0.0.1", 0), _Handler)
+        self.httpd.latency = latency
+        self.httpd.text = text
+        self.httpd.dim = dim
+        self.httpd.calls = 0
+        self.httpd.lock = threading.Lock()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def calls(self) -> int:
+        return self.httpd.calls
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -1,11 +1,23 @@
 from jinja2 import Template
 import os
+import pathlib
+import sys
 import sendgrid
 
-def compile_stats():
-    # pull last-week snapshots from Pinecone
-    # compute avg WPM, most-liked activities, mood trend
-    ...
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from utils.snapshot_archive import SnapshotArchive
+
+def compile_stats(learner_id: str = "karl", days: int = 7):
+    # last-week snapshots come from the local columnar archive written by app.py
+    archive = SnapshotArchive(os.getenv("SNAPSHOT_ARCHIVE_DIR", "snapshot_archive"))
+    week = archive.last_days(learner_id, days)
+    activities = week.activity_counts()
+    return {
+        **week.summary(),
+        "wpm_by_day": week.wpm_by_day(),
+        "mood_by_topic": week.mood_by_topic(),
+        "top_activities": sorted(activities, key=activities.get, reverse=True)[:3],
+    }
 
 def send_email(report_html: str):
     sg = sendgrid.SendGridAPIClient(os.environ["SENDGRID_KEY"])
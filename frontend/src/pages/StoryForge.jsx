@@ -8,6 +8,8 @@ import { addStoryImage } from '../utils/storyImages';
 export default function StoryForge({ onBack }) {
   const [prompt, setPrompt] = useState('');
   const [story, setStory] = useState('');
+  // Sent with the story so retrying a failed submit does not save it twice
+  const [storyId, setStoryId] = useState(() => crypto.randomUUID());
   const [imageUrl, setImageUrl] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
@@ -26,6 +28,15 @@ export default function StoryForge({ onBack }) {
     }
   };
 
+  const waitForIllustration = async (jobId) => {
+    for (;;) {
+      const { data } = await axios.get(`/api/illustration-status/${jobId}`);
+      if (data.status === 'done') return `/api${data.img_url}`;
+      if (data.status === 'failed') throw new Error(data.error || 'Illustration failed');
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+  };
+
   const submitStory = async () => {
     if (!story.trim()) return;
     
@@ -36,9 +47,11 @@ export default function StoryForge({ onBack }) {
         user_id: 'demo',
         prompt,
         story_text: story,
+        story_id: storyId,
       });
-      setImageUrl(data.img_url);
-      addStoryImage(data.img_url);
+      const imgUrl = await waitForIllustration(data.job_id);
+      setImageUrl(imgUrl);
+      addStoryImage(imgUrl);
     } catch (e) {
       console.error('Failed to submit story', e);
       setError('Failed to submit your story. Please try again.');
@@ -58,6 +71,7 @@ export default function StoryForge({ onBack }) {
             onClick={() => { 
               setImageUrl(null); 
               setStory(''); 
+              setStoryId(crypto.randomUUID());
               setError('');
               fetchPrompt();
             }}
@@ -156,7 +170,7 @@ export default function StoryForge({ onBack }) {
           <textarea
             className="w-full h-64 p-4 border border-slate-300 rounded-lg resize-none focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-blue-500 text-slate-700"
             value={story}
-            onChange={(e) => setStory(e.target.value)}
+            onChange={(e) => { setStory(e.target.value); setStoryId(crypto.randomUUID()); }}
             placeholder="Start writing your story here... Be creative and have fun!"
             disabled={loading}
           />
@@ -0,0 +1,141 @@
+"""Regenerate the sample recordings used by the audio probe tests and benchmark.
+
+Each file is a real, playable Opus recording of silence, laid out the way
+a browser or encoder writes it:
+
+* ``chrome_*.webm``: MediaRecorder in Chrome, with an unknown-size segment
+  and clusters and no Duration element.
+* ``ffmpeg_*.webm``: a finished file with Duration, sized clusters and
+  BlockGroups.
+* ``firefox_*.ogg``: MediaRecorder in Firefox, Ogg Opus with a 312-sample
+  pre-skip.
+
+``durations.json`` maps each file to its length in seconds.
+
+    python tests/recordings/make_recordings.py
+"""
+
+import json
+import struct
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+FRAME_MS = 20
+SILENT_FRAME = b"\xf8\xff\xfe"  # Opus TOC for one 20 ms CELT frame, then silence
+OPUS_HEAD = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, 312, 48000, 0, 0)
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+RECORDINGS = {
+    "chrome_short.webm": ("chrome", 3.2),
+    "chrome_sentence.webm": ("chrome", 11.46),
+    "chrome_passage.webm": ("chrome", 47.8),
+    "chrome_long_passage.webm": ("chrome", 96.0),
+    "ffmpeg_passage.webm": ("ffmpeg", 24.04),
+    "firefox_sentence.ogg": ("firefox", 8.5),
+    "firefox_passage.ogg": ("firefox", 61.24),
+}
+
+
+# -- WebM --------------------------------------------------------------------
+
+def _size(n: int) -> bytes:
+    length = 1
+    while n >= (1 << (7 * length)) - 1:
+        length += 1
+    return ((1 << (7 * length)) | n).to_bytes(length, "big")
+
+
+def element(element_id: int, payload: bytes, unknown_size: bool = False) -> bytes:
+    head = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    return head + (UNKNOWN_SIZE if unknown_size else _size(len(payload))) + payload
+
+
+def uint(element_id: int, value: int) -> bytes:
+    return element(element_id, value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big"))
+
+
+def text(element_id: int, value: str) -> bytes:
+    return element(element_id, value.encode())
+
+
+def webm(seconds: float, style: str) -> bytes:
+    frames = round(seconds * 1000 / FRAME_MS)
+    header = element(0x1A45DFA3, uint(0x4286, 1) + uint(0x42F7, 1) + uint(0x42F2, 4)
+                     + uint(0x42F3, 8) + text(0x4282, "webm") + uint(0x4287, 4) + uint(0x4285, 2))
+    info = uint(0x2AD7B1, 1_000_000) + text(0x4D80, style) + text(0x5741, style)
+    if style == "ffmpeg":
+        info += element(0x4489, struct.pack(">d", frames * FRAME_MS))
+    audio = element(0xB5, struct.pack(">f", 48000.0)) + uint(0x9F, 1)
+    track = (uint(0xD7, 1) + uint(0x73C5, 1) + uint(0x83, 2) + text(0x86, "A_OPUS")
+             + element(0x63A2, OPUS_HEAD) + uint(0x56AA, 6_500_000) + element(0xE1, audio))
+    body = element(0x1549A966, info) + element(0x1654AE6B, element(0xAE, track))
+
+    cluster_frames = 250 if style == "chrome" else 100  # 5 s and 2 s clusters
+    for first in range(0, frames, cluster_frames):
+        blocks = b""
+        for i in range(first, min(first + cluster_frames, frames)):
+            block = b"\x81" + struct.pack(">hB", (i - first) * FRAME_MS, 0x80) + SILENT_FRAME
+            if style == "chrome":
+                blocks += element(0xA3, block)
+            else:
+                blocks += element(0xA0, element(0xA1, block[:3] + b"\x00" + SILENT_FRAME) + uint(0x9B, FRAME_MS))
+        cluster = uint(0xE7, first * FRAME_MS) + blocks
+        body += element(0x1F43B675, cluster, unknown_size=style == "chrome")
+    return header + element(0x18538067, body, unknown_size=style == "chrome")
+
+
+# -- Ogg ---------------------------------------------------------------------
+
+def _crc_table():
+    table = []
+    for i in range(256):
+        crc = i << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7 if crc & 0x80000000 else crc << 1) & 0xFFFFFFFF
+        table.append(crc)
+    return table
+
+
+CRC_TABLE = _crc_table()
+
+
+def _crc(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ CRC_TABLE[((crc >> 24) ^ byte) & 0xFF]
+    return crc
+
+
+def page(packets, granule: int, sequence: int, flags: int = 0) -> bytes:
+    lacing = b""
+    for packet in packets:
+        lacing += b"\xff" * (len(packet) // 255) + bytes([len(packet) % 255])
+    head = struct.pack("<4sBBqIIIB", b"OggS", 0, flags, granule, 0x4B41524C, sequence, 0, len(lacing))
+    data = head + lacing + b"".join(packets)
+    return data[:22] + struct.pack("<I", _crc(data)) + data[26:]
+
+
+def ogg(seconds: float) -> bytes:
+    frames = round(seconds * 1000 / FRAME_MS)
+    tags = b"OpusTags" + struct.pack("<I", 7) + b"Firefox" + struct.pack("<I", 0)
+    pages = [page([OPUS_HEAD], 0, 0, flags=2), page([tags], 0, 1)]
+    granule = 312
+    for first in range(0, frames, 50):  # one page per second
+        count = min(50, frames - first)
+        granule += count * 960
+        last = first + count >= frames
+        pages.append(page([SILENT_FRAME] * count, granule, len(pages), flags=4 if last else 0))
+    return b"".join(pages)
+
+
+def main() -> None:
+    for name, (style, seconds) in RECORDINGS.items():
+        data = ogg(seconds) if style == "firefox" else webm(seconds, style)
+        (HERE / name).write_bytes(data)
+    durations = {name: seconds for name, (style, seconds) in RECORDINGS.items()}
+    (HERE / "durations.json").write_text(json.dumps(durations, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import json
+import os
+import pathlib
+import sys
+import tempfile
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+# app.py builds its clients and caches at import; point them at throwaway
+# places and an unreachable API, then put the environment back
+_scratch = pathlib.Path(tempfile.mkdtemp(prefix="app-streams-"))
+_env = {
+    "OPENAI_API_KEY": "test",
+    "OPENAI_BASE_URL": "http://127.0.0.1:9",
+    "PINECONE_API_KEY": "test",
+    "SESSION_STORE": "memory",
+    "LLM_CACHE_PATH": "",
+    "EMBEDDING_CACHE_DIR": str(_scratch / "embeddings"),
+    "SNAPSHOT_ARCHIVE_DIR": str(_scratch / "archive"),
+    "SNAPSHOT_SPOOL_PATH": str(_scratch / "spool.jsonl"),
+}
+_saved = {name: os.environ.get(name) for name in _env}
+os.environ.update(_env)
+try:
+    import app
+finally:
+    for name, value in _saved.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+client = TestClient(app.app)
+
+
+def events(resp):
+    assert resp.status_code == 200 and resp.headers["content-type"].startswith("text/event-stream")
+    parsed = []
+    for block in resp.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        parsed.append((lines["event"], json.loads(lines["data"])))
+    return parsed
+
+
+def scripted_stream(pieces, fail=False):
+    async def stream_chat(prompt, **params):
+        for piece in pieces:
+            yield piece
+        if fail:
+            raise RuntimeError("upstream dropped the stream")
+
+    return stream_chat
+
+
+def test_stream_sends_deltas_then_done(monkeypatch):
+    monkeypatch.setattr(app.llm, "stream_chat", scripted_stream(["What if ", "robots helped?"]))
+    got = events(client.post("/api/get-idea-spark/stream", json={"challenge": "litter", "topic": "oceans"}))
+    assert got == [
+        ("delta", {"text": "What if "}),
+        ("delta", {"text": "robots helped?"}),
+        ("done", {"spark": "What if robots helped?"}),
+    ]
+
+
+def test_stream_failing_midway_ends_with_the_fallback(monkeypatch):
+    monkeypatch.setattr(app.llm, "stream_chat", scripted_stream(["<ul><li>Try"], fail=True))
+    got = events(client.post("/api/improve-pitch/stream", json={"pitch": "My AI sorts trash"}))
+    assert [name for name, _ in got] == ["delta", "error", "done"]
+    assert got[-1][1] == {"suggestions": app.PITCH_COACH_FALLBACK}
+
+
+def test_stream_with_a_bad_body_sends_the_fallback(monkeypatch):
+    monkeypatch.setattr(app.llm, "stream_chat", scripted_stream(["unused"]))
+    resp = client.post(
+        "/api/get-idea-spark/stream", content=b"not json", headers={"content-type": "application/json"}
+    )
+    assert events(resp) == [
+        ("delta", {"text": app.IDEA_SPARK_FALLBACK}),
+        ("done", {"spark": app.IDEA_SPARK_FALLBACK}),
+    ]
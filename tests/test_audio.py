@@ -0,0 +1,69 @@
+import io
+import pathlib
+import sys
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from utils.audio import AudioUploadLimit, reading_time, transcription_file
+
+
+def build_app(max_bytes: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AudioUploadLimit, paths=["/score"], max_bytes=max_bytes)
+
+    @app.post("/score")
+    async def score(audio: UploadFile = File(...)):
+        name, spool, content_type = transcription_file(audio, max_bytes)
+        try:
+            spool.fileno()  # would roll an in-memory spool over to disk
+        except io.UnsupportedOperation:
+            in_memory = True
+        else:
+            in_memory = False
+        return {"name": name, "in_memory": in_memory, "type": content_type, "size": len(spool.read())}
+
+    return app
+
+
+def test_upload_is_passed_as_a_named_in_memory_spool():
+    client = TestClient(build_app(1024))
+    body = client.post("/score", files={"audio": ("blob", b"x" * 1000, "audio/webm")}).json()
+    assert body == {"name": "recording.webm", "in_memory": True, "type": "audio/webm", "size": 1000}
+    body = client.post("/score", files={"audio": ("take.ogg", b"x" * 10, "audio/ogg")}).json()
+    assert body["name"] == "take.ogg"
+
+
+def test_oversized_uploads_are_refused_while_streaming():
+    client = TestClient(build_app(1024))
+    # Declared length over the limit plus form overhead: refused up front
+    assert client.post("/score", files={"audio": ("a.webm", b"x" * 200_000)}).status_code == 413
+
+    # No Content-Length: counted chunk by chunk
+    def chunks():
+        for _ in range(100):
+            yield b"x" * 4096
+
+    response = client.post("/score", content=chunks(), headers={"Content-Type": "multipart/form-data; boundary=b"})
+    assert response.status_code == 413
+
+    # Under the body cap but over the file limit: caught after parsing
+    assert client.post("/score", files={"audio": ("a.webm", b"x" * 2048)}).status_code == 413
+
+
+def test_reading_time_prefers_word_timestamps():
+    words = [
+        {"word": "The", "start": 1.5, "end": 1.8},
+        {"word": "cat", "start": 1.9, "end": 2.3},
+        {"word": "sat", "start": 3.5, "end": 3.9},  # 1.2 s pause
+        {"word": "down", "start": 4.0, "end": 4.5},
+    ]
+    timing = reading_time(words, recording_seconds=9.0)
+    assert timing["duration_source"] == "word_timestamps"
+    assert timing["reading_duration"] == 3.0 and timing["pause_count"] == 1
+    assert abs(timing["longest_pause"] - 1.2) < 1e-9
+
+    assert reading_time(words[:1], 9.0)["duration_source"] == "recording"
+    assert reading_time([], 9.0)["reading_duration"] == 9.0
+    assert reading_time([], None) is None and reading_time([], 0.4) is None
@@ -0,0 +1,44 @@
+import io
+import json
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from utils import audio_probe
+from utils.audio_probe import probe_duration
+
+RECORDINGS = pathlib.Path(__file__).resolve().parent / "recordings"
+DURATIONS = json.loads((RECORDINGS / "durations.json").read_text())
+
+
+def probe(data: bytes):
+    return probe_duration(io.BytesIO(data))
+
+
+def test_corpus_durations_within_one_frame():
+    for name, seconds in DURATIONS.items():
+        with open(RECORDINGS / name, "rb") as f:
+            f.seek(10)
+            assert abs(probe_duration(f) - seconds) <= 0.021, name
+            assert f.tell() == 10
+
+
+def test_long_final_cluster_falls_back_to_walking(monkeypatch):
+    data = (RECORDINGS / "chrome_passage.webm").read_bytes()
+    monkeypatch.setattr(audio_probe, "TAIL_BYTES", 16)
+    assert abs(probe(data) - DURATIONS["chrome_passage.webm"]) <= 0.021
+
+
+def test_truncated_and_unknown_files():
+    data = (RECORDINGS / "chrome_sentence.webm").read_bytes()
+    cut = probe(data[: len(data) // 2])  # upload cut off mid-cluster
+    assert cut is not None and 4 < cut < 7
+    assert probe(data[:20]) is None
+    assert probe(b"RIFF....WAVEfmt ") is None
+    assert probe(b"") is None
+
+
+def test_ogg_with_a_zero_sample_rate_is_unknown():
+    packet = b"\x01vorbis" + bytes(4) + b"\x01" + bytes(4) + bytes(16)
+    page = audio_probe.OGG_PAGE.pack(b"OggS", 0, 2, 48000, 7, 0, 0, 1) + bytes([len(packet)]) + packet
+    assert probe(page) is None
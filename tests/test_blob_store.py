@@ -0,0 +1,30 @@
+import pathlib
+import sys
+import time
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from backend.services.blob_store import BlobStore
+
+
+def test_dedupes_counts_refs_and_collects_garbage(tmp_path):
+    store = BlobStore(tmp_path, gc_grace=60)
+    image = store.put(b"jpeg bytes")
+    assert store.put(b"jpeg bytes") == image
+    (tmp_path / "legacy.jpeg").write_bytes(b"jpeg bytes")
+    assert store.put_file(tmp_path / "legacy.jpeg") == image
+    assert store.put_file(store.path(image)) == image
+    other = store.put(b"other")
+
+    store.bind([("images/s1", image), ("badges/ana/s1", image), ("images/s2", other)])
+    assert store.refcount(image) == 2 and store.resolve("images/s2") == other
+
+    store.bind([("images/s2", None)])
+    assert store.gc() == 0  # still inside the grace period
+    assert store.gc(now=time.time() + 120) == 1
+    assert not store.path(other).exists() and store.path(image).exists()
+
+    # The compacted log reloads to the same bindings in another process
+    reopened = BlobStore(tmp_path)
+    assert reopened.refcount(image) == 2 and reopened.resolve("images/s2") is None
+    store.bind([("images/s1", None)])
+    assert reopened.refcount(image) == 1
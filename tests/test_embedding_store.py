@@ -0,0 +1,99 @@
+import asyncio
+import pathlib
+import sys
+from types import SimpleNamespace
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from utils.embedding_store import EmbeddingStore
+from utils.llm import LLMGateway
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.inputs = []
+
+    async def create(self, model, input):
+        self.inputs.append(list(input))
+        data = [SimpleNamespace(index=i, embedding=[float(len(t)), 1.0]) for i, t in enumerate(input)]
+        return SimpleNamespace(data=data)
+
+
+def test_lru_eviction_and_reload(tmp_path):
+    store = EmbeddingStore(tmp_path, capacity=2)
+    store.put_many("m", ["a", "bb"], [[1.0, 2.0], [3.0, 4.0]])
+    assert store.get("m", "a").tolist() == [1.0, 2.0]
+    store.put_many("m", ["ccc"], [[5.0, 6.0]])  # evicts "bb"
+    assert store.get("m", "bb") is None
+    assert store.stats()["evictions"] == 1
+
+    reopened = EmbeddingStore(tmp_path, capacity=2)
+    assert reopened.get("m", "ccc").tolist() == [5.0, 6.0]
+    assert reopened.get("m", "a").tolist() == [1.0, 2.0]
+
+
+def test_rows_reused_elsewhere_are_misses(tmp_path):
+    # Two instances stand in for two worker processes sharing the directory
+    first, second = EmbeddingStore(tmp_path, capacity=2), EmbeddingStore(tmp_path, capacity=2)
+    first.put_many("m", ["a", "bb"], [[1.0, 2.0], [3.0, 4.0]])
+    second.put_many("m", ["ccc"], [[5.0, 6.0]])  # reloads first's index, evicts "a"
+    assert first.get("m", "a") is None
+    assert first.get("m", "ccc") is None  # not in first's index until its next write
+    first.put_many("m", ["dddd"], [[7.0, 8.0]])  # evicts "bb", keeps second's row
+    assert second.get("m", "ccc").tolist() == [5.0, 6.0]
+    assert EmbeddingStore(tmp_path, capacity=2).get("m", "dddd").tolist() == [7.0, 8.0]
+
+
+def test_overwrite_without_index_save_is_a_miss(tmp_path):
+    store = EmbeddingStore(tmp_path, capacity=1)
+    store.put_many("m", ["a"], [[1.0, 2.0]])
+    # A crash after the evicting write cleared the row's key and replaced
+    # its vector, but before the index was saved
+    store._keys[0] = 0
+    store._matrix[0] = [9.0, 9.0]
+    store._matrix.flush()
+    store._keys.flush()
+    assert EmbeddingStore(tmp_path, capacity=1).get("m", "a") is None
+
+
+def test_gateway_only_embeds_distinct_misses(tmp_path):
+    embeddings = FakeEmbeddings()
+    client = SimpleNamespace(embeddings=embeddings)
+    gateway = LLMGateway(client=client, embeddings=EmbeddingStore(tmp_path))
+
+    async def run():
+        first = await gateway.embed(["mood", "mood", "reading"], model="m")
+        second = await gateway.embed(["reading", "hackathon"], model="m")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert embeddings.inputs == [["mood", "reading"], ["hackathon"]]
+    assert first[0] == first[1] == [4.0, 1.0]
+    assert second[0] == first[2]
+
+
+def test_writes_append_to_the_log_until_it_is_folded_in(tmp_path):
+    store = EmbeddingStore(tmp_path, capacity=3)
+    store.put_many("m", ["a"], [[1.0, 2.0]])
+    index_stamp = store._stamp()
+    store.put_many("m", ["bb"], [[3.0, 4.0]])
+    assert store._stamp() == index_stamp  # index.json untouched
+    assert len((tmp_path / "index.log").read_text().splitlines()) == 2
+
+    other = EmbeddingStore(tmp_path, capacity=3)
+    other.put_many("m", ["ccc"], [[5.0, 6.0]])
+    store.put_many("m", ["dddd"], [[7.0, 8.0]])  # replays other's line, evicts "a"
+    assert store.get("m", "ccc").tolist() == [5.0, 6.0]
+    assert store.get("m", "a") is None
+    # a fourth line outgrows the capacity and is folded into index.json
+    assert (tmp_path / "index.log").read_text() == ""
+    reopened = EmbeddingStore(tmp_path, capacity=3)
+    assert [reopened.get("m", t).tolist() for t in ("bb", "ccc", "dddd")] == [[3.0, 4.0], [5.0, 6.0], [7.0, 8.0]]
+
+
+def test_vectors_of_another_width_are_not_cached(tmp_path):
+    store = EmbeddingStore(tmp_path)
+    store.put_many("small", ["a"], [[1.0, 2.0]])
+    store.put_many("large", ["a", "b"], [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+    assert store.get("large", "a") is None
+    assert store.get("small", "a").tolist() == [1.0, 2.0]
+    assert store.stats()["skipped"] == 2
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import pathlib
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from openai import AsyncOpenAI
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+import backend.main
+from backend.services.fact_summaries import FactSummaries, SummaryInterrupted, depth_bucket, fallback_summary
+from benchmarks.mock_openai import MockOpenAIServer
+from utils.llm import LLMGateway
+from utils.llm_cache import ResponseCache
+
+
+def test_depth_buckets():
+    assert [depth_bucket(c) for c in (1, 2, 3, 4, 6, 7, 50)] == [
+        "intro", "review", "review", "deeper", "deeper", "expert", "expert"]
+
+
+def test_summaries_are_shared_per_topic_and_depth():
+    with MockOpenAIServer(latency=0.05, text="Saturn has rings.") as server:
+        async def run():
+            llm = LLMGateway(AsyncOpenAI(api_key="test", base_url=server.base_url), cache=ResponseCache())
+            summaries = FactSummaries(llm)
+            together = await asyncio.gather(*(summaries.summary("Saturn", 1) for _ in range(5)))
+            assert together == ["Saturn has rings."] * 5 and server.calls == 1
+
+            streamed = [piece async for piece in summaries.stream("Saturn", 1)]
+            assert streamed == ["Saturn has rings."] and server.calls == 1  # cached, one chunk
+
+            await summaries.summary("Saturn", 3)  # new depth bucket
+            await summaries.summary("Saturn", 2)  # same bucket as 3
+            assert server.calls == 2
+            assert await summaries.warm(["Saturn", "Mars", "Mars"]) == 1
+            await llm.aclose()
+
+        asyncio.run(run())
+
+
+def test_without_a_model_the_prompt_is_returned():
+    text = asyncio.run(FactSummaries(None).summary("Mars", 2))
+    assert "all about Mars" in text and "2 time" in text
+
+
+def dropping_llm():
+    async def stream_chat(prompt, **params):
+        yield "Mars is red because"
+        raise RuntimeError("upstream dropped the stream")
+
+    return SimpleNamespace(cache=None, stream_chat=stream_chat)
+
+
+def test_interrupted_summary_is_replaced_by_the_fallback(monkeypatch):
+    summaries = FactSummaries(dropping_llm())
+
+    async def stream():
+        return [piece async for piece in summaries.stream("Mars", 1)]
+
+    with pytest.raises(SummaryInterrupted):
+        asyncio.run(stream())
+    assert asyncio.run(summaries.summary("Mars", 1)) == fallback_summary("Mars", 1)
+
+    monkeypatch.setattr(backend.main, "fact_summaries", summaries)
+    resp = TestClient(backend.main.app).post("/fun_facts_summary/stream", json={"topic": "Mars", "count": 1})
+    blocks = [block.split("\n") for block in resp.text.strip().split("\n\n")]
+    assert [event for event, _ in blocks] == ["event: delta", "event: error", "event: done"]
+    assert json.loads(blocks[-1][1][len("data: "):]) == {"summary": fallback_summary("Mars", 1)}
@@ -0,0 +1,39 @@
+import os
+import pathlib
+import sys
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from backend.main import app
+from backend.services.fun_facts import FunFacts
+
+client = TestClient(app)
+
+
+def write_topics(tmp_path, name, lines, mtime):
+    path = tmp_path / name
+    path.write_text("\n".join(lines) + "\n\n")
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_no_repeats_per_learner_and_hot_reload(tmp_path):
+    write_topics(tmp_path, "space.txt", [f"planet {i}" for i in range(5)], 1)
+    facts = FunFacts(tmp_path, {"space": "space.txt"}, reload_interval=0)
+
+    dealt = [facts.options(1, "ana")["space"][0] for _ in range(5)]
+    assert sorted(dealt) == [f"planet {i}" for i in range(5)]
+    assert len(facts.options(3, "ben")["space"]) == 3
+    assert set(facts.options(10)["space"]) == set(dealt)
+
+    write_topics(tmp_path, "space.txt", ["comet"], 2)
+    assert facts.options(1, "ana") == {"space": ["comet"]}
+
+
+def test_options_endpoints():
+    single = client.get('/fun_facts_options').json()['options']
+    assert set(single) == {"history", "science", "space", "animals"}
+    assert all(isinstance(v, str) and v for v in single.values())
+
+    batch = client.get('/fun_facts_options/batch', params={"k": 3, "learner_id": "tester"}).json()['options']
+    assert all(len(v) == 3 and len(set(v)) == 3 for v in batch.values())
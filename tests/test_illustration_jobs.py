@@ -0,0 +1,55 @@
+import pathlib
+import sys
+import threading
+import time
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from backend.services.illustration_jobs import IllustrationJobs, QueueFull
+
+
+def test_duplicate_submissions_generate_once_and_full_queue_rejects():
+    release = threading.Event()
+    calls = []
+
+    def generate(story_id):
+        calls.append(story_id)
+        release.wait(5)
+        return f"{story_id}.jpeg"
+
+    jobs = IllustrationJobs(generate, workers=1, max_pending=1)
+    jobs.submit("a", "a")
+    while jobs.status("a")["status"] == "queued":
+        time.sleep(0.001)  # worker picks up "a" and blocks
+    assert jobs.submit("b", "b")["status"] == "queued"
+    assert jobs.submit("a", "a")["status"] == "running"  # retry of the same story
+    try:
+        jobs.submit("c", "c")
+    except QueueFull:
+        pass
+    else:
+        raise AssertionError("expected QueueFull")
+
+    release.set()
+    jobs.close(timeout=5)
+    assert calls == ["a", "b"]
+    assert jobs.status("b") == {"job_id": "b", "status": "done", "attempts": 1, "img_url": "b.jpeg", "error": None}
+    assert jobs.stats()["rejected"] == 1
+
+
+def test_failures_are_retried_then_reported():
+    attempts = []
+
+    def generate():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("images API down")
+        return "ok.jpeg"
+
+    jobs = IllustrationJobs(generate, workers=1, retries=1, backoff=0)
+    jobs.submit("a")
+    jobs.close(timeout=5)
+    assert jobs.status("a")["status"] == "failed" and jobs.status("a")["attempts"] == 2
+
+    jobs.submit("a")  # failed jobs can be resubmitted
+    jobs.close(timeout=5)
+    assert jobs.status("a")["status"] == "done" and jobs.status("a")["img_url"] == "ok.jpeg"
@@ -1,15 +1,22 @@
 from fastapi.testclient import TestClient
+import asyncio
+import httpx
 import pathlib
 import sys
+import threading
+import time
+from uuid import uuid4
 
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+import backend.main
 from backend.main import app
+from backend.services.journal import badges_file, create_entry
 
 client = TestClient(app)
 
 def setup_module(module):
     data_dir = pathlib.Path(__file__).resolve().parents[1] / 'backend' / 'data'
-    for name in ['journal_entries.json', 'journal_badges.json']:
+    for name in ['journal_entries.json', 'journal_entries.jsonl', 'journal_badges.json']:
         path = data_dir / name
         if path.exists():
             path.unlink()
@@ -32,3 +39,35 @@ def test_journal_flow():
         assert resp.status_code == 200
     last = resp.json()
     assert 'badge' in last and last['badge']['streak'] == 5
+
+
+def test_concurrent_entries_do_not_queue_on_the_event_loop(monkeypatch):
+    # Each entry is held open for a moment; handlers that blocked the
+    # event loop would run one at a time
+    lock, active, peak = threading.Lock(), [0], [0]
+
+    def slow_create_entry(user_id, entry):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            time.sleep(0.05)
+            return create_entry(user_id, entry)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    monkeypatch.setattr(backend.main, 'create_entry', slow_create_entry)
+    user = f'parallel-{uuid4()}'
+
+    async def post_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as http:
+            return await asyncio.gather(*(
+                http.post('/journal-entry', json={'user_id': user, 'entry': f'Entry {i}'}) for i in range(10)
+            ))
+
+    responses = asyncio.run(post_all())
+    assert [r.status_code for r in responses] == [200] * 10
+    assert peak[0] > 1
+    assert sorted(b['streak'] for b in badges_file.read()[user]) == [5, 10]
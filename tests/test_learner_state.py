@@ -0,0 +1,105 @@
+import asyncio
+import pathlib
+import sys
+from typing import List
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from pydantic import BaseModel
+
+from utils.learner_state import LearnerState, is_valid_learner_id
+from utils.session_store import InMemorySessionStore, SQLiteSessionStore
+
+
+class Profile(BaseModel):
+    name: str
+    snapshots: List[int] = []
+
+
+class Session(BaseModel):
+    session_id: str
+
+
+real_to_thread = asyncio.to_thread
+
+
+def make_state():
+    return LearnerState(InMemorySessionStore(), lambda learner_id: Profile(name=learner_id),
+                        Profile, Session, Session)
+
+
+def test_learners_do_not_see_each_others_sessions():
+    state = make_state()
+    state.save_session("ana", "s1", Session(session_id="s1"))
+    state.set_pointer("ana", "current_session", "s1")
+
+    assert state.current_session("ana").session_id == "s1"
+    assert state.current_session("ben") is None
+    assert state.get_session("ben", "s1") is None
+
+    state.save_session("ben", "s2", Session(session_id="s2"))
+    state.reset("ana")
+    assert state.current_session("ana") is None
+    assert list(state.sessions) == ["ben/s2"]
+
+
+def test_async_accessors_read_in_a_worker_thread(monkeypatch):
+    state = make_state()
+    state.save_session("ana", "s1", Session(session_id="s1"))
+    state.set_pointer("ana", "current_session", "s1")
+    threads = []
+    monkeypatch.setattr(asyncio, "to_thread", lambda fn, *args: threads.append(fn) or real_to_thread(fn, *args))
+
+    async def run():
+        assert (await state.acurrent_session("ana")).session_id == "s1"
+        assert (await state.aload_profile("ana")).name == "ana"
+        assert await state.areset("ana") == ["s1"]
+        assert await state.aget_pointer("ana", "current_session") is None
+
+    asyncio.run(run())
+    assert len(threads) == 4
+
+
+def test_concurrent_profile_updates_are_not_lost():
+    state = make_state()
+
+    async def record(learner_id, value):
+        async with state.update_profile(learner_id) as profile:
+            await asyncio.sleep(0)  # let other updates interleave
+            profile.snapshots.append(value)
+
+    async def run():
+        await asyncio.gather(*(record(learner, i) for i in range(20) for learner in ("ana", "ben")))
+
+    asyncio.run(run())
+    assert sorted(state.load_profile("ana").snapshots) == list(range(20))
+    assert sorted(state.load_profile("ben").snapshots) == list(range(20))
+    assert state.load_profile("cara").name == "cara"
+
+
+def test_updates_from_two_workers_are_serialized(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    # Each worker has its own store, in-process locks and write-behind buffer
+    workers = [
+        LearnerState(SQLiteSessionStore(path, flush_interval=60), lambda learner_id: Profile(name=learner_id),
+                     Profile, Session, Session)
+        for _ in range(2)
+    ]
+
+    async def record(state, value):
+        async with state.update_profile("ana") as profile:
+            await asyncio.sleep(0.001)
+            profile.snapshots.append(value)
+
+    async def run():
+        await asyncio.gather(*(record(workers[i % 2], i) for i in range(20)))
+
+    asyncio.run(run())
+    assert sorted(workers[0].load_profile("ana").snapshots) == list(range(20))
+    for state in workers:
+        state.store.close()
+
+
+def test_learner_id_validation():
+    assert is_valid_learner_id("karl")
+    assert not is_valid_learner_id("../karl")
+    assert not is_valid_learner_id("")
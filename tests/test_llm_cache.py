@@ -0,0 +1,106 @@
+import asyncio
+import io
+import json
+import pathlib
+import sys
+import time
+from types import SimpleNamespace
+
+from openai import AsyncOpenAI
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from benchmarks.mock_openai import MockOpenAIServer
+from utils.llm import LLMGateway
+from utils.llm_cache import ResponseCache, file_digest, make_key
+
+
+def test_key_depends_on_model_prompt_and_params():
+    base = make_key("gpt-4o-mini", "hello", {"max_tokens": 50})
+    assert base == make_key("gpt-4o-mini", "hello", {"max_tokens": 50})
+    assert base != make_key("gpt-4o", "hello", {"max_tokens": 50})
+    assert base != make_key("gpt-4o-mini", "hello", {"max_tokens": 51})
+
+
+def test_lru_ttl_and_persistence(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = ResponseCache(path, max_entries=2, memory_entries=1)
+    cache.set("a", "1", ttl=60)
+    cache.set("b", "2", ttl=60)
+    time.sleep(0.01)
+    assert cache.get("a") == "1"  # refreshes "a" so "b" is now oldest
+    cache.set("c", "3", ttl=60)
+    assert cache.get("b") is None
+
+    cache.set("gone", "x", ttl=-1)
+    assert cache.get("gone") is None
+    cache.close()
+
+    reopened = ResponseCache(path, max_entries=2)
+    assert reopened.get("c") == "3"
+    stats = reopened.stats()
+    assert stats["disk_hits"] == 1 and stats["entries"] <= 2
+
+
+def test_chat_only_caches_usable_completions(tmp_path):
+    replies = iter(["Sure! Here you go", '{"questions": []}', "unused"])
+
+    async def create(model, messages, **params):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=next(replies)))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    cache = ResponseCache(tmp_path / "cache.sqlite3", memory_entries=1)
+    gateway = LLMGateway(client=client, cache=cache)
+
+    def parses(text):
+        try:
+            json.loads(text)
+        except ValueError:
+            return False
+        return True
+
+    async def ask():
+        return await gateway.chat("questions?", cache_ttl=60, cacheable=parses)
+
+    async def run():
+        return [await ask() for _ in range(3)]
+
+    assert asyncio.run(run()) == ["Sure! Here you go", '{"questions": []}', '{"questions": []}']
+    assert (cache.stats()["misses"], cache.stats()["hits"]) == (2, 1)
+    cache.close()
+    assert ResponseCache(tmp_path / "cache.sqlite3").stats()["entries"] == 1
+
+
+def test_file_digest_hashes_bytes_and_keeps_position():
+    f = io.BytesIO(b"take one" * 1000)
+    f.seek(5)
+    digest = file_digest(("blob", f, "audio/webm"))
+    assert f.tell() == 5
+    assert digest == file_digest(b"take one" * 1000) != file_digest(b"take two" * 1000)
+
+
+def test_repeated_recordings_are_transcribed_once():
+    with MockOpenAIServer(latency=0.05, text="The cat sat down.") as server:
+        async def run():
+            llm = LLMGateway(AsyncOpenAI(api_key="test", base_url=server.base_url), transcripts=ResponseCache())
+
+            def take(data=b"recording"):
+                return ("recording.webm", io.BytesIO(data), "audio/webm")
+
+            together = await asyncio.gather(*(llm.transcribe(take(), "whisper-1", cache_ttl=60) for _ in range(4)))
+            assert together == ["The cat sat down."] * 4 and server.calls == 1
+            text, words = await llm.transcribe_words(take(), "whisper-1", cache_ttl=60)
+            assert await llm.transcribe_words(take(), "whisper-1", cache_ttl=60) == (text, words)
+            assert server.calls == 2 and words[0]["word"] == "The"
+
+            await llm.transcribe(take(b"another take"), "whisper-1", cache_ttl=60)
+            await llm.transcribe(take(), "whisper-1")  # no cache_ttl: always sent
+            await llm.transcribe(take(), "whisper-1", cache_ttl=60, temperature=0.0)
+            assert server.calls == 5
+
+            await llm.transcribe(take(b"short-lived"), "whisper-1", cache_ttl=0.01)
+            time.sleep(0.02)
+            await llm.transcribe(take(b"short-lived"), "whisper-1", cache_ttl=0.01)
+            assert server.calls == 7
+            await llm.aclose()
+
+        asyncio.run(run())
@@ -0,0 +1,112 @@
+import asyncio
+import io
+import pathlib
+import sys
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from openai import AsyncOpenAI
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+import backend.main
+from benchmarks.mock_openai import MockOpenAIServer
+from utils import readaloud
+from utils.llm import LLMGateway
+
+RECORDING = (pathlib.Path(__file__).resolve().parent / "recordings" / "chrome_sentence.webm").read_bytes()
+
+
+class ScriptedBackend(readaloud.SpeechBackend):
+    name = "scripted"
+
+    def __init__(self, text):
+        self.text = text
+
+    async def transcribe(self, upload):
+        return self.text, []
+
+
+class FakePool(Executor):
+    """Stands in for the worker pool; ``broken`` pools fail every task."""
+
+    def __init__(self, broken):
+        self.broken = broken
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        future = Future()
+        if self.broken:
+            future.set_exception(BrokenProcessPool("a worker died"))
+        else:
+            future.set_result(("the brave penguin", []))
+        return future
+
+    def shutdown(self, wait=True, **kwargs):
+        self.shut_down = True
+
+
+def test_metrics_fall_back_from_timestamps_to_recording_to_estimate():
+    passage = "The cat sat on the mat"
+    words = [{"word": w, "start": i * 0.5, "end": i * 0.5 + 0.4} for i, w in enumerate(passage.split())]
+    timed = readaloud.reading_metrics(passage, passage, words, recording_seconds=9.0)
+    assert timed["duration_source"] == "word_timestamps" and timed["words_per_minute"] == 124
+    recorded = readaloud.reading_metrics(passage, "the cat sat on mat", [], recording_seconds=6.0)
+    assert (recorded["words_per_minute"], recorded["omissions"], recorded["accuracy"]) == (50, 1, 0.833)
+    assert readaloud.reading_metrics(passage, "the cat", [])["duration_source"] == "estimate"
+
+
+def test_submit_audio_scores_with_the_configured_backend(monkeypatch):
+    client = TestClient(backend.main.app)
+    form = {"thread_id": "t1", "passage": "The brave penguin slid across the ice."}
+    files = {"audio": ("blob", RECORDING, "audio/webm")}
+
+    monkeypatch.setattr(backend.main, "speech", None)
+    assert client.post("/submit_audio", data=form, files=files).json()["words_total"] == 0
+
+    monkeypatch.setattr(backend.main, "speech", ScriptedBackend("the brave penguin slid across ice"))
+    body = client.post("/submit_audio", data=form, files=files).json()
+    assert body["stt_backend"] == "scripted" and body["duration_source"] == "recording"
+    assert (body["words_correct"], body["words_total"], body["omissions"]) == (6, 7, 1)
+
+
+def test_openai_backend_returns_word_timestamps():
+    with MockOpenAIServer(latency=0.0, text="The brave penguin.") as server:
+        async def run():
+            llm = LLMGateway(AsyncOpenAI(api_key="test", base_url=server.base_url))
+            upload = UploadFile(io.BytesIO(RECORDING), filename="blob")
+            text, words = await readaloud.OpenAIBackend(llm).transcribe(upload)
+            assert text == "The brave penguin." and [w["word"] for w in words] == ["The", "brave", "penguin"]
+            text, words = await readaloud.OpenAIBackend(llm, model="gpt-4o-transcribe").transcribe(upload)
+            assert words == []
+            await llm.aclose()
+
+        asyncio.run(run())
+
+
+def test_backend_selection():
+    assert isinstance(readaloud.make_backend("openai", llm=object()), readaloud.OpenAIBackend)
+    with pytest.raises(RuntimeError):
+        readaloud.make_backend("openai")
+    with pytest.raises(RuntimeError):
+        readaloud.make_backend("whisper.cpp")
+    if not readaloud.LocalBackend.available():
+        assert readaloud.make_backend("auto") is None
+        with pytest.raises(RuntimeError, match="faster-whisper"):
+            readaloud.make_backend("local")
+
+
+def test_local_backend_replaces_a_broken_pool_and_retries(monkeypatch):
+    pools = [FakePool(broken=True), FakePool(broken=False)]
+    monkeypatch.setattr(readaloud.LocalBackend, "available", staticmethod(lambda: True))
+    monkeypatch.setattr(readaloud.LocalBackend, "_new_pool", lambda self: pools.pop(0))
+    backend = readaloud.LocalBackend()
+    broken = backend._pool
+
+    async def run():
+        return await backend.transcribe(UploadFile(io.BytesIO(RECORDING), filename="blob"))
+
+    assert asyncio.run(run()) == ("the brave penguin", [])
+    assert broken.shut_down and not backend._pool.broken and pools == []
@@ -0,0 +1,74 @@
+import json
+import pathlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from backend.services.record_log import RecordLog
+
+
+def rec(entry_id, user_id):
+    return {"id": entry_id, "user_id": user_id, "date": "2026-01-01", "entry": "hi", "reflection": ""}
+
+
+def test_counts_updates_and_reload(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    log = RecordLog(path)
+    log.append(rec("a", "ana"))
+    log.append(rec("b", "ben"))
+    log.append(rec("c", "ana"))
+    log.update("a", reflection="proud")
+
+    assert log.count("ana") == 2 and log.count("ben") == 1
+    assert log.get("a")["reflection"] == "proud"
+    assert [e["id"] for e in log.entries("ana")] == ["a", "c"]
+
+    # Another process appends, and a crash leaves half a line behind
+    with open(path, "a") as f:
+        f.write(json.dumps(rec("d", "ana")) + "\n")
+        f.write('{"id": "e", "user_')
+    assert log.count("ana") == 3
+    assert RecordLog(path).get("a")["reflection"] == "proud"
+
+    # The next append cuts the torn line off instead of running into it
+    assert log.append(rec("f", "ana")) == 4
+    with open(path, "a") as f:
+        f.write("not json\n")
+    log.append(rec("g", "ben"))
+    fresh = RecordLog(path)
+    assert fresh.count("ana") == 4 and fresh.count("ben") == 2
+    assert path.read_text().count('"id": "e"') == 0
+
+
+def test_append_counts_are_exact_under_concurrency(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    logs = [RecordLog(path), RecordLog(path)]  # as if in two processes
+    with ThreadPoolExecutor(8) as pool:
+        counts = list(pool.map(lambda i: logs[i % 2].append(rec(str(i), "ana")), range(40)))
+    assert sorted(counts) == list(range(1, 41))
+
+
+def test_imports_legacy_json_once(tmp_path):
+    legacy = tmp_path / "journal_entries.json"
+    legacy.write_text(json.dumps([rec("a", "ana"), rec("b", "ana")]))
+    log = RecordLog(tmp_path / "journal_entries.jsonl", legacy_path=legacy)
+
+    assert log.count("ana") == 2
+    log.append(rec("c", "ana"))
+    assert RecordLog(tmp_path / "journal_entries.jsonl", legacy_path=legacy).count("ana") == 3
+
+
+def test_pages_newest_first_with_stable_cursor(tmp_path):
+    log = RecordLog(tmp_path / "stories.jsonl")
+    for i in range(5):
+        log.append(rec(str(i), "ana"))
+    log.append(rec("x", "ben"))
+    log.update("1", reflection="edited")
+
+    first, cursor = log.page("ana", limit=2)
+    assert [r["id"] for r in first] == ["4", "3"]
+    log.append(rec("5", "ana"))  # new story between requests
+    second, cursor = log.page("ana", cursor, limit=2)
+    assert [r["id"] for r in second] == ["2", "1"] and second[1]["reflection"] == "edited"
+    last, cursor = log.page("ana", cursor, limit=2)
+    assert [r["id"] for r in last] == ["0"] and cursor is None
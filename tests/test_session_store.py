@@ -0,0 +1,101 @@
+import pathlib
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+import pytest
+from pydantic import BaseModel
+
+from utils.session_store import InMemorySessionStore, ModelMap, SQLiteSessionStore
+
+
+class Session(BaseModel):
+    session_id: str
+    start_time: datetime
+    stories_completed: int = 0
+
+
+def test_model_map_round_trip_requires_write_back():
+    sessions = ModelMap(InMemorySessionStore(), "sessions", Session)
+    sessions["a"] = Session(session_id="a", start_time=datetime.now(timezone.utc))
+
+    session = sessions["a"]
+    session.stories_completed += 1
+    assert sessions["a"].stories_completed == 0
+    sessions["a"] = session
+    assert sessions["a"].stories_completed == 1
+    assert "a" in sessions and len(sessions) == 1
+    assert sessions.get(None) is None
+
+
+def test_sqlite_writes_are_shared_after_flush(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    # A long interval keeps the background flusher out of the way
+    worker_a = SQLiteSessionStore(path, flush_interval=60)
+    worker_b = SQLiteSessionStore(path, flush_interval=60)
+
+    worker_a.put("pointers", "current_session", "s1")
+    assert worker_a.get("pointers", "current_session") == "s1"
+    assert worker_b.get("pointers", "current_session") is None
+
+    worker_a.flush()
+    assert worker_b.get("pointers", "current_session") == "s1"
+
+    worker_b.delete("pointers", "current_session")
+    worker_b.put("sessions", "s1", "{}")
+    worker_b.flush()
+    assert worker_a.get("pointers", "current_session") is None
+    assert worker_a.count("sessions") == 1
+
+    worker_a.clear("sessions")
+    assert worker_b.count("sessions") == 0
+    worker_a.close()
+    worker_b.close()
+
+    reopened = SQLiteSessionStore(path)
+    assert reopened.count("pointers") == 0
+    reopened.close()
+
+
+def test_failed_flush_keeps_pending_writes(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    store = SQLiteSessionStore(path, flush_interval=60)
+    store._writer.execute("PRAGMA busy_timeout = 50")
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")  # another worker mid-write
+
+    store.put("sessions", "s1", "{}")
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        store.flush()
+    assert store.get("sessions", "s1") == "{}" and not store._writer.in_transaction
+
+    blocker.execute("ROLLBACK")
+    store.flush()
+    reader = SQLiteSessionStore(path, flush_interval=60)
+    assert reader.get("sessions", "s1") == "{}"
+    reader.close()
+    store.close()
+    blocker.close()
+
+
+def test_reads_see_pending_writes_without_taking_the_write_lock(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    other = SQLiteSessionStore(path, flush_interval=60)
+    other.put("sessions", "ana/s1", "{}")
+    other.put("sessions", "ana/s2", "{}")
+    other.close()
+
+    store = SQLiteSessionStore(path, flush_interval=60)
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")  # another worker mid-write
+    store.put("sessions", "ana/s3", "{}")
+    store.delete("sessions", "ana/s1")
+    started = time.monotonic()
+    assert list(store.keys("sessions", "ana/")) == ["ana/s2", "ana/s3"]
+    assert store.count("sessions") == 2
+    assert time.monotonic() - started < 1
+    blocker.execute("ROLLBACK")
+    blocker.close()
+    store.close()
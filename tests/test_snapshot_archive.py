@@ -0,0 +1,60 @@
+import pathlib
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from utils.snapshot_archive import SnapshotArchive
+
+NOW = datetime(2026, 3, 10, 12, tzinfo=timezone.utc)
+
+
+def snapshot(days_ago, wpm=None, mood=None, topic="Space", activity="story_reading"):
+    return SimpleNamespace(timestamp=NOW - timedelta(days=days_ago), wpm=wpm, mood_score=mood,
+                           activity_id=activity, topic=topic, reading_level="3rd_grade")
+
+
+def test_window_queries_only_see_their_range(tmp_path):
+    archive = SnapshotArchive(tmp_path)
+    archive.append("ana", [snapshot(20, wpm=60), snapshot(2, wpm=90), snapshot(2, wpm=110)])
+    archive.append("ana", [snapshot(1, wpm=100), snapshot(1, mood=0.5, topic="Ocean", activity="auto_mood_check")])
+    archive.append("ben", [snapshot(1, wpm=300)])
+
+    week = archive.last_days("ana", 7, now=NOW)
+    assert week.wpm_by_day() == [
+        {"date": "2026-03-08", "avg_wpm": 100.0, "readings": 2},
+        {"date": "2026-03-09", "avg_wpm": 100.0, "readings": 1},
+    ]
+    assert week.summary()["max_wpm"] == 110
+    assert week.mood_by_topic() == {"Ocean": 0.5}
+    assert week.activity_counts() == {"story_reading": 3, "auto_mood_check": 1}
+    assert len(archive.window("ana")) == 5
+    assert len(archive.last_days("cara", 7, now=NOW)) == 0
+
+
+def test_out_of_order_appends_still_filter_correctly(tmp_path):
+    archive = SnapshotArchive(tmp_path)
+    archive.append("ana", [snapshot(1, wpm=100)])
+    archive.append("ana", [snapshot(30, wpm=50)])  # late backfill
+
+    assert [d["avg_wpm"] for d in archive.last_days("ana", 7, now=NOW).wpm_by_day()] == [100.0]
+    assert len(SnapshotArchive(tmp_path).window("ana")) == 2
+
+
+def test_torn_append_is_hidden_then_cut_off(tmp_path):
+    archive = SnapshotArchive(tmp_path)
+    archive.append("ana", [snapshot(2, wpm=90), snapshot(1, wpm=100)])
+    # A crash partway through the next append reached only two columns
+    with open(tmp_path / "ana" / "timestamp.f64", "ab") as f:
+        f.write(np.asarray([NOW.timestamp()], dtype=np.float64).tobytes())
+    with open(tmp_path / "ana" / "wpm.f32", "ab") as f:
+        f.write(np.asarray([999.0], dtype=np.float32).tobytes())
+
+    assert len(archive.window("ana")) == 2
+    archive.append("ana", [snapshot(0, wpm=110, topic="Ocean")])
+    window = archive.window("ana")
+    assert window.columns["wpm"].tolist() == [90.0, 100.0, 110.0]
+    assert window.mood_by_topic() == {} and window.activity_counts() == {"story_reading": 3}
+    assert (tmp_path / "ana" / "wpm.f32").stat().st_size == 3 * 4
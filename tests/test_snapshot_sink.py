@@ -0,0 +1,107 @@
+import asyncio
+import json
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from utils.snapshot_sink import SnapshotSink
+
+
+class InMemoryIndex:
+    """Local stand-in for a Pinecone index."""
+
+    def __init__(self):
+        self.vectors = {}
+        self.upsert_calls = 0
+        self.down = False
+
+    def upsert(self, vectors):
+        if self.down:
+            raise ConnectionError("vector store unavailable")
+        self.upsert_calls += 1
+        for vector_id, values, metadata in vectors:
+            self.vectors[vector_id] = (values, metadata)
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+
+def test_batches_embeddings_and_chunks_upserts():
+    index, embed = InMemoryIndex(), FakeEmbedder()
+    created = []
+
+    def factory():
+        created.append(1)
+        return index
+
+    async def run():
+        sink = SnapshotSink(factory, embed, batch_size=10, flush_interval=0.05, upsert_chunk=4)
+        for i in range(10):
+            sink.submit(f"snap-{i}", f"text {i}", {"wpm": i})
+        await asyncio.sleep(0.1)
+        await sink.stop()
+        return sink
+
+    sink = asyncio.run(run())
+    assert len(index.vectors) == 10
+    assert embed.calls == [[f"text {i}" for i in range(10)]]
+    assert index.upsert_calls == 3
+    assert created == [1]
+    assert sink.stats()["written"] == 10
+
+
+def test_spools_when_store_is_down_and_replays(tmp_path):
+    index, embed = InMemoryIndex(), FakeEmbedder()
+    spool = tmp_path / "spool.jsonl"
+
+    async def run():
+        sink = SnapshotSink(lambda: index, embed, batch_size=5, flush_interval=0.01,
+                            max_retries=1, backoff=0, spool_path=spool)
+        index.down = True
+        sink.submit("a", "first", {})
+        sink.submit("b", "second", {})
+        await sink.flush()
+        assert spool.exists() and sink.stats()["spooled"] == 2
+        assert index.vectors == {}
+
+        index.down = False
+        sink.submit("c", "third", {})
+        await sink.stop()
+        return sink
+
+    sink = asyncio.run(run())
+    assert set(index.vectors) == {"a", "b", "c"}
+    assert not spool.exists()
+    assert sink.stats()["spooled"] == 0
+
+
+def test_replay_keeps_records_another_worker_spools_meanwhile(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    index, embed = InMemoryIndex(), FakeEmbedder()
+    other = SnapshotSink(lambda: index, embed, spool_path=spool)
+    other._append_spool([{"id": "old", "text": "old", "metadata": {}, "values": [1.0]}])
+
+    class RacingIndex(InMemoryIndex):
+        def upsert(self, vectors):
+            # another worker spools while this one is replaying
+            if any(vector_id == "old" for vector_id, _, _ in vectors):
+                other._append_spool([{"id": "late", "text": "late", "metadata": {}, "values": [2.0]}])
+            super().upsert(vectors)
+
+    racing = RacingIndex()
+
+    async def run():
+        sink = SnapshotSink(lambda: racing, embed, flush_interval=0.01, backoff=0, spool_path=spool)
+        sink.submit("a", "first", {})
+        await sink.stop()
+
+    asyncio.run(run())
+    assert set(racing.vectors) == {"a", "old"}
+    assert [json.loads(line)["id"] for line in spool.read_text().splitlines()] == ["late"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["spool.jsonl", "spool.jsonl.lock"]
@@ -0,0 +1,78 @@
+import pathlib
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from pydantic import BaseModel, Field
+
+from utils.snapshot_stats import SnapshotRing, SnapshotStats
+
+
+class Snapshot(BaseModel):
+    timestamp: datetime
+    wpm: Optional[int] = None
+    mood_score: Optional[float] = None
+    activity_id: str
+    topic: Optional[str] = None
+    reading_level: Optional[str] = "2nd_grade"
+
+
+class Profile(BaseModel):
+    snapshots: SnapshotRing = Field(default_factory=lambda: SnapshotRing(capacity=3))
+
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_snapshots(n):
+    return [
+        Snapshot(
+            timestamp=START + timedelta(minutes=i),
+            wpm=80 + i if i % 2 == 0 else None,
+            mood_score=0.5 if i % 2 else None,
+            activity_id="story_reading",
+            topic="Space" if i % 3 else "Ocean",
+        )
+        for i in range(n)
+    ]
+
+
+def test_ring_keeps_newest_rows_in_order():
+    ring = SnapshotRing(capacity=3)
+    for snapshot in make_snapshots(5):
+        ring.append(snapshot)
+
+    rows = list(ring)
+    assert len(ring) == 3
+    assert [row["timestamp"] for row in rows] == [START + timedelta(minutes=i) for i in (2, 3, 4)]
+    assert [row["wpm"] for row in rows] == [82, None, 84]
+    assert rows[1]["mood_score"] == 0.5 and rows[0]["topic"] == "Space"
+
+
+def test_ring_round_trips_through_model_json():
+    profile = Profile()
+    for snapshot in make_snapshots(4):
+        profile.snapshots.append(snapshot)
+
+    restored = Profile.model_validate_json(profile.model_dump_json())
+    assert list(restored.snapshots) == list(profile.snapshots)
+
+    legacy = Profile.model_validate({"snapshots": [s.model_dump(mode="json") for s in make_snapshots(2)]})
+    assert [row["wpm"] for row in legacy.snapshots] == [80, None]
+
+
+def test_stats_match_a_full_scan():
+    snapshots = make_snapshots(50)
+    stats = SnapshotStats()
+    for snapshot in snapshots:
+        stats.add(snapshot)
+
+    wpms = [s.wpm for s in snapshots if s.wpm is not None]
+    moods = [s.mood_score for s in snapshots if s.mood_score is not None]
+    assert stats.count == 50
+    assert (stats.reading_count, stats.wpm_max, stats.first_wpm, stats.latest_wpm) == (
+        len(wpms), max(wpms), wpms[0], wpms[-1])
+    assert stats.avg_wpm == sum(wpms) / len(wpms)
+    assert stats.avg_mood == sum(moods) / len(moods)
+    assert stats.topic_counts == {"Ocean": 17, "Space": 33}
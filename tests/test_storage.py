@@ -0,0 +1,65 @@
+import json
+import pathlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from backend.services.record_log import RecordLog
+from backend.services.storage import JsonFile
+
+THREADS = 32
+WRITES_PER_THREAD = 25
+
+
+def hammer(fn):
+    with ThreadPoolExecutor(THREADS) as pool:
+        list(pool.map(fn, range(THREADS * WRITES_PER_THREAD)))
+
+
+def test_parallel_updates_are_group_committed_without_losses(tmp_path):
+    path = tmp_path / "stories.json"
+    # Two instances stand in for two worker processes sharing one file
+    first, second = JsonFile(path, list), JsonFile(path, list)
+
+    hammer(lambda i: (first if i % 2 else second).update(lambda stories: stories.append(i)))
+
+    stored = json.loads(path.read_text())
+    assert sorted(stored) == list(range(THREADS * WRITES_PER_THREAD))
+    assert first.commits + second.commits < THREADS * WRITES_PER_THREAD
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+
+def test_failed_change_only_fails_its_caller(tmp_path):
+    badges = JsonFile(tmp_path / "badges.json", dict)
+    badges.update(lambda data: data.setdefault("ana", []).append("streak"))
+    try:
+        badges.update(lambda data: data["missing"].append("x"))
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("expected KeyError")
+    assert badges.read() == {"ana": ["streak"]}
+
+    def half_done(data):
+        data["ana"].append("partial")
+        raise ValueError("changed its mind")
+
+    try:
+        badges.update(half_done)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    badges.update(lambda data: data["ana"].append("reading"))
+    assert badges.read() == {"ana": ["streak", "reading"]}
+
+
+def test_parallel_journal_appends(tmp_path):
+    log = RecordLog(tmp_path / "journal.jsonl")
+
+    def write(i):
+        log.append({"id": str(i), "user_id": f"user-{i % 4}", "entry": "hi", "reflection": ""})
+
+    hammer(write)
+    assert sum(log.count(f"user-{u}") for u in range(4)) == THREADS * WRITES_PER_THREAD
+    assert len(RecordLog(log.path).entries("user-0")) == THREADS * WRITES_PER_THREAD // 4
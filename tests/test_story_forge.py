@@ -1,11 +1,20 @@
 from fastapi.testclient import TestClient
+import pytest
+import json
 import pathlib
 import sys
+import time
+from types import SimpleNamespace
+from uuid import uuid4
 
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 from backend.main import app
+from backend.models.profile_v2 import StoryBadge
+from backend.services import story_forge
+from backend.services.story_forge import delete_illustration
 
 client = TestClient(app)
+profile = json.load(open(pathlib.Path(__file__).parent / '../backend/data/profile.json'))
 
 
 def test_story_prompt():
@@ -14,13 +23,142 @@ def test_story_prompt():
     assert 'prompt' in resp.json()
 
 
+def wait_for_illustration(job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        resp = client.get(f'/illustration-status/{job_id}')
+        assert resp.status_code == 200
+        if resp.json()['status'] == 'done':
+            return resp.json()
+        time.sleep(0.02)
+    raise AssertionError('illustration did not finish')
+
+
+def remove_illustration(job):
+    delete_illustration(job['job_id'])
+
+
 def test_submit_story():
     payload = {"user_id": "tester", "prompt": "A penguin", "story_text": "finds treasure"}
     resp = client.post('/submit-story', json=payload)
     assert resp.status_code == 200
     data = resp.json()
-    assert 'story_id' in data and 'img_url' in data
-    assert data['img_url'].endswith('.jpeg')
-    img_path = pathlib.Path(data['img_url'])
-    assert img_path.exists()
-    img_path.unlink(missing_ok=True)
+    assert 'story_id' in data and 'job_id' in data
+    job = wait_for_illustration(data['job_id'])
+    assert job['img_url'].endswith('.jpeg')
+    assert story_forge.media_path(job['img_url']).exists()
+    assert sorted(job['thumbnails']) == ['128', '256']
+    remove_illustration(job)
+    assert client.get(f"/illustration-status/{uuid4()}").status_code == 404
+
+
+def test_retried_submit_reuses_the_story_and_job():
+    payload = {"user_id": f"retry-{uuid4()}", "prompt": "p", "story_text": "again", "story_id": str(uuid4())}
+    first = client.post('/submit-story', json=payload).json()
+    second = client.post('/submit-story', json=payload).json()
+    assert first['story_id'] == second['story_id'] == first['job_id'] == payload['story_id']
+    assert len(client.get('/stories', params={"user_id": payload['user_id']}).json()['stories']) == 1
+    assert client.post('/submit-story', json={**payload, "user_id": "someone-else"}).status_code == 409
+    remove_illustration(wait_for_illustration(first['job_id']))
+
+
+def test_illustration_errors_propagate_for_retry(monkeypatch):
+    def fail(**kwargs):
+        raise RuntimeError("dall-e unavailable")
+
+    monkeypatch.setattr(story_forge, "client", SimpleNamespace(images=SimpleNamespace(generate=fail)))
+    story_id = str(uuid4())
+    with pytest.raises(RuntimeError):
+        story_forge.generate_image("p", "s", story_id)
+    assert story_forge.find_image(story_id) is None
+
+
+def test_list_stories_paginates():
+    user = f"pager-{uuid4()}"
+    for i in range(3):
+        resp = client.post('/submit-story', json={"user_id": user, "prompt": "p", "story_text": f"story {i}"})
+        job = wait_for_illustration(resp.json()['job_id'])
+        remove_illustration(job)
+    first = client.get('/stories', params={"user_id": user, "limit": 2}).json()
+    assert [s["story_text"] for s in first["stories"]] == ["story 2", "story 1"]
+    rest = client.get('/stories', params={"user_id": user, "cursor": first["next_cursor"]}).json()
+    assert [s["story_text"] for s in rest["stories"]] == ["story 0"] and rest["next_cursor"] is None
+    assert client.get('/stories', params={"user_id": user, "cursor": "abc"}).status_code == 400
+
+
+def test_fetch_image_streams_from_http():
+    from openai import OpenAI
+    from backend.services.story_forge import fetch_image
+    from benchmarks.mock_openai import MockOpenAIServer
+
+    with MockOpenAIServer(latency=0) as server:
+        images = OpenAI(api_key="test", base_url=server.base_url).images
+        url = images.generate(model="dall-e-3", prompt="p", n=1, size="1024x1024").data[0].url
+        img = fetch_image(url)
+    assert img.size == (1024, 1024) and img.format == "PNG"
+
+
+def test_offline_placeholders_share_one_encoded_blob():
+    first, second = str(uuid4()), str(uuid4())
+    paths = [story_forge.generate_image("p", "s", story_id) for story_id in (first, second)]
+    try:
+        assert paths[0] == paths[1]
+        digest = story_forge.blobs.digest_of(paths[0])
+        assert story_forge.blobs.refcount(digest) >= 2
+        assert sorted(story_forge.find_thumbnails(second)) == [128, 256]
+    finally:
+        for story_id in (first, second):
+            delete_illustration(story_id)
+
+
+def test_badge_references_the_story_blob():
+    profile = SimpleNamespace(learner_id=f"badger_{uuid4().hex}", history=SimpleNamespace(story_badges=[]))
+    resp = client.post('/submit-story', json={"user_id": "tester", "prompt": "p", "story_text": "badge"})
+    job = wait_for_illustration(resp.json()['job_id'])
+    digest = story_forge.blobs.digest_of(story_forge.media_path(job['img_url']))
+    before = story_forge.blobs.refcount(digest)
+
+    badge = story_forge.add_story_badge(profile, job['job_id'], job['img_url'])
+    assert badge['img_url'] == job['img_url'] and badge['blob'] == digest
+    assert story_forge.blobs.refcount(digest) == before + 1
+    assert profile.history.story_badges == [StoryBadge(**badge)]
+    remove_illustration(job)
+    assert story_forge.blobs.refcount(digest) == before
+
+
+def test_media_path_only_maps_media_files():
+    assert story_forge.media_path("/etc/passwd") is None
+    assert story_forge.media_path("/media/blobs/passwd") is None
+    assert story_forge.media_path("/media/other/x.jpeg") is None
+    assert story_forge.media_path(str(story_forge.IMAGES_DIR / ".." / "stories.json")) is None
+    assert story_forge.media_path("/media/images/../../stories.json") == story_forge.IMAGES_DIR / "stories.json"
+    assert story_forge.media_path(str(story_forge.IMAGES_DIR / "a.jpeg")) == story_forge.IMAGES_DIR / "a.jpeg"
+
+
+def test_media_route_caches_and_serves_ranges():
+    resp = client.post('/submit-story', json={"user_id": "tester", "prompt": "p", "story_text": "media"})
+    job = wait_for_illustration(resp.json()['job_id'])
+    assert job['img_url'].startswith('/media/blobs/')
+
+    full = client.get(job['img_url'])
+    assert full.status_code == 200 and full.headers['content-type'] == 'image/jpeg'
+    assert 'immutable' in full.headers['cache-control']
+    etag = full.headers['etag']
+    assert etag == f'"{job["img_url"].rsplit("/", 1)[1].split(".")[0]}"'
+    assert client.get(job['img_url'], headers={'If-None-Match': etag}).status_code == 304
+
+    part = client.get(job['img_url'], headers={'Range': 'bytes=0-9'})
+    assert part.status_code == 206 and part.content == full.content[:10]
+    assert client.get(job['img_url'], headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'}).status_code == 200
+
+    assert client.get('/media/blobs/..%2Frefs.jsonl').status_code == 404
+    assert client.get('/media/secrets/x.jpeg').status_code == 404
+    orphan = story_forge.blobs.put(b"not referenced by any story")
+    assert client.get(f'/media/blobs/{orphan}.jpeg').status_code == 404
+    remove_illustration(job)
+
+
+def test_badges_refuse_files_outside_media():
+    for img_url in ('/etc/passwd', '../../../etc/passwd', '/media/blobs/passwd'):
+        resp = client.post('/add-story-badge', json={"profile": profile, "story_id": str(uuid4()), "img_url": img_url})
+        assert resp.status_code == 400
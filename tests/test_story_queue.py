@@ -0,0 +1,54 @@
+import asyncio
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from utils.story_queue import StoryPrefetcher
+
+
+def _factory(calls):
+    async def generate(topic, reading_level, current_wpm):
+        calls.append((topic, reading_level))
+        await asyncio.sleep(0)
+        return {"topic": topic, "reading_level": reading_level, "target_wpm": current_wpm + 5}
+    return generate
+
+
+def test_prefetch_and_retarget():
+    calls = []
+
+    async def run():
+        queue = StoryPrefetcher(_factory(calls), depth=2)
+        queue.prime("s1", "Space", "2nd_grade", 80)
+        await asyncio.sleep(0.01)
+        assert queue.ready_count("s1") == 2
+
+        story = await queue.next("s1", "Space", "2nd_grade", 90)
+        assert story["target_wpm"] == 95
+        await asyncio.sleep(0.01)
+        assert len(calls) == 3  # two primed plus one refill
+
+        queue.retarget("s1", "Space", "3rd_grade", 100)
+        story = await queue.next("s1", "Space", "3rd_grade", 100)
+        assert story["reading_level"] == "3rd_grade"
+        queue.clear()
+
+    asyncio.run(run())
+
+
+def test_least_recently_used_sessions_are_dropped():
+    calls = []
+
+    async def run():
+        queue = StoryPrefetcher(_factory(calls), depth=1, max_sessions=2)
+        queue.prime("s1", "Space", "2nd_grade", 80)
+        queue.prime("s2", "Space", "2nd_grade", 80)
+        await asyncio.sleep(0.01)
+        await queue.next("s1", "Space", "2nd_grade", 80)  # s2 is now the oldest
+        queue.prime("s3", "Ocean", "2nd_grade", 80)
+        await asyncio.sleep(0.01)
+        assert [queue.ready_count(s) for s in ("s1", "s2", "s3")] == [1, 0, 1]
+        assert len(queue._queues) == 2
+        queue.clear()
+
+    asyncio.run(run())
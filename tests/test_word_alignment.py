@@ -0,0 +1,76 @@
+import pathlib
+import random
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from utils.word_alignment import align_reading, align_tokens, tokenize
+
+
+def full_cost(a, b):
+    # Unbanded edit distance with the same weights, for comparison
+    row = [2 * j for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        prev, row = row, [2 * i]
+        for j in range(1, len(b) + 1):
+            row.append(min(prev[j - 1] + 3 * (a[i - 1] != b[j - 1]), prev[j] + 2, row[j - 1] + 2))
+    return row[-1]
+
+
+def test_tokens_are_normalized():
+    _, tokens, spans = tokenize("I don't have twenty-one cats; it's the third time, One hundred and five!")
+    assert tokens == ["i", "do", "not", "have", "21", "cats", "it", "is", "the", "3rd", "time", "105"]
+    assert spans[4] == (3, 4) and spans[-1] == (9, 13)
+    assert tokenize("Um, I read 1,000 books on the 3rd", frozenset({"um"}))[1] == ["i", "read", "1000", "books", "on", "the", "3rd"]
+
+
+def test_counted_numbers_stay_separate():
+    assert tokenize("one two three")[1] == ["1", "2", "3"]
+    assert tokenize("chapter one, two cats")[1] == ["chapter", "1", "2", "cats"]
+    assert tokenize("one and two")[1] == ["1", "and", "2"]
+    assert tokenize("twenty one two")[1] == ["21", "2"]
+    assert tokenize("two thousand five hundred and twelve")[1] == ["2512"]
+    assert align_reading("One, two, three, go!", "1 2 3 go")["words_correct"] == 4
+
+
+def test_labels_per_word():
+    result = align_reading(
+        "The brave penguin slid across the ice. She found 21 glowing shells.",
+        "the brave the penguin slide across ice um she found twenty one glowing shells",
+    )
+    labels = [(w["expected"], w["label"]) for w in result["words"]]
+    assert labels[:7] == [
+        ("The", "correct"), ("brave", "correct"), (None, "inserted"), ("penguin", "correct"),
+        ("slid", "substituted"), ("across", "correct"), ("the", "omitted"),
+    ]
+    assert result["words"][4]["spoken"] == "slide"
+    assert result["words"][-3] == {"expected": "21", "spoken": "twenty one", "label": "correct"}
+    assert (result["words_correct"], result["words_total"]) == (10, 12)
+    assert (result["substituted"], result["omitted"], result["inserted"]) == (1, 1, 1)
+
+
+def test_skips_repeats_and_early_stops_stay_aligned():
+    passage = " ".join(f"w{i}" for i in range(300))
+    repeated = " ".join([f"w{i}" for i in range(120)] + [f"w{i}" for i in range(80, 300)])
+    assert align_reading(passage, repeated)["words_correct"] == 300
+    skipped = " ".join(f"w{i}" for i in range(300) if not 100 <= i < 140)
+    result = align_reading(passage, skipped)
+    assert result["omitted"] == 40 and result["words_correct"] == 260
+    stopped = align_reading(passage, " ".join(f"w{i}" for i in range(30)))
+    assert stopped["words_correct"] == 30 and stopped["omitted"] == 270
+    chatter = align_reading(passage, passage + " okay" * 50)
+    assert chatter["words_correct"] == 300 and chatter["inserted"] == 50
+
+
+def test_banded_alignment_matches_full_edit_distance():
+    rng = random.Random(7)
+    vocab = [f"v{i}" for i in range(30)]
+    for _ in range(200):
+        a = [rng.choice(vocab) for _ in range(rng.randint(0, 50))]
+        b = [rng.choice(vocab) if rng.random() < 0.1 else w for w in a if rng.random() > 0.1]
+        if rng.random() < 0.3:
+            b = b[: len(b) // 2]
+        steps = align_tokens(a, b)
+        assert [i for move, i, _ in steps if move != 2] == list(range(len(a)))
+        assert [j for move, _, j in steps if move != 1] == list(range(len(b)))
+        cost = sum(3 * (a[i] != b[j]) if move == 0 else 2 for move, i, j in steps)
+        assert cost == full_cost(a, b)
@@ -0,0 +1,161 @@
+"""Recorded-audio uploads, handed to the transcription client without copies.
+
+Starlette spools each uploaded file in memory (on disk past 1 MB) while it
+parses the form. ``transcription_file`` passes that spool to the OpenAI
+client as a named file tuple, so a recording is never copied into a temp
+file and read back. The spool is wrapped because httpx sizes file bodies
+with ``fileno()``, which makes an in-memory spool roll over to disk.
+``AudioUploadLimit`` stops reading a request body as soon as it grows past
+the limit, before anything is spooled.
+"""
+
+import io
+import os
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+# Whisper rejects files over 25 MB, so there is no point accepting more
+MAX_AUDIO_BYTES = int(os.getenv("MAX_AUDIO_BYTES", str(25 * 1024 * 1024)))
+# Room for the multipart boundaries and the other form fields
+FORM_OVERHEAD = 64 * 1024
+
+# Whisper picks the decoder from the file name's extension
+AUDIO_SUFFIXES = {".flac", ".m4a", ".mp3", ".mp4", ".mpeg", ".mpga", ".oga", ".ogg", ".wav", ".webm"}
+DEFAULT_NAME = "recording.webm"
+
+# Gaps between words at least this long count as pauses
+PAUSE_SECONDS = 0.5
+# A word or two gives no meaningful reading rate
+MIN_READING_SECONDS = 1.0
+
+
+def too_large(max_bytes: int = MAX_AUDIO_BYTES) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Recording is too large (limit {max_bytes // (1024 * 1024)} MB)",
+    )
+
+
+def upload_size(upload: UploadFile) -> int:
+    if upload.size is not None:
+        return upload.size
+    spool = upload.file
+    spool.seek(0, os.SEEK_END)
+    return spool.tell()
+
+
+class _SpoolReader(io.RawIOBase):
+    """Reads and seeks an upload's spool but has no ``fileno()``."""
+
+    def __init__(self, spool: BinaryIO):
+        self._spool = spool
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._spool.tell()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._spool.seek(offset, whence)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._spool.read(size)
+
+    def readinto(self, buffer) -> int:
+        data = self._spool.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def transcription_file(upload: UploadFile, max_bytes: int = MAX_AUDIO_BYTES) -> Tuple[str, BinaryIO, str]:
+    """Return ``upload`` as a ``(name, file, content_type)`` tuple for the API.
+
+    The file reads the request's own spool from the start. Browsers post
+    recorded blobs as ``"blob"``, so names without a known audio extension
+    become ``recording.webm``. Raises a 413 ``HTTPException`` past ``max_bytes``.
+    """
+    if upload_size(upload) > max_bytes:
+        raise too_large(max_bytes)
+    name = upload.filename or ""
+    if Path(name).suffix.lower() not in AUDIO_SUFFIXES:
+        name = DEFAULT_NAME
+    upload.file.seek(0)
+    return name, _SpoolReader(upload.file), upload.content_type or "audio/webm"
+
+
+def reading_time(words: List[Dict[str, Any]], recording_seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """How long a read-aloud took, from word timestamps or the recording.
+
+    With word timestamps the reading runs from the first word's start to
+    the last word's end, so silence before and after it does not count,
+    and gaps of ``PAUSE_SECONDS`` or more are reported as pauses. Without
+    them the whole recording counts and pauses are unknown. Returns
+    ``None`` when neither gives at least ``MIN_READING_SECONDS``.
+    """
+    if words:
+        span = words[-1]["end"] - words[0]["start"]
+        if span >= MIN_READING_SECONDS:
+            gaps = [b["start"] - a["end"] for a, b in zip(words, words[1:])]
+            pauses = [gap for gap in gaps if gap >= PAUSE_SECONDS]
+            return {
+                "reading_duration": span,
+                "pause_count": len(pauses),
+                "pause_time": sum(pauses),
+                "longest_pause": max(pauses, default=0.0),
+                "duration_source": "word_timestamps",
+            }
+    if recording_seconds is not None and recording_seconds >= MIN_READING_SECONDS:
+        return {
+            "reading_duration": recording_seconds,
+            "pause_count": None,
+            "pause_time": None,
+            "longest_pause": None,
+            "duration_source": "recording",
+        }
+    return None
+
+
+class AudioUploadLimit:
+    """ASGI middleware capping request bodies on the audio upload routes.
+
+    A declared ``Content-Length`` over the limit is refused with 413 before
+    the body is read; otherwise the body is counted as it streams in and
+    the request fails with 413 at the first chunk past the limit.
+    """
+
+    def __init__(self, app, paths: Iterable[str], max_bytes: int = MAX_AUDIO_BYTES):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_bytes = max_bytes
+        self.max_body = max_bytes + FORM_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        declared = dict(scope["headers"]).get(b"content-length", b"")
+        if declared.isdigit() and int(declared) > self.max_body:
+            error = too_large(self.max_bytes)
+            await JSONResponse({"detail": error.detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    # FastAPI re-raises HTTPExceptions from body parsing as-is
+                    raise too_large(self.max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,284 @@
+"""Recording lengths read from WebM and Ogg container headers.
+
+Nothing is decoded. A WebM file states its length in the segment Info,
+unless it was written live the way MediaRecorder writes it; then the
+length is the timestamp of the last block, found by scanning the tail of
+the file for the last cluster. An Ogg file's length is the granule
+position of its last page. Either way only a few kilobytes are read.
+"""
+
+import io
+import struct
+from typing import BinaryIO, Optional, Tuple
+
+TAIL_BYTES = 64 * 1024
+
+EBML = 0x1A45DFA3
+EBML_MAGIC = EBML.to_bytes(4, "big")
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+CLUSTER = 0x1F43B675
+CLUSTER_ID = CLUSTER.to_bytes(4, "big")
+TIMECODE = 0xE7
+SIMPLE_BLOCK = 0xA3
+BLOCK_GROUP = 0xA0
+BLOCK = 0xA1
+BLOCK_DURATION = 0x9B
+# Elements that may appear inside a cluster; anything else ends an
+# unknown-size cluster
+CLUSTER_CHILDREN = {TIMECODE, SIMPLE_BLOCK, BLOCK_GROUP, 0xA7, 0xAB, 0xAF, 0x5854, 0xEC, 0xBF}
+
+OGG_PAGE = struct.Struct("<4sBBqIIIB")
+
+
+class _Truncated(Exception):
+    pass
+
+
+def probe_duration(file: BinaryIO) -> Optional[float]:
+    """Seconds of audio in a WebM or Ogg recording, or ``None`` if unknown.
+
+    WebM lengths are exact to within the last frame (20 ms for Opus). The
+    file position is restored afterwards.
+    """
+    position = file.tell()
+    try:
+        file.seek(0)
+        magic = file.read(4)
+        file.seek(0)
+        if magic == EBML_MAGIC:
+            return _webm_duration(file)
+        if magic == b"OggS":
+            return _ogg_duration(file)
+        return None
+    except (_Truncated, ValueError, struct.error):
+        return None
+    finally:
+        file.seek(position)
+
+
+# -- WebM --------------------------------------------------------------------
+
+def _vint(f: BinaryIO, keep_marker: bool = False) -> Tuple[Optional[int], int]:
+    """An EBML variable-length integer and its length; ``None`` if all ones."""
+    first = f.read(1)
+    if not first:
+        raise _Truncated
+    length = 9 - first[0].bit_length()
+    if length > 8:
+        raise ValueError("invalid EBML length")
+    rest = f.read(length - 1)
+    if len(rest) < length - 1:
+        raise _Truncated
+    value = first[0] if keep_marker else first[0] & (0xFF >> length)
+    all_ones = value == (0xFF >> length)
+    for byte in rest:
+        value = (value << 8) | byte
+        all_ones = all_ones and byte == 0xFF
+    return (None if all_ones and not keep_marker else value), length
+
+
+def _header(f: BinaryIO) -> Tuple[int, Optional[int]]:
+    element_id, _ = _vint(f, keep_marker=True)
+    size, _ = _vint(f)
+    return element_id, size
+
+
+def _read(f: BinaryIO, size: Optional[int]) -> bytes:
+    if size is None or size > 8:
+        raise ValueError("unexpected element size")
+    data = f.read(size)
+    if len(data) < size:
+        raise _Truncated
+    return data
+
+
+def _uint(data: bytes) -> int:
+    return int.from_bytes(data, "big")
+
+
+def _float(data: bytes) -> float:
+    return struct.unpack(">f" if len(data) == 4 else ">d", data)[0]
+
+
+def _file_size(f: BinaryIO) -> int:
+    f.seek(0, io.SEEK_END)
+    return f.tell()
+
+
+def _webm_duration(f: BinaryIO) -> Optional[float]:
+    end = _file_size(f)
+    f.seek(0)
+    element_id, size = _header(f)
+    if element_id != EBML or size is None:
+        return None
+    f.seek(size, io.SEEK_CUR)
+    element_id, size = _header(f)
+    if element_id != SEGMENT:
+        return None
+    if size is not None:
+        end = min(end, f.tell() + size)
+
+    scale, first = 1_000_000, None
+    pos = f.tell()
+    while pos < end:
+        f.seek(pos)
+        element_id, size = _header(f)
+        body = f.tell()
+        if element_id == INFO:
+            duration = None
+            for child, child_size in _children(f, body, body + size if size is not None else end):
+                if child == TIMECODE_SCALE:
+                    scale = _uint(_read(f, child_size))
+                elif child == DURATION:
+                    duration = _float(_read(f, child_size))
+            if duration:
+                return duration * scale / 1e9
+        elif element_id == CLUSTER:
+            first = _cluster_span(f, body, end, size, first_only=True)[0]
+            break
+        if size is None:
+            return None
+        pos = body + size
+    if first is None:
+        return None
+
+    last = _last_cluster_end(f, end)
+    if last is None:
+        last = _walk_clusters(f, pos, end)
+    return max(0.0, (last - first) * scale / 1e9)
+
+
+def _children(f: BinaryIO, start: int, end: int):
+    """Yield ``(id, size)`` for each child, positioned at its body."""
+    pos = start
+    while pos < end:
+        f.seek(pos)
+        element_id, size = _header(f)
+        body = f.tell()
+        yield element_id, size
+        if size is None:
+            return
+        pos = body + size
+
+
+def _cluster_span(
+    f: BinaryIO, body: int, end: int, size: Optional[int], first_only: bool = False,
+) -> Tuple[int, int, int]:
+    """``(first, last_end, next_pos)`` in timecode units for one cluster.
+
+    With ``first_only`` the walk stops at the first block.
+    """
+    stop = body + size if size is not None else end
+    base, first, last = None, None, 0
+    pos = body
+    while pos < stop:
+        f.seek(pos)
+        try:
+            element_id, child_size = _header(f)
+        except _Truncated:
+            break  # recording cut off mid-element
+        child = f.tell()
+        if size is None and element_id not in CLUSTER_CHILDREN:
+            break
+        if child_size is None:
+            raise ValueError("unknown-size cluster child")
+        if element_id == TIMECODE:
+            base = _uint(_read(f, child_size))
+        elif element_id in (SIMPLE_BLOCK, BLOCK_GROUP) and base is not None:
+            start, duration = _block_time(f, element_id, child, child + child_size)
+            first = base + start if first is None else first
+            last = max(last, base + start + duration)
+            if first_only:
+                break
+        pos = child + child_size
+    if base is None:
+        raise ValueError("cluster without a timecode")
+    return (first if first is not None else base), max(last, base), pos
+
+
+def _block_time(f: BinaryIO, element_id: int, body: int, end: int) -> Tuple[int, int]:
+    """A block's timecode relative to its cluster, and its duration if given."""
+    if element_id == SIMPLE_BLOCK:
+        f.seek(body)
+        _vint(f)  # track number
+        return struct.unpack(">h", f.read(2))[0], 0
+    start, duration = 0, 0
+    for child, child_size in _children(f, body, end):
+        if child == BLOCK:
+            _vint(f)
+            start = struct.unpack(">h", f.read(2))[0]
+        elif child == BLOCK_DURATION:
+            duration = _uint(_read(f, child_size))
+    return start, duration
+
+
+def _last_cluster_end(f: BinaryIO, end: int) -> Optional[int]:
+    """End timecode of the last cluster starting in the file's tail."""
+    tail_start = max(0, end - TAIL_BYTES)
+    f.seek(tail_start)
+    tail = f.read(end - tail_start)
+    i = tail.rfind(CLUSTER_ID)
+    while i >= 0:
+        f.seek(tail_start + i)
+        try:
+            _, size = _header(f)
+            body = f.tell()
+            if f.read(1) == bytes([TIMECODE]):
+                return _cluster_span(f, body, end, size)[1]
+        except (_Truncated, ValueError, struct.error):
+            pass  # cluster id bytes inside a frame
+        i = tail.rfind(CLUSTER_ID, 0, i)
+    return None
+
+
+def _walk_clusters(f: BinaryIO, pos: int, end: int) -> int:
+    """End timecode of the last cluster, walking every cluster from ``pos``."""
+    last = 0
+    while pos < end:
+        f.seek(pos)
+        try:
+            element_id, size = _header(f)
+        except _Truncated:
+            break
+        body = f.tell()
+        if element_id == CLUSTER:
+            _, cluster_end, next_pos = _cluster_span(f, body, end, size)
+            last = max(last, cluster_end)
+            pos = next_pos if size is None else body + size
+        elif size is None:
+            break
+        else:
+            pos = body + size
+    return last
+
+
+# -- Ogg ---------------------------------------------------------------------
+
+def _ogg_duration(f: BinaryIO) -> Optional[float]:
+    head = f.read(OGG_PAGE.size + 255 + 64)
+    _, _, _, _, serial, _, _, segments = OGG_PAGE.unpack_from(head)
+    packet = head[OGG_PAGE.size + segments:]
+    if packet.startswith(b"OpusHead"):
+        rate, pre_skip = 48000, struct.unpack_from("<H", packet, 10)[0]
+    elif packet.startswith(b"\x01vorbis"):
+        rate, pre_skip = struct.unpack_from("<I", packet, 12)[0], 0
+    else:
+        return None
+    if not rate:
+        return None
+
+    end = _file_size(f)
+    tail_start = max(0, end - TAIL_BYTES)
+    f.seek(tail_start)
+    tail = f.read(end - tail_start)
+    i = tail.rfind(b"OggS")
+    while i >= 0:
+        if i + OGG_PAGE.size <= len(tail):
+            _, version, _, granule, page_serial, _, _, _ = OGG_PAGE.unpack_from(tail, i)
+            if version == 0 and page_serial == serial and granule >= 0:
+                return max(0, granule - pre_skip) / rate
+        i = tail.rfind(b"OggS", 0, i)
+    return None
@@ -0,0 +1,274 @@
+"""Persistent embedding cache backed by a memory-mapped float32 matrix.
+
+Vectors live in ``embeddings.f32`` (``capacity`` rows x ``dim`` columns) and
+``index.json`` maps a hash of (model, text) to its row. Lookups return a view
+into the memory map, so a hit never copies the vector or touches the
+embeddings API. When the matrix is full the least recently used row is
+reused.
+
+``keys.bin`` holds the hash each row was written for. A row's hash is
+cleared before its vector is overwritten and set again after, and lookups
+check it, so an index left behind by a crash or by another process never
+returns another text's vector. Writes hold a lock file and first reload
+an index that another process has replaced, so workers sharing the
+directory do not hand out the same row twice.
+
+Each write appends its ``key row`` assignments to ``index.log`` instead of
+rewriting ``index.json``; the log is replayed on top of the index when it
+is loaded and folded back into it once it grows past ``capacity`` lines.
+The matrix has one width, set by the first vector stored; vectors of any
+other width (another embedding model) are not cached.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: writes are only locked in-process
+    fcntl = None
+
+MATRIX_FILE = "embeddings.f32"
+KEYS_FILE = "keys.bin"
+INDEX_FILE = "index.json"
+LOG_FILE = "index.log"
+LOCK_FILE = "store.lock"
+KEY_BYTES = 32
+
+
+def text_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Fixed-capacity LRU store of embeddings keyed by text hash."""
+
+    def __init__(self, directory: Union[str, Path], capacity: int = 10000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self.dim: Optional[int] = None
+        self._matrix: Optional[np.memmap] = None
+        self._keys: Optional[np.memmap] = None
+        # key -> row, least recently used first
+        self._rows: "OrderedDict[str, int]" = OrderedDict()
+        self._free: list = []
+        self._index_stamp = None
+        self._log_offset = 0
+        self._log_entries = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.skipped = 0
+        with self._locked():
+            self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialize writers across threads and processes."""
+        with self._lock, open(self.directory / LOCK_FILE, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.directory / INDEX_FILE)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _log_size(self) -> int:
+        try:
+            return os.stat(self.directory / LOG_FILE).st_size
+        except FileNotFoundError:
+            return 0
+
+    def _load(self) -> None:
+        self._index_stamp = self._stamp()
+        self._log_offset = self._log_entries = 0
+        index_path = self.directory / INDEX_FILE
+        if self._index_stamp is None or not all(
+            (self.directory / name).exists() for name in (MATRIX_FILE, KEYS_FILE)
+        ):
+            return
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("capacity") != self.capacity:
+            # Layout changed; start over rather than misread rows.
+            return
+        self.dim = index["dim"]
+        self._open_matrix("r+")
+        self._rows = OrderedDict(index["rows"])
+        self._replay_log()
+
+    def _replay_log(self) -> None:
+        """Apply log lines other writers appended since the last read."""
+        try:
+            with open(self.directory / LOG_FILE, "rb") as f:
+                f.seek(self._log_offset)
+                tail = f.read()
+        except FileNotFoundError:
+            tail = b""
+        # A line cut short by a crash has no newline yet; leave it for later
+        complete = tail[: tail.rfind(b"\n") + 1]
+        holders = {row: key for key, row in self._rows.items()}
+        for line in complete.decode("ascii").splitlines():
+            key, row = line.split()
+            self._assign(key, int(row), holders)
+        self._log_offset += len(complete)
+        self._log_entries += complete.count(b"\n")
+        self._free = [row for row in range(self.capacity - 1, -1, -1) if row not in holders]
+
+    def _assign(self, key: str, row: int, holders: Dict[int, str]) -> None:
+        previous = holders.get(row)
+        if previous is not None and previous != key:
+            del self._rows[previous]
+        old_row = self._rows.pop(key, None)
+        if old_row is not None and old_row != row:
+            holders.pop(old_row, None)
+        self._rows[key] = row
+        holders[row] = key
+
+    def _open_matrix(self, mode: str) -> None:
+        self._matrix = np.memmap(
+            self.directory / MATRIX_FILE,
+            dtype=np.float32,
+            mode=mode,
+            shape=(self.capacity, self.dim),
+        )
+        self._keys = np.memmap(
+            self.directory / KEYS_FILE,
+            dtype=np.uint8,
+            mode=mode,
+            shape=(self.capacity, KEY_BYTES),
+        )
+
+    def _save_index(self) -> None:
+        """Write the whole index and start an empty log."""
+        index_path = self.directory / INDEX_FILE
+        tmp = index_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "capacity": self.capacity, "rows": list(self._rows.items())}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, index_path)
+        # Readers notice the new index first, so a log they still replay on
+        # top of it only repeats assignments the index already holds
+        open(self.directory / LOG_FILE, "wb").close()
+        self._index_stamp = self._stamp()
+        self._log_offset = self._log_entries = 0
+
+    def _append_log(self, assigned: Dict[str, int]) -> None:
+        lines = "".join(f"{key} {row}\n" for key, row in assigned.items()).encode("ascii")
+        with open(self.directory / LOG_FILE, "ab") as f:
+            f.write(lines)
+        self._log_offset += len(lines)
+        self._log_entries += len(assigned)
+        if self._log_entries > self.capacity:
+            self._save_index()
+
+    def flush(self) -> None:
+        with self._locked():
+            if self._matrix is not None:
+                self._matrix.flush()
+                self._keys.flush()
+                self._save_index()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        """Return a read-only view of the cached vector, or ``None``.
+
+        The view aliases the memory map, so copy it if it must outlive a
+        later eviction of the same row.
+        """
+        key = text_key(model, text)
+        with self._lock:
+            row = self._rows.get(key)
+            if row is not None and self._keys[row].tobytes() != bytes.fromhex(key):
+                # Another process reused the row, or a crash cut its write short
+                del self._rows[key]
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(key)
+            self.hits += 1
+            view = self._matrix[row]
+            view.flags.writeable = False
+            return view
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store freshly computed vectors and log their rows once.
+
+        Vectors whose width differs from the matrix are skipped. Blocks on
+        disk I/O and the lock file; call it from a worker thread.
+        """
+        if not texts:
+            return
+        with self._locked():
+            if self._stamp() != self._index_stamp:
+                self._load()
+            elif self._matrix is not None and self._log_size() > self._log_offset:
+                self._replay_log()
+            if self._matrix is None:
+                self.dim = len(vectors[0])
+                self._open_matrix("w+")
+                self._free = list(range(self.capacity - 1, -1, -1))
+                self._save_index()
+            assigned: Dict[str, int] = {}
+            for text, vector in zip(texts, vectors):
+                if len(vector) != self.dim:
+                    self.skipped += 1
+                    continue
+                key = text_key(model, text)
+                row = self._rows.get(key)
+                if row is None:
+                    if self._free:
+                        row = self._free.pop()
+                    else:
+                        _, row = self._rows.popitem(last=False)
+                        self.evictions += 1
+                    self._rows[key] = row
+                self._rows.move_to_end(key)
+                self._keys[row] = 0
+                self._matrix[row] = vector
+                self._keys[row] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+                assigned[key] = row
+            if not assigned:
+                return
+            self._matrix.flush()
+            self._keys.flush()
+            self._append_log(assigned)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "skipped": self.skipped,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "rows": len(self._rows),
+            "capacity": self.capacity,
+        }
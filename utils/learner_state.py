@@ -0,0 +1,174 @@
+"""Learner-scoped state on top of a ``SessionStore``.
+
+Every profile, session, hackathon and "current session" pointer is keyed by
+the learner it belongs to, so concurrent learners never see or overwrite
+each other's data. Read-modify-write cycles hold the learner's lock: an
+``asyncio.Lock`` within the process plus a lease in the store, so updates
+from different workers are serialized too. Learners never wait on each
+other's locks.
+
+Reads can reach SQLite, so async handlers use the ``a``-prefixed
+accessors, which run the store call in a worker thread. Writes are only
+buffered in memory and stay synchronous.
+"""
+
+import asyncio
+import os
+import re
+import uuid
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Generic, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+from utils.session_store import ModelMap, SessionStore
+
+P = TypeVar("P", bound=BaseModel)
+S = TypeVar("S", bound=BaseModel)
+H = TypeVar("H", bound=BaseModel)
+
+LEARNER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# A lease outlives any one update; it only expires if its worker died
+LOCK_TTL = 30.0
+LOCK_POLL = 0.01
+LOCK_POLL_MAX = 0.2
+
+
+def is_valid_learner_id(learner_id: str) -> bool:
+    return bool(LEARNER_ID_PATTERN.match(learner_id))
+
+
+class LearnerState(Generic[P, S, H]):
+    """Profiles, reading sessions and hackathons grouped by learner id."""
+
+    def __init__(
+        self,
+        store: SessionStore,
+        new_profile: Callable[[str], P],
+        profile_model: Type[P],
+        session_model: Type[S],
+        hackathon_model: Type[H],
+    ):
+        self.store = store
+        self.new_profile = new_profile
+        self.profiles = ModelMap(store, "profiles", profile_model)
+        self.sessions = ModelMap(store, "sessions", session_model)
+        self.hackathons = ModelMap(store, "hackathons", hackathon_model)
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def key(learner_id: str, item_id: str) -> str:
+        return f"{learner_id}/{item_id}"
+
+    @asynccontextmanager
+    async def lock(self, learner_id: str) -> AsyncIterator[None]:
+        """Hold the learner's lock in this process and across workers.
+
+        On release the store is flushed before the lease is returned, so
+        whichever worker takes the lock next reads what was saved under it.
+        """
+        local = self._locks.get(learner_id)
+        if local is None:
+            local = self._locks[learner_id] = asyncio.Lock()
+        async with local:
+            name, owner = f"learner/{learner_id}", f"{os.getpid()}/{uuid.uuid4().hex}"
+            delay = LOCK_POLL
+            while not await asyncio.to_thread(self.store.try_lock, name, owner, LOCK_TTL):
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, LOCK_POLL_MAX)
+            try:
+                yield
+            finally:
+                await asyncio.to_thread(self.store.unlock, name, owner)
+
+    # ------------------------------------------------------------------
+    # Pointers ("current_session", "current_hackathon")
+    # ------------------------------------------------------------------
+
+    def get_pointer(self, learner_id: str, name: str) -> Optional[str]:
+        return self.store.get("pointers", self.key(learner_id, name))
+
+    async def aget_pointer(self, learner_id: str, name: str) -> Optional[str]:
+        return await asyncio.to_thread(self.get_pointer, learner_id, name)
+
+    def set_pointer(self, learner_id: str, name: str, value: Optional[str]) -> None:
+        if value is None:
+            self.store.delete("pointers", self.key(learner_id, name))
+        else:
+            self.store.put("pointers", self.key(learner_id, name), value)
+
+    # ------------------------------------------------------------------
+    # Profiles
+    # ------------------------------------------------------------------
+
+    def load_profile(self, learner_id: str) -> P:
+        return self.profiles.get(learner_id) or self.new_profile(learner_id)
+
+    async def aload_profile(self, learner_id: str) -> P:
+        return await asyncio.to_thread(self.load_profile, learner_id)
+
+    def save_profile(self, learner_id: str, profile: P) -> None:
+        self.profiles[learner_id] = profile
+
+    @asynccontextmanager
+    async def update_profile(self, learner_id: str) -> AsyncIterator[P]:
+        """Load the profile under the learner's lock and save it on exit."""
+        async with self.lock(learner_id):
+            profile = await self.aload_profile(learner_id)
+            yield profile
+            self.save_profile(learner_id, profile)
+
+    # ------------------------------------------------------------------
+    # Reading sessions and hackathons
+    # ------------------------------------------------------------------
+
+    def get_session(self, learner_id: str, session_id: Optional[str]) -> Optional[S]:
+        return self.sessions.get(self.key(learner_id, session_id)) if session_id else None
+
+    async def aget_session(self, learner_id: str, session_id: Optional[str]) -> Optional[S]:
+        return await asyncio.to_thread(self.get_session, learner_id, session_id)
+
+    def save_session(self, learner_id: str, session_id: str, session: S) -> None:
+        self.sessions[self.key(learner_id, session_id)] = session
+
+    def current_session(self, learner_id: str) -> Optional[S]:
+        return self.get_session(learner_id, self.get_pointer(learner_id, "current_session"))
+
+    async def acurrent_session(self, learner_id: str) -> Optional[S]:
+        return await asyncio.to_thread(self.current_session, learner_id)
+
+    def get_hackathon(self, learner_id: str, session_id: Optional[str]) -> Optional[H]:
+        return self.hackathons.get(self.key(learner_id, session_id)) if session_id else None
+
+    async def aget_hackathon(self, learner_id: str, session_id: Optional[str]) -> Optional[H]:
+        return await asyncio.to_thread(self.get_hackathon, learner_id, session_id)
+
+    def save_hackathon(self, learner_id: str, session_id: str, session: H) -> None:
+        self.hackathons[self.key(learner_id, session_id)] = session
+
+    def current_hackathon(self, learner_id: str) -> Optional[H]:
+        return self.get_hackathon(learner_id, self.get_pointer(learner_id, "current_hackathon"))
+
+    async def acurrent_hackathon(self, learner_id: str) -> Optional[H]:
+        return await asyncio.to_thread(self.current_hackathon, learner_id)
+
+    def reset(self, learner_id: str) -> None:
+        """Forget the learner's sessions and hackathons; the profile stays."""
+        prefix = self.key(learner_id, "")
+        for models in (self.sessions, self.hackathons):
+            for key in models.keys(prefix):
+                del models[key]
+        self.set_pointer(learner_id, "current_session", None)
+        self.set_pointer(learner_id, "current_hackathon", None)
+
+    async def areset(self, learner_id: str) -> list:
+        """Reset the learner in a worker thread; return the dropped session ids."""
+        def reset() -> list:
+            prefix = self.key(learner_id, "")
+            session_ids = [key[len(prefix):] for key in self.sessions.keys(prefix)]
+            self.reset(learner_id)
+            return session_ids
+
+        return await asyncio.to_thread(reset)
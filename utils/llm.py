@@ -0,0 +1,221 @@
+"""Async LLM gateway shared by the app.py helpers.
+
+Every chat, transcription and embedding request goes through one pooled
+``AsyncOpenAI`` client so a slow completion for one learner never blocks the
+event loop for everybody else.
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from openai import AsyncOpenAI
+
+from .embedding_store import EmbeddingStore
+from .llm_cache import ResponseCache, file_digest, make_key
+
+DEFAULT_CHAT_MODEL = "gpt-4o-mini"
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+
+Messages = Union[str, List[Dict[str, Any]]]
+
+
+def _as_messages(prompt: Messages) -> List[Dict[str, Any]]:
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt}]
+    return prompt
+
+
+class LLMGateway:
+    """Non-blocking front door for OpenAI calls.
+
+    ``max_concurrency`` bounds how many requests are in flight at once so a
+    burst of learners queues politely instead of exhausting the HTTP pool.
+    Chat calls that pass ``cache_ttl`` are served from ``cache`` when an
+    identical request was answered recently, and texts already present in
+    ``embeddings`` are never sent to the embeddings API again. Transcriptions
+    that pass ``cache_ttl`` are looked up in ``transcripts`` by a hash of the
+    recording, so a re-submitted recording is not uploaded again, and
+    identical recordings that arrive together share one request.
+    """
+
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        cache: Optional[ResponseCache] = None,
+        embeddings: Optional[EmbeddingStore] = None,
+        transcripts: Optional[ResponseCache] = None,
+    ):
+        self.client = client or AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.cache = cache
+        self.embeddings = embeddings
+        self.transcripts = transcripts
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._transcribing: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+
+    async def chat(
+        self,
+        prompt: Messages,
+        model: str = DEFAULT_CHAT_MODEL,
+        cache_ttl: Optional[float] = None,
+        cacheable: Optional[Callable[[str], bool]] = None,
+        **params,
+    ) -> str:
+        """Return the stripped text of a single chat completion.
+
+        ``cache_ttl`` opts the call site into the response cache; leave it
+        as ``None`` where every call should produce something new. A
+        completion that ``cacheable`` rejects is returned but not cached.
+        """
+        messages = _as_messages(prompt)
+        key = None
+        if cache_ttl and self.cache is not None:
+            key = make_key(model, messages, params)
+            cached = await self.cached(key)
+            if cached is not None:
+                return cached
+
+        async with self._slots:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                **params,
+            )
+        content = (response.choices[0].message.content or "").strip()
+        if key is not None and content and (cacheable is None or cacheable(content)):
+            await self.remember(key, content, cache_ttl)
+        return content
+
+    async def cached(self, key: str) -> Optional[str]:
+        """Look ``key`` up in the response cache: memory hits inline, SQLite in a thread."""
+        cached = self.cache.peek(key)
+        if cached is None:
+            if self.cache.on_disk:
+                cached = await asyncio.to_thread(self.cache.get, key)
+            else:
+                cached = self.cache.get(key)  # counts the miss
+        return cached
+
+    async def remember(self, key: str, value: str, ttl: float) -> None:
+        """Store a response in the cache, writing SQLite in a thread."""
+        if self.cache.on_disk:
+            await asyncio.to_thread(self.cache.set, key, value, ttl)
+        else:
+            self.cache.set(key, value, ttl)
+
+    async def stream_chat(
+        self,
+        prompt: Messages,
+        model: str = DEFAULT_CHAT_MODEL,
+        **params,
+    ) -> AsyncIterator[str]:
+        """Yield the completion text piece by piece as tokens arrive."""
+        async with self._slots:
+            stream = await self.client.chat.completions.create(
+                model=model,
+                messages=_as_messages(prompt),
+                stream=True,
+                **params,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def _transcription(
+        self,
+        file,
+        model: str,
+        params: Dict[str, Any],
+        cache_ttl: Optional[float],
+        request: Callable[[], Awaitable[str]],
+    ) -> str:
+        """Run ``request`` unless this recording was transcribed recently."""
+        if not cache_ttl or self.transcripts is None:
+            return await request()
+        digest = await asyncio.to_thread(file_digest, file)
+        key = make_key(model, {"audio": digest}, params)
+        cached = self.transcripts.get(key)
+        if cached is not None:
+            return cached
+        pending = self._transcribing.get(key)
+        if pending is not None:
+            result = await asyncio.shield(pending)
+            if result is not None:
+                return result
+            # The first request failed; try again on our own
+
+        future = self._transcribing[key] = asyncio.get_running_loop().create_future()
+        result = None
+        try:
+            result = await request()
+            self.transcripts.set(key, result, cache_ttl)
+            return result
+        finally:
+            self._transcribing.pop(key, None)
+            future.set_result(result)
+
+    async def transcribe(self, file, model: str, cache_ttl: Optional[float] = None, **params) -> str:
+        """Transcribe an audio file object and return the text."""
+        async def request() -> str:
+            async with self._slots:
+                response = await self.client.audio.transcriptions.create(
+                    file=file,
+                    model=model,
+                    **params,
+                )
+            return response.text.strip()
+
+        return await self._transcription(file, model, params, cache_ttl, request)
+
+    async def transcribe_words(
+        self, file, model: str, cache_ttl: Optional[float] = None, **params
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Transcribe with word-level timestamps.
+
+        Returns the text and a list of ``{"word", "start", "end"}`` dicts,
+        times in seconds. Only ``whisper-1`` supports word timestamps.
+        """
+        async def request() -> str:
+            async with self._slots:
+                response = await self.client.audio.transcriptions.create(
+                    file=file,
+                    model=model,
+                    response_format="verbose_json",
+                    timestamp_granularities=["word"],
+                    **params,
+                )
+            words = [{"word": w.word, "start": w.start, "end": w.end} for w in response.words or []]
+            return json.dumps({"text": response.text.strip(), "words": words})
+
+        key_params = {**params, "timestamp_granularities": ["word"]}
+        result = json.loads(await self._transcription(file, model, key_params, cache_ttl, request))
+        return result["text"], result["words"]
+
+    async def embed(self, texts: Sequence[str], model: str) -> List[List[float]]:
+        """Embed a batch of texts with at most one API request.
+
+        Cached and duplicate texts are resolved locally; only the distinct
+        misses are sent to the API.
+        """
+        if not texts:
+            return []
+        found: Dict[str, Any] = {}
+        if self.embeddings is not None:
+            for text in dict.fromkeys(texts):
+                vector = self.embeddings.get(model, text)
+                if vector is not None:
+                    found[text] = vector.tolist()
+        missing = [text for text in dict.fromkeys(texts) if text not in found]
+        if missing:
+            async with self._slots:
+                response = await self.client.embeddings.create(model=model, input=missing)
+            vectors = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+            found.update(zip(missing, vectors))
+            if self.embeddings is not None:
+                await asyncio.to_thread(self.embeddings.put_many, model, missing, vectors)
+        return [found[text] for text in texts]
+
+    async def aclose(self) -> None:
+        await self.client.close()
@@ -0,0 +1,195 @@
+"""Content-addressed cache for LLM responses.
+
+Entries are keyed by a SHA-256 of the model, prompt and request parameters;
+audio prompts are identified by a SHA-256 of the recording's bytes.
+A small in-memory LRU sits in front of a SQLite file so hits survive a
+restart, and both tiers are capped and evicted least-recently-used first.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+DIGEST_CHUNK = 1024 * 1024
+
+
+def make_key(model: str, prompt: Any, params: Optional[Dict[str, Any]] = None) -> str:
+    """Return a stable hash for a model request."""
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "params": params or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_digest(file: Any) -> str:
+    """Return a SHA-256 of an upload's bytes.
+
+    ``file`` is anything the OpenAI client accepts as a file: bytes, a
+    binary file object, or a ``(name, file, content_type)`` tuple. File
+    objects are read from the start and left where they were.
+    """
+    if isinstance(file, tuple):
+        file = file[1]
+    digest = hashlib.sha256()
+    if isinstance(file, (bytes, bytearray, memoryview)):
+        digest.update(file)
+        return digest.hexdigest()
+    position = file.tell()
+    file.seek(0)
+    try:
+        for chunk in iter(lambda: file.read(DIGEST_CHUNK), b""):
+            digest.update(chunk)
+    finally:
+        file.seek(position)
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """Two-tier LRU cache with per-entry TTLs.
+
+    ``path=None`` keeps up to ``max_entries`` in memory only, which is what
+    the tests and short-lived caches want.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = None,
+        max_entries: int = 5000,
+        memory_entries: int = 256,
+    ):
+        self.max_entries = max_entries
+        # Without a disk tier the memory tier is the whole cache.
+        self.memory_entries = min(memory_entries, max_entries) if path is not None else max_entries
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)"
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    @property
+    def on_disk(self) -> bool:
+        """Whether lookups and writes may touch the SQLite file."""
+        return self._db is not None
+
+    def peek(self, key: str) -> Optional[str]:
+        """Look in the memory tier only; a miss here is not counted.
+
+        Never touches the disk, so async callers can try it inline before
+        handing :meth:`get` to a thread.
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is None or cached[1] <= now:
+                return None
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return cached[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                value, expires_at = cached
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._db.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                    self._db.commit()
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+                if row is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._db.commit()
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = len(self._memory)
+            if self._db is not None:
+                (entries,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
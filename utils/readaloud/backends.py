@@ -0,0 +1,185 @@
+"""Speech-to-text backends for read-aloud scoring.
+
+A backend turns an uploaded recording into its text and word timestamps:
+
+* ``OpenAIBackend`` sends the upload's spool to Whisper through the shared
+  ``LLMGateway``, with the transcription cache in front.
+* ``LocalBackend`` runs a CTranslate2 Whisper model from ``faster-whisper``
+  on the CPU, offline. Decoding is CPU-bound, so it runs in a pool of
+  worker processes and the event loop only waits on a future. Each worker
+  loads the model once when it starts and keeps it for its lifetime; if a
+  worker dies the pool is replaced and the request retried once.
+
+``make_backend`` picks one by name, which is how ``READALOUD_STT`` selects
+the backend for ``/submit_audio``.
+"""
+
+import asyncio
+import importlib.util
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import UploadFile
+
+from ..audio import MAX_AUDIO_BYTES, too_large, transcription_file, upload_size
+
+Words = List[Dict[str, Any]]
+
+# Transcription models that can return word timestamps
+WORD_TIMESTAMP_MODELS = {"whisper-1"}
+
+LOCAL_MODEL = os.getenv("READALOUD_LOCAL_MODEL", "base.en")
+LOCAL_WORKERS = int(os.getenv("READALOUD_LOCAL_WORKERS", "1"))
+LOCAL_THREADS = int(os.getenv("READALOUD_LOCAL_THREADS", "2"))
+
+
+class SpeechBackend:
+    """Transcribes read-aloud recordings; subclasses implement ``transcribe``."""
+
+    name = "base"
+
+    async def transcribe(self, upload: UploadFile) -> Tuple[str, Words]:
+        """Return the text and ``{"word", "start", "end"}`` timestamps.
+
+        The word list is empty when the backend cannot time words.
+        """
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        """Get ready to serve requests; called once at app startup."""
+
+    async def close(self) -> None:
+        """Release anything ``start`` acquired."""
+
+
+class OpenAIBackend(SpeechBackend):
+    """Whisper over the network, through an ``LLMGateway``."""
+
+    name = "openai"
+
+    def __init__(self, llm, model: str = "whisper-1", cache_ttl: Optional[float] = 3600):
+        self.llm = llm
+        self.model = model
+        self.cache_ttl = cache_ttl
+
+    async def transcribe(self, upload: UploadFile) -> Tuple[str, Words]:
+        params = {"language": "en", "temperature": 0.0}  # More deterministic transcription
+        if self.model not in WORD_TIMESTAMP_MODELS:
+            text = await self.llm.transcribe(
+                transcription_file(upload), model=self.model, cache_ttl=self.cache_ttl, **params
+            )
+            return text, []
+        return await self.llm.transcribe_words(
+            transcription_file(upload), model=self.model, cache_ttl=self.cache_ttl, **params
+        )
+
+
+# -- Local worker processes --------------------------------------------------
+
+_model = None
+
+
+def _load_model(model: str, threads: int) -> None:
+    global _model
+    from faster_whisper import WhisperModel
+
+    _model = WhisperModel(model, device="cpu", compute_type="int8", cpu_threads=threads)
+
+
+def _ready() -> bool:
+    return _model is not None
+
+
+def _transcribe(data: bytes) -> Tuple[str, Words]:
+    segments, _ = _model.transcribe(
+        io.BytesIO(data),
+        language="en",
+        beam_size=1,
+        temperature=0.0,
+        word_timestamps=True,
+        condition_on_previous_text=False,
+    )
+    texts, words = [], []
+    for segment in segments:
+        texts.append(segment.text)
+        words.extend({"word": w.word.strip(), "start": w.start, "end": w.end} for w in segment.words or [])
+    return "".join(texts).strip(), words
+
+
+class LocalBackend(SpeechBackend):
+    """Offline Whisper on the CPU in ``workers`` processes.
+
+    Workers are spawned rather than forked so they do not inherit the
+    server's threads and sockets. ``start`` loads the model in every worker
+    up front; otherwise the first requests pay for it.
+    """
+
+    name = "local"
+
+    def __init__(self, model: str = LOCAL_MODEL, workers: int = LOCAL_WORKERS, threads: int = LOCAL_THREADS):
+        if not self.available():
+            raise RuntimeError("READALOUD_STT=local needs the faster-whisper package (pip install faster-whisper)")
+        self.model = model
+        self.workers = workers
+        self.threads = threads
+        self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_load_model,
+            initargs=(self.model, self.threads),
+        )
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("faster_whisper") is not None
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _ready) for _ in range(self.workers)))
+
+    async def transcribe(self, upload: UploadFile, max_bytes: int = MAX_AUDIO_BYTES) -> Tuple[str, Words]:
+        if upload_size(upload) > max_bytes:
+            raise too_large(max_bytes)
+        await upload.seek(0)
+        data = await upload.read()
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            return await loop.run_in_executor(pool, _transcribe, data)
+        except BrokenProcessPool:
+            # A worker died (OOM kill, crash in the decoder); the executor
+            # refuses all further work, so swap in a fresh one and retry once
+            if self._pool is pool:
+                print("⚠️ Local speech worker died; restarting the pool")
+                self._pool = self._new_pool()
+                pool.shutdown(wait=False)
+            return await loop.run_in_executor(self._pool, _transcribe, data)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._pool.shutdown)
+
+
+def make_backend(name: str = "auto", llm=None, model: str = "whisper-1") -> Optional[SpeechBackend]:
+    """Return the backend called ``name``: ``"openai"``, ``"local"`` or ``"auto"``.
+
+    ``"auto"`` prefers the local model when faster-whisper is installed,
+    then Whisper when ``llm`` is given, and returns ``None`` when neither
+    is available. Asking for an unavailable backend by name raises
+    ``RuntimeError``.
+    """
+    if name == "local" or (name == "auto" and LocalBackend.available()):
+        return LocalBackend()
+    if name in ("openai", "auto"):
+        if llm is None:
+            if name == "auto":
+                return None
+            raise RuntimeError("READALOUD_STT=openai needs OPENAI_API_KEY")
+        return OpenAIBackend(llm, model)
+    raise RuntimeError(f"Unknown READALOUD_STT backend {name!r} (use openai, local or auto)")
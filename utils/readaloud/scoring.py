@@ -0,0 +1,62 @@
+"""Fluency metrics for a read-aloud, from its transcription and timing."""
+
+from typing import Any, Dict, List, Optional
+
+from ..audio import reading_time
+from ..word_alignment import align_reading
+
+# Used when neither word timestamps nor the recording give a duration
+ESTIMATED_WPM = 130
+# Reading faster than this aloud means the duration is wrong
+MAX_WPM = 200
+
+
+def reading_metrics(
+    passage: str,
+    transcription: str,
+    timed_words: List[Dict[str, Any]],
+    recording_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Score ``transcription`` against ``passage``.
+
+    WPM counts the transcribed words over the real speaking time from
+    ``timed_words``, else over ``recording_seconds``, else over an estimate
+    from the passage's length at ``ESTIMATED_WPM``. Accuracy is the share
+    of passage words the word alignment marks as read correctly.
+    """
+    target = passage.strip()
+    target_words = target.split()
+    timing = reading_time(timed_words, recording_seconds)
+    if timing is None:
+        # At least 0.3 seconds per word, minimum 5 seconds
+        min_duration = max(len(target_words) * 0.3, 5.0)
+        timing = {
+            "reading_duration": max(len(target_words) / ESTIMATED_WPM * 60, min_duration),
+            "pause_count": None,
+            "pause_time": None,
+            "longest_pause": None,
+            "duration_source": "estimate",
+        }
+    reading_duration = timing["reading_duration"]
+    wpm = int(len(transcription.split()) / reading_duration * 60) if reading_duration > 0 else 0
+
+    # Each passage word is correct, substituted or omitted, and extra
+    # spoken words are inserted
+    alignment = align_reading(target, transcription)
+    return {
+        "transcription": transcription,
+        "words_per_minute": min(wpm, MAX_WPM),
+        "words_correct": alignment["words_correct"],
+        "words_total": alignment["words_total"],
+        "accuracy": round(alignment["accuracy"], 3),
+        "similarity_score": round(alignment["similarity"], 3),
+        "substitutions": alignment["substituted"],
+        "omissions": alignment["omitted"],
+        "insertions": alignment["inserted"],
+        "word_results": alignment["words"],
+        "reading_duration": round(reading_duration, 1),
+        "pause_count": timing["pause_count"],
+        "pause_time": None if timing["pause_time"] is None else round(timing["pause_time"], 1),
+        "longest_pause": None if timing["longest_pause"] is None else round(timing["longest_pause"], 1),
+        "duration_source": timing["duration_source"],
+    }
@@ -0,0 +1,349 @@
+"""Session state storage shared by every app.py worker.
+
+State is kept as JSON strings grouped by namespace ("sessions", "hackathons",
+"profiles", "pointers"). Two backends implement the same interface:
+
+* ``InMemorySessionStore`` - a dict, for tests and single-process dev runs.
+* ``SQLiteSessionStore`` - a WAL-mode SQLite file with a primary-key index
+  on (namespace, key). Writes are buffered and flushed by a background
+  thread (write-behind), so several uvicorn workers or processes can share
+  one database file behind one port. Other processes only see a write once
+  it is flushed; app.py flushes before every response, so a client's next
+  request sees its writes whichever worker serves it.
+
+``ModelMap`` gives a dict-like, pydantic-typed view of one namespace. Values
+are copies: callers must assign a model back after changing it.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Generic, Iterator, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class SessionStore:
+    """Interface shared by the storage backends."""
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def put(self, namespace: str, key: str, value: str) -> None:
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str) -> None:
+        raise NotImplementedError
+
+    def count(self, namespace: str) -> int:
+        raise NotImplementedError
+
+    def keys(self, namespace: str, prefix: str = "") -> Iterator[str]:
+        raise NotImplementedError
+
+    def clear(self, namespace: str) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Make buffered writes visible to other processes."""
+
+    def try_lock(self, name: str, owner: str, ttl: float) -> bool:
+        """Take the named lease for ``ttl`` seconds unless someone else holds it."""
+        raise NotImplementedError
+
+    def unlock(self, name: str, owner: str) -> None:
+        """Flush, then give the lease back so the next holder sees our writes."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.flush()
+
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self):
+        self._data: Dict[str, Dict[str, str]] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        return self._data.get(namespace, {}).get(key)
+
+    def put(self, namespace: str, key: str, value: str) -> None:
+        with self._lock:
+            self._data.setdefault(namespace, {})[key] = value
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._data.get(namespace, {}).pop(key, None)
+
+    def count(self, namespace: str) -> int:
+        return len(self._data.get(namespace, {}))
+
+    def keys(self, namespace: str, prefix: str = "") -> Iterator[str]:
+        return iter([key for key in self._data.get(namespace, {}) if key.startswith(prefix)])
+
+    def clear(self, namespace: str) -> None:
+        with self._lock:
+            self._data.pop(namespace, None)
+
+    def try_lock(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            holder = self._leases.get(name)
+            if holder is not None and holder[0] != owner and holder[1] > now:
+                return False
+            self._leases[name] = (owner, now + ttl)
+            return True
+
+    def unlock(self, name: str, owner: str) -> None:
+        with self._lock:
+            if self._leases.get(name, (None,))[0] == owner:
+                del self._leases[name]
+
+
+_DELETED = None
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite backend with write-behind flushing.
+
+    ``put``/``delete`` only record the change in memory; a daemon thread
+    commits everything pending every ``flush_interval`` seconds, or sooner
+    once ``max_pending`` changes have piled up. Reads see this process's
+    pending writes immediately and other processes' writes after they flush.
+    Reads never flush or wait for the write lock, but they do query SQLite,
+    so async callers should run them in a thread.
+    Leases are rows in a ``locks`` table taken inside ``BEGIN IMMEDIATE``,
+    so exactly one process wins; an expired lease (its holder crashed) can
+    be taken over.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.05, max_pending: int = 256):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._reader = self._connect()
+        self._writer = self._connect()
+        self._writer.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key)"
+            ") WITHOUT ROWID"
+        )
+        self._writer.execute(
+            "CREATE TABLE IF NOT EXISTS locks ("
+            " name TEXT PRIMARY KEY,"
+            " owner TEXT NOT NULL,"
+            " expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._pending: Dict[Tuple[str, str], Optional[str]] = {}
+        self._flushing: Dict[Tuple[str, str], Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="session-store-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"⚠️ Session store flush failed: {e}")
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        item = (namespace, key)
+        with self._lock:
+            for buffered in (self._pending, self._flushing):
+                if item in buffered:
+                    return buffered[item]
+            row = self._reader.execute(
+                "SELECT value FROM kv WHERE namespace = ? AND key = ?", item
+            ).fetchone()
+        return row[0] if row else None
+
+    def _buffer(self, namespace: str, key: str, value: Optional[str]) -> None:
+        with self._lock:
+            self._pending[(namespace, key)] = value
+            backlog = len(self._pending)
+        if backlog >= self.max_pending:
+            self._wake.set()
+
+    def put(self, namespace: str, key: str, value: str) -> None:
+        self._buffer(namespace, key, value)
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._buffer(namespace, key, _DELETED)
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                batch = self._flushing = self._pending
+                self._pending = {}
+            now = time.time()
+            upserts = [(ns, key, value, now) for (ns, key), value in batch.items() if value is not _DELETED]
+            deletes = [item for item, value in batch.items() if value is _DELETED]
+            try:
+                self._writer.execute("BEGIN IMMEDIATE")
+                self._writer.executemany(
+                    "INSERT INTO kv (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (namespace, key) DO UPDATE SET"
+                    " value = excluded.value, updated_at = excluded.updated_at",
+                    upserts,
+                )
+                self._writer.executemany("DELETE FROM kv WHERE namespace = ? AND key = ?", deletes)
+                self._writer.execute("COMMIT")
+            except sqlite3.Error:
+                with self._lock:
+                    # Keep the changes first; newer writes win over the failed batch.
+                    self._pending = {**batch, **self._pending}
+                    self._flushing = {}
+                # BEGIN itself may have failed (database is locked)
+                if self._writer.in_transaction:
+                    self._writer.execute("ROLLBACK")
+                raise
+            with self._lock:
+                self._flushing = {}
+
+    def _write(self, *statements: Tuple[str, tuple]) -> int:
+        """Run ``statements`` in one write transaction; return the last rowcount."""
+        with self._flush_lock:
+            try:
+                self._writer.execute("BEGIN IMMEDIATE")
+                for sql, params in statements:
+                    rowcount = self._writer.execute(sql, params).rowcount
+                self._writer.execute("COMMIT")
+            except sqlite3.Error:
+                if self._writer.in_transaction:
+                    self._writer.execute("ROLLBACK")
+                raise
+        return rowcount
+
+    def try_lock(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        return self._write(
+            ("DELETE FROM locks WHERE name = ? AND (expires_at < ? OR owner = ?)", (name, now, owner)),
+            ("INSERT OR IGNORE INTO locks (name, owner, expires_at) VALUES (?, ?, ?)", (name, owner, now + ttl)),
+        ) == 1
+
+    def unlock(self, name: str, owner: str) -> None:
+        self.flush()
+        self._write(("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner)))
+
+    def _buffered(self, namespace: str, prefix: str = "") -> Dict[str, Optional[str]]:
+        """This process's unflushed changes in ``namespace``, newest winning."""
+        return {
+            key: value
+            for buffered in (self._flushing, self._pending)
+            for (ns, key), value in buffered.items()
+            if ns == namespace and key.startswith(prefix)
+        }
+
+    def count(self, namespace: str) -> int:
+        return sum(1 for _ in self.keys(namespace))
+
+    def keys(self, namespace: str, prefix: str = "") -> Iterator[str]:
+        # Committed keys overlaid with our unflushed changes; flushing here
+        # would make every read wait for the write lock
+        with self._lock:
+            if prefix:
+                # Range scan on the primary key instead of LIKE
+                rows = self._reader.execute(
+                    "SELECT key FROM kv WHERE namespace = ? AND key >= ? AND key < ?",
+                    (namespace, prefix, prefix + "\U0010ffff"),
+                ).fetchall()
+            else:
+                rows = self._reader.execute("SELECT key FROM kv WHERE namespace = ?", (namespace,)).fetchall()
+            buffered = self._buffered(namespace, prefix)
+        keys = {row[0] for row in rows}
+        keys.update(key for key, value in buffered.items() if value is not _DELETED)
+        keys.difference_update(key for key, value in buffered.items() if value is _DELETED)
+        return iter(sorted(keys))
+
+    def clear(self, namespace: str) -> None:
+        with self._lock:
+            self._pending = {item: v for item, v in self._pending.items() if item[0] != namespace}
+        # Waits for a flush in progress, so its batch cannot land after the delete
+        self._write(("DELETE FROM kv WHERE namespace = ?", (namespace,)))
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._flusher.join(timeout=1)
+        self.flush()
+        self._reader.close()
+        self._writer.close()
+
+
+def open_session_store(backend: Optional[str] = None, path: Optional[str] = None) -> SessionStore:
+    """Build the store selected by ``SESSION_STORE`` (``sqlite`` or ``memory``)."""
+    backend = backend or os.getenv("SESSION_STORE", "sqlite")
+    if backend == "memory":
+        return InMemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore(path or os.getenv("SESSION_DB_PATH", "sessions.sqlite3"))
+    raise ValueError(f"Unknown session store backend: {backend}")
+
+
+class ModelMap(Generic[M]):
+    """Dict-like view of one namespace that (de)serializes pydantic models."""
+
+    def __init__(self, store: SessionStore, namespace: str, model: Type[M]):
+        self.store = store
+        self.namespace = namespace
+        self.model = model
+
+    def get(self, key: Optional[str]) -> Optional[M]:
+        if key is None:
+            return None
+        raw = self.store.get(self.namespace, key)
+        return self.model.model_validate_json(raw) if raw is not None else None
+
+    def __getitem__(self, key: str) -> M:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: M) -> None:
+        self.store.put(self.namespace, key, value.model_dump_json())
+
+    def __delitem__(self, key: str) -> None:
+        self.store.delete(self.namespace, key)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.store.get(self.namespace, key) is not None
+
+    def __len__(self) -> int:
+        return self.store.count(self.namespace)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.store.keys(self.namespace)
+
+    def keys(self, prefix: str = "") -> Iterator[str]:
+        return self.store.keys(self.namespace, prefix)
+
+    def clear(self) -> None:
+        self.store.clear(self.namespace)
@@ -0,0 +1,263 @@
+"""Append-only columnar archive of learner snapshots.
+
+Each learner gets a directory of column files that only ever grow:
+
+    <root>/<learner_id>/timestamp.f64   seconds since the epoch (the index)
+                        wpm.f32         NaN when not a reading snapshot
+                        mood.f32        NaN when no mood was measured
+                        activity.u16    codes into meta.json "strings"
+                        topic.u16
+                        level.u16
+                        meta.json       string table, committed row count and
+                                        whether timestamps are sorted
+
+Only the first ``rows`` rows of each column are committed. An append writes
+its rows to every column and then records the new count in meta.json, so a
+crash partway leaves the columns ragged past the count; readers stop at the
+count and the next append cuts the leftovers off before writing.
+
+Queries memory-map the columns, find the time window with a binary search on
+the timestamp column and aggregate with NumPy, so "WPM per day for the last
+week" touches only the rows in that week.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: appends are only locked in-process
+    fcntl = None
+
+COLUMNS = {
+    "timestamp": ("timestamp.f64", np.float64),
+    "wpm": ("wpm.f32", np.float32),
+    "mood": ("mood.f32", np.float32),
+    "activity": ("activity.u16", np.uint16),
+    "topic": ("topic.u16", np.uint16),
+    "level": ("level.u16", np.uint16),
+}
+_TEXT_FIELDS = {"activity": "activity_id", "topic": "topic", "level": "reading_level"}
+_NONE = np.iinfo(np.uint16).max
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+
+def _epoch(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class SnapshotWindow:
+    """Column slices for one learner and time range."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], strings: List[str]):
+        self.columns = columns
+        self.strings = strings
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def _codes_to_names(self, codes: np.ndarray) -> List[Optional[str]]:
+        return [None if code == _NONE else self.strings[code] for code in codes]
+
+    def wpm_by_day(self) -> List[Dict[str, Any]]:
+        """Average and count of reading WPM per UTC day."""
+        wpm = self.columns["wpm"]
+        reading = ~np.isnan(wpm)
+        days = (self.columns["timestamp"][reading] // 86400).astype(np.int64)
+        if not len(days):
+            return []
+        unique_days, inverse, counts = np.unique(days, return_inverse=True, return_counts=True)
+        sums = np.bincount(inverse, weights=wpm[reading].astype(np.float64))
+        return [
+            {
+                "date": datetime.fromtimestamp(int(day) * 86400, tz=timezone.utc).date().isoformat(),
+                "avg_wpm": round(float(total / count), 1),
+                "readings": int(count),
+            }
+            for day, total, count in zip(unique_days, sums, counts)
+        ]
+
+    def mood_by_topic(self) -> Dict[str, float]:
+        """Average mood score for each topic with at least one mood reading."""
+        mood = self.columns["mood"]
+        measured = ~np.isnan(mood)
+        codes = self.columns["topic"][measured]
+        if not len(codes):
+            return {}
+        unique_codes, inverse, counts = np.unique(codes, return_inverse=True, return_counts=True)
+        sums = np.bincount(inverse, weights=mood[measured].astype(np.float64))
+        names = self._codes_to_names(unique_codes)
+        return {
+            name or "General": round(float(total / count), 2)
+            for name, total, count in zip(names, sums, counts)
+        }
+
+    def activity_counts(self) -> Dict[str, int]:
+        codes, counts = np.unique(self.columns["activity"], return_counts=True)
+        return {name or "unknown": int(count) for name, count in zip(self._codes_to_names(codes), counts)}
+
+    def summary(self) -> Dict[str, Any]:
+        wpm = self.columns["wpm"]
+        mood = self.columns["mood"]
+        readings = wpm[~np.isnan(wpm)]
+        moods = mood[~np.isnan(mood)]
+        summary: Dict[str, Any] = {
+            "snapshots": len(self),
+            "reading_sessions": int(len(readings)),
+            "mood_checks": int(len(moods)),
+        }
+        if len(readings):
+            summary.update({
+                "avg_wpm": round(float(readings.mean()), 1),
+                "max_wpm": int(readings.max()),
+                "wpm_improvement": int(readings[-1] - readings[0]),
+            })
+        if len(moods):
+            summary["avg_mood"] = round(float(moods.mean()), 2)
+        return summary
+
+
+class SnapshotArchive:
+    """Per-learner append-only column files with time-window queries."""
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # one in-process lock per learner, like the per-learner lock files
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def _dir(self, learner_id: str) -> Path:
+        return self.root / learner_id
+
+    @contextmanager
+    def _locked(self, learner_id: str) -> Iterator[Path]:
+        """Serialize appends to one learner's files across processes."""
+        directory = self._dir(learner_id)
+        directory.mkdir(exist_ok=True)
+        thread_lock = self._locks.setdefault(learner_id, threading.Lock())
+        with thread_lock, open(directory / LOCK_FILE, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield directory
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_meta(directory: Path) -> Dict[str, Any]:
+        try:
+            with open(directory / META_FILE, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"strings": [], "sorted": True, "last_timestamp": None, "rows": 0}
+
+    @staticmethod
+    def _write_meta(directory: Path, meta: Dict[str, Any]) -> None:
+        tmp = directory / (META_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, directory / META_FILE)
+
+    @staticmethod
+    def _committed_rows(directory: Path, meta: Dict[str, Any]) -> int:
+        if "rows" in meta:
+            return meta["rows"]
+        # Archives from before the row count: trust the shortest column
+        return min(
+            (directory / filename).stat().st_size // np.dtype(dtype).itemsize
+            if (directory / filename).exists() else 0
+            for filename, dtype in COLUMNS.values()
+        )
+
+    def append(self, learner_id: str, snapshots: Sequence[Any]) -> None:
+        """Append snapshots (objects with LearnerSnapshot's fields)."""
+        if not snapshots:
+            return
+        with self._locked(learner_id) as directory:
+            meta = self._read_meta(directory)
+            strings: List[str] = meta["strings"]
+            codes = {value: code for code, value in enumerate(strings)}
+
+            def code(value: Optional[str]) -> int:
+                if value is None:
+                    return _NONE
+                if value not in codes:
+                    codes[value] = len(strings)
+                    strings.append(value)
+                return codes[value]
+
+            timestamps = [_epoch(s.timestamp) for s in snapshots]
+            rows = {
+                "timestamp": timestamps,
+                "wpm": [np.nan if s.wpm is None else s.wpm for s in snapshots],
+                "mood": [np.nan if s.mood_score is None else s.mood_score for s in snapshots],
+            }
+            for column, field in _TEXT_FIELDS.items():
+                rows[column] = [code(getattr(s, field)) for s in snapshots]
+
+            committed = self._committed_rows(directory, meta)
+            last = meta["last_timestamp"]
+            ordered = [last] + timestamps if last is not None else timestamps
+            meta["sorted"] = meta["sorted"] and all(a <= b for a, b in zip(ordered, ordered[1:]))
+            meta["last_timestamp"] = timestamps[-1] if meta["sorted"] else max(ordered)
+
+            for column, (filename, dtype) in COLUMNS.items():
+                with open(directory / filename, "ab") as f:
+                    # Drop rows a crashed append wrote but never committed
+                    f.truncate(committed * np.dtype(dtype).itemsize)
+                    f.write(np.asarray(rows[column], dtype=dtype).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            # The new count, with the strings its rows use, commits them
+            meta["rows"] = committed + len(snapshots)
+            self._write_meta(directory, meta)
+
+    def _columns(self, directory: Path, rows: int) -> Dict[str, np.ndarray]:
+        columns = {}
+        for column, (filename, dtype) in COLUMNS.items():
+            path = directory / filename
+            if not path.exists() or path.stat().st_size < np.dtype(dtype).itemsize:
+                columns[column] = np.zeros(0, dtype=dtype)
+            else:
+                columns[column] = np.memmap(path, dtype=dtype, mode="r")
+        # Past ``rows`` are an append in progress or the remains of a crashed one
+        rows = min(rows, *(len(values) for values in columns.values()))
+        return {column: values[:rows] for column, values in columns.items()}
+
+    def window(
+        self,
+        learner_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> SnapshotWindow:
+        """Snapshots with ``start <= timestamp < end`` (either bound optional)."""
+        directory = self._dir(learner_id)
+        meta = self._read_meta(directory)
+        columns = self._columns(directory, self._committed_rows(directory, meta))
+        timestamps = columns["timestamp"]
+        lo = _epoch(start) if start else -np.inf
+        hi = _epoch(end) if end else np.inf
+        if meta["sorted"]:
+            first, last = np.searchsorted(timestamps, [lo, hi], side="left")
+            columns = {column: values[first:last] for column, values in columns.items()}
+        else:
+            mask = (timestamps >= lo) & (timestamps < hi)
+            columns = {column: values[mask] for column, values in columns.items()}
+        return SnapshotWindow(columns, meta["strings"])
+
+    def last_days(self, learner_id: str, days: int, now: Optional[datetime] = None) -> SnapshotWindow:
+        now = now or datetime.now(timezone.utc)
+        return self.window(learner_id, now - timedelta(days=days))
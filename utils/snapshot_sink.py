@@ -0,0 +1,247 @@
+"""Background writer that batches learner snapshots into the vector store.
+
+Request handlers call :meth:`SnapshotSink.submit` and return immediately. A
+worker task groups pending snapshots, embeds them with one API call per batch,
+and upserts them in chunks through a single reused index handle. Failed
+writes are retried with exponential backoff and, if the store stays down,
+spooled to a local JSONL file that is replayed after the next good write.
+Several workers may share one spool; appends and the hand-off to a replay
+take a file lock, and the spool is renamed to a private name before it is
+read so nothing appended meanwhile is lost.
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: the spool is only safe for one worker
+    fcntl = None
+
+Embedder = Callable[[Sequence[str]], Awaitable[List[List[float]]]]
+
+DEFAULT_BATCH_SIZE = int(os.getenv("SNAPSHOT_BATCH_SIZE", "32"))
+DEFAULT_FLUSH_INTERVAL = float(os.getenv("SNAPSHOT_FLUSH_SECONDS", "2.0"))
+
+_STOP = object()
+
+
+class SnapshotSink:
+    """Size- or time-triggered batch writer for vector upserts.
+
+    ``index_factory`` is called once, off the event loop, the first time a
+    batch is written; any object with an ``upsert(vectors=[...])`` method
+    works, which is how the tests use an in-memory stand-in.
+    """
+
+    def __init__(
+        self,
+        index_factory: Callable[[], Any],
+        embed: Embedder,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        upsert_chunk: int = 100,
+        max_retries: int = 4,
+        backoff: float = 0.5,
+        spool_path: Union[str, Path, None] = None,
+    ):
+        self._index_factory = index_factory
+        self._index = None
+        self._embed = embed
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.upsert_chunk = upsert_chunk
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.spool_path = Path(spool_path) if spool_path else None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.written = 0
+        self.spooled = self._count_spooled()
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def submit(self, vector_id: str, text: str, metadata: Dict[str, Any]) -> None:
+        """Queue one record for embedding and upsert; never blocks."""
+        self._ensure_worker()
+        self._queue.put_nowait({"id": vector_id, "text": text, "metadata": metadata})
+
+    def _ensure_worker(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def start(self) -> None:
+        self._ensure_worker()
+
+    async def stop(self) -> None:
+        """Write whatever is still queued, then stop the worker."""
+        if self._worker is not None and not self._worker.done():
+            self._queue.put_nowait(_STOP)
+            await self._worker
+        self._worker = None
+        await self.flush()
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _drain(self, batch: List[dict]) -> bool:
+        """Move queued records into ``batch``; returns False on the stop marker."""
+        while len(batch) < self.batch_size and not self._queue.empty():
+            record = self._queue.get_nowait()
+            if record is _STOP:
+                return False
+            batch.append(record)
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        running = True
+        while running:
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while running and len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if record is _STOP:
+                    running = False
+                    break
+                batch.append(record)
+                running = self._drain(batch)
+            await self._write(batch)
+
+    async def flush(self) -> int:
+        """Write everything currently queued; returns the number of records."""
+        total = 0
+        while self._queue is not None and not self._queue.empty():
+            batch: List[dict] = []
+            self._drain(batch)
+            if batch:
+                await self._write(batch)
+            total += len(batch)
+        return total
+
+    async def _write(self, records: List[dict]) -> None:
+        try:
+            await self._upsert_with_retry(records)
+        except Exception as e:
+            print(f"⚠️ Vector store unavailable, spooling {len(records)} snapshots: {e}")
+            await asyncio.to_thread(self._spool, records)
+            return
+        self.written += len(records)
+        await self._replay_spool()
+
+    async def _upsert_with_retry(self, records: List[dict]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._upsert(records)
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    async def _upsert(self, records: List[dict]) -> None:
+        missing = [r for r in records if r.get("values") is None]
+        if missing:
+            vectors = await self._embed([r["text"] for r in missing])
+            for record, values in zip(missing, vectors):
+                record["values"] = values
+
+        if self._index is None:
+            self._index = await asyncio.to_thread(self._index_factory)
+        for start in range(0, len(records), self.upsert_chunk):
+            chunk = records[start:start + self.upsert_chunk]
+            vectors = [(r["id"], r["values"], r["metadata"]) for r in chunk]
+            await asyncio.to_thread(self._index.upsert, vectors=vectors)
+
+    # ------------------------------------------------------------------
+    # On-disk spool
+    # ------------------------------------------------------------------
+
+    def _count_spooled(self) -> int:
+        if self.spool_path is None or not self.spool_path.exists():
+            return 0
+        with open(self.spool_path, encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip())
+
+    @contextmanager
+    def _spool_locked(self) -> Iterator[None]:
+        """Serialize spool appends and hand-offs across worker processes."""
+        self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.spool_path.with_name(self.spool_path.name + ".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _append_spool(self, records: List[dict]) -> None:
+        with self._spool_locked(), open(self.spool_path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    def _spool(self, records: List[dict]) -> None:
+        if self.spool_path is None:
+            return
+        self._append_spool(records)
+        self.spooled += len(records)
+
+    def _claim_spool(self) -> List[dict]:
+        """Take the spool over under a private name and return its records.
+
+        Appends that arrive afterwards start a fresh spool, which the next
+        good write replays.
+        """
+        claimed = self.spool_path.with_name(f"{self.spool_path.name}.{os.getpid()}-{uuid.uuid4().hex}")
+        with self._spool_locked():
+            if not self.spool_path.exists():
+                return []
+            self.spool_path.rename(claimed)
+        with open(claimed, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        claimed.unlink()
+        return records
+
+    async def _replay_spool(self) -> None:
+        if self.spool_path is None or not self.spool_path.exists():
+            return
+        # Records go back into the spool if the store fails again.
+        records = await asyncio.to_thread(self._claim_spool)
+        if not records:
+            return
+        for start in range(0, len(records), self.batch_size):
+            batch = records[start:start + self.batch_size]
+            try:
+                await self._upsert_with_retry(batch)
+            except Exception:
+                await asyncio.to_thread(self._append_spool, records[start:])
+                return
+            self.written += len(batch)
+            self.spooled -= len(batch)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "spooled": self.spooled,
+        }
@@ -0,0 +1,213 @@
+"""Bounded snapshot history and running statistics for a learner profile.
+
+``SnapshotRing`` keeps the most recent snapshots in fixed-size NumPy columns
+(timestamp, wpm, mood, and codes into a small string table for activity,
+topic and reading level). Old rows are overwritten once it is full, so a
+profile never grows with usage.
+
+``SnapshotStats`` is updated on every append and holds everything
+/api/get-stats reports, so reading the stats never scans the history.
+Both serialize to compact JSON as part of the profile.
+"""
+
+import base64
+import math
+import os
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+from pydantic_core import core_schema
+
+SNAPSHOT_HISTORY = int(os.getenv("SNAPSHOT_HISTORY", "500"))
+
+_NONE = np.iinfo(np.uint16).max
+_TEXT_COLUMNS = ("activity_id", "topic", "reading_level")
+
+
+class SnapshotStats(BaseModel):
+    """Running aggregates over every snapshot ever recorded."""
+
+    count: int = 0
+    reading_count: int = 0
+    wpm_total: int = 0
+    wpm_max: Optional[int] = None
+    first_wpm: Optional[int] = None
+    latest_wpm: Optional[int] = None
+    mood_count: int = 0
+    mood_total: float = 0.0
+    latest_mood: Optional[float] = None
+    topic_counts: Dict[str, int] = {}
+
+    def add(self, snapshot: Any) -> None:
+        self.count += 1
+        if snapshot.wpm is not None:
+            self.reading_count += 1
+            self.wpm_total += snapshot.wpm
+            self.wpm_max = snapshot.wpm if self.wpm_max is None else max(self.wpm_max, snapshot.wpm)
+            if self.first_wpm is None:
+                self.first_wpm = snapshot.wpm
+            self.latest_wpm = snapshot.wpm
+        if snapshot.mood_score is not None:
+            self.mood_count += 1
+            self.mood_total += snapshot.mood_score
+            self.latest_mood = snapshot.mood_score
+        if snapshot.topic:
+            self.topic_counts[snapshot.topic] = self.topic_counts.get(snapshot.topic, 0) + 1
+
+    @classmethod
+    def rebuild(cls, ring: "SnapshotRing") -> "SnapshotStats":
+        """Recompute the aggregates from whatever history is still kept."""
+        stats = cls()
+        for row in ring:
+            stats.add(SimpleNamespace(**row))
+        return stats
+
+    @property
+    def avg_wpm(self) -> Optional[float]:
+        return self.wpm_total / self.reading_count if self.reading_count else None
+
+    @property
+    def avg_mood(self) -> Optional[float]:
+        return self.mood_total / self.mood_count if self.mood_count else None
+
+
+class SnapshotRing:
+    """Fixed-capacity, column-oriented ring buffer of snapshots."""
+
+    def __init__(self, capacity: int = SNAPSHOT_HISTORY):
+        self.capacity = capacity
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._wpm = np.full(capacity, np.nan, dtype=np.float32)
+        self._mood = np.full(capacity, np.nan, dtype=np.float32)
+        self._codes = np.full((capacity, len(_TEXT_COLUMNS)), _NONE, dtype=np.uint16)
+        self._strings: List[str] = []
+        self._string_codes: Dict[str, int] = {}
+        self._next = 0
+        self._size = 0
+
+    def _code(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NONE
+        code = self._string_codes.get(value)
+        if code is None:
+            if len(self._strings) >= _NONE:
+                self._compact_strings()
+            code = self._string_codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+    def _compact_strings(self) -> None:
+        rows = list(self)
+        self.__init__(self.capacity)
+        for row in rows:
+            self._append_row(row)
+
+    def _append_row(self, row: Dict[str, Any]) -> None:
+        i = self._next
+        timestamp = row["timestamp"]
+        if isinstance(timestamp, datetime):
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=timezone.utc)
+            timestamp = timestamp.timestamp()
+        self._timestamps[i] = timestamp
+        self._wpm[i] = np.nan if row.get("wpm") is None else row["wpm"]
+        self._mood[i] = np.nan if row.get("mood_score") is None else row["mood_score"]
+        self._codes[i] = [self._code(row.get(column)) for column in _TEXT_COLUMNS]
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def append(self, snapshot: Any) -> None:
+        self._append_row({
+            "timestamp": snapshot.timestamp,
+            "wpm": snapshot.wpm,
+            "mood_score": snapshot.mood_score,
+            "activity_id": snapshot.activity_id,
+            "topic": snapshot.topic,
+            "reading_level": snapshot.reading_level,
+        })
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _order(self) -> np.ndarray:
+        """Row positions from oldest to newest."""
+        start = (self._next - self._size) % self.capacity
+        return (start + np.arange(self._size)) % self.capacity
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in self._order():
+            wpm, mood = float(self._wpm[i]), float(self._mood[i])
+            row = {
+                "timestamp": datetime.fromtimestamp(self._timestamps[i], tz=timezone.utc),
+                "wpm": None if math.isnan(wpm) else int(wpm),
+                "mood_score": None if math.isnan(mood) else round(mood, 4),
+            }
+            for column, code in zip(_TEXT_COLUMNS, self._codes[i]):
+                row[column] = None if code == _NONE else self._strings[code]
+            yield row
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        order = self._order()
+        return {
+            "strings": self._strings,
+            "timestamps": _pack(self._timestamps[order]),
+            "wpm": _pack(self._wpm[order]),
+            "mood": _pack(self._mood[order]),
+            "codes": _pack(self._codes[order]),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SnapshotRing":
+        # Keep the newest rows that fit the configured capacity
+        ring = cls()
+        timestamps = _unpack(data["timestamps"], np.float64)
+        size = min(len(timestamps), ring.capacity)
+        keep = slice(len(timestamps) - size, None)
+        ring._timestamps[:size] = timestamps[keep]
+        ring._wpm[:size] = _unpack(data["wpm"], np.float32)[keep]
+        ring._mood[:size] = _unpack(data["mood"], np.float32)[keep]
+        ring._codes[:size] = _unpack(data["codes"], np.uint16).reshape(-1, len(_TEXT_COLUMNS))[keep]
+        ring._strings = list(data["strings"])
+        ring._string_codes = {value: code for code, value in enumerate(ring._strings)}
+        ring._size = size
+        ring._next = size % ring.capacity
+        return ring
+
+    @classmethod
+    def _validate(cls, value: Any) -> "SnapshotRing":
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            return cls.from_dict(value)
+        if isinstance(value, list):
+            # Profiles saved before the ring existed hold a plain list
+            ring = cls()
+            for row in value:
+                row = row if isinstance(row, dict) else row.model_dump()
+                if isinstance(row["timestamp"], str):
+                    row = {**row, "timestamp": datetime.fromisoformat(row["timestamp"])}
+                ring._append_row(row)
+            return ring
+        raise ValueError("expected a snapshot ring")
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(lambda ring: ring.to_dict()),
+        )
+
+
+def _pack(values: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(values).tobytes()).decode("ascii")
+
+
+def _unpack(data: str, dtype: Any) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=dtype)
@@ -0,0 +1,110 @@
+"""Per-session read-ahead queue for generated reading passages.
+
+The learning-session page asks for a new story every time it loads, and
+generating one takes several seconds. ``StoryPrefetcher`` keeps the next few
+stories for each session already generated in background tasks so the
+request can be answered from memory.
+"""
+
+import asyncio
+import os
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+DEFAULT_DEPTH = int(os.getenv("STORY_PREFETCH_DEPTH", "2"))
+DEFAULT_MAX_SESSIONS = int(os.getenv("STORY_PREFETCH_SESSIONS", "1000"))
+
+StoryFactory = Callable[[str, str, int], Awaitable[dict]]
+
+
+class _SessionQueue:
+    def __init__(self, topic: str, reading_level: str):
+        self.key = (topic, reading_level)
+        # (wpm used for generation, task producing the story)
+        self.pending: Deque[Tuple[int, asyncio.Task]] = deque()
+
+    def cancel(self) -> None:
+        for _, task in self.pending:
+            task.cancel()
+        self.pending.clear()
+
+
+class StoryPrefetcher:
+    """Keep ``depth`` stories generated ahead for every active session.
+
+    Queues are keyed by ``(topic, reading_level)``. The learner's WPM changes
+    after every reading but only affects ``target_wpm``, so a story generated
+    at an older WPM is rebased on hand-out instead of being thrown away. A
+    change of topic or reading level drops the queued stories and refills.
+    Queues for the ``max_sessions`` most recently used sessions are kept;
+    older ones, such as tabs closed without ending the session, are
+    dropped with their stories.
+    """
+
+    def __init__(
+        self,
+        generate: StoryFactory,
+        depth: int = DEFAULT_DEPTH,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+    ):
+        self._generate = generate
+        self.depth = depth
+        self.max_sessions = max_sessions
+        self._queues: "OrderedDict[str, _SessionQueue]" = OrderedDict()
+
+    def _queue_for(self, session_id: str, topic: str, reading_level: str) -> _SessionQueue:
+        queue = self._queues.get(session_id)
+        if queue is None or queue.key != (topic, reading_level):
+            if queue is not None:
+                queue.cancel()
+            queue = self._queues[session_id] = _SessionQueue(topic, reading_level)
+        self._queues.move_to_end(session_id)
+        while len(self._queues) > self.max_sessions:
+            _, oldest = self._queues.popitem(last=False)
+            oldest.cancel()
+        return queue
+
+    def _fill(self, queue: _SessionQueue, current_wpm: int) -> None:
+        topic, reading_level = queue.key
+        while len(queue.pending) < self.depth:
+            task = asyncio.create_task(self._generate(topic, reading_level, current_wpm))
+            queue.pending.append((current_wpm, task))
+
+    def prime(self, session_id: str, topic: str, reading_level: str, current_wpm: int) -> None:
+        """Start generating stories for a session before anyone asks."""
+        self._fill(self._queue_for(session_id, topic, reading_level), current_wpm)
+
+    # Refilling after a reading-level change is the same operation as priming.
+    retarget = prime
+
+    async def next(self, session_id: str, topic: str, reading_level: str, current_wpm: int) -> dict:
+        """Return the next story, waiting only if none has finished yet."""
+        queue = self._queue_for(session_id, topic, reading_level)
+        story: Optional[dict] = None
+        if queue.pending:
+            generated_wpm, task = queue.pending.popleft()
+            try:
+                story = dict(await task)
+                story["target_wpm"] += current_wpm - generated_wpm
+            except Exception as e:
+                print(f"⚠️ Prefetched story failed: {e}")
+        if story is None:
+            story = await self._generate(topic, reading_level, current_wpm)
+        if self._queues.get(session_id) is queue:  # not dropped while waiting
+            self._fill(queue, current_wpm)
+        return story
+
+    def ready_count(self, session_id: str) -> int:
+        queue = self._queues.get(session_id)
+        if queue is None:
+            return 0
+        return sum(1 for _, task in queue.pending if task.done())
+
+    def discard(self, session_id: str) -> None:
+        queue = self._queues.pop(session_id, None)
+        if queue is not None:
+            queue.cancel()
+
+    def clear(self) -> None:
+        for session_id in list(self._queues):
+            self.discard(session_id)
@@ -0,0 +1,370 @@
+"""Word-by-word alignment of a read-aloud transcription against its passage.
+
+Both texts are normalized to the same tokens first: lower case, no
+punctuation, contractions expanded ("don't" -> "do not") and numbers
+written one way ("twenty-one" and "21" -> "21", "third" and "3rd" ->
+"3rd"), so Whisper's spelling choices are not counted as misreadings.
+
+The tokens are aligned by edit distance restricted to a band of ``BAND``
+cells around a guide path through word trigrams that occur once in both
+texts. The guide follows the reader through skipped or repeated lines,
+and the cost is linear in the passage length. Each passage word comes
+back labelled ``correct``, ``substituted`` or ``omitted``, and extra
+spoken words ``inserted``.
+"""
+
+import os
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+# How far (in words) the alignment may stray from the anchor path
+BAND = int(os.getenv("ALIGNMENT_BAND", "10"))
+# Widest skip or repeat (in words) followed between two anchors
+MAX_JUMP = 200
+# Word n-grams used as anchors
+ANCHOR_GRAM = 3
+
+CORRECT, SUBSTITUTED, OMITTED, INSERTED = "correct", "substituted", "omitted", "inserted"
+
+_DIAG, _UP, _LEFT = 0, 1, 2
+# A substitution costs more than a gap but less than two, so a misread word
+# stays one substitution, while a shift that lines up more matches wins
+_SUBSTITUTION, _GAP = 3, 2
+_INF = float("inf")
+
+# Hesitations are neither read nor misread
+FILLERS = frozenset({"um", "umm", "uh", "uhh", "er", "erm", "hmm", "mm"})
+
+_PUNCT = "!\"#$%&()*+,./:;<=>?@[\\]^_`{|}~“”‘’«»…"
+_SPLIT = re.compile(r"[-–—/]+")
+# A word ending in one of these ends a spoken number
+_CLAUSE_END = frozenset(",.;:!?…")
+
+CONTRACTIONS = {
+    "can't": "can not", "cannot": "can not", "won't": "will not", "shan't": "shall not",
+    "ain't": "is not", "let's": "let us", "y'all": "you all",
+    "it's": "it is", "that's": "that is", "what's": "what is", "there's": "there is",
+    "here's": "here is", "he's": "he is", "she's": "she is", "where's": "where is",
+    "who's": "who is", "how's": "how is",
+}
+_SUFFIXES = (("n't", " not"), ("'re", " are"), ("'ve", " have"), ("'ll", " will"), ("'m", " am"), ("'d", " would"))
+
+_UNITS = {
+    word: n for n, word in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve thirteen "
+        "fourteen fifteen sixteen seventeen eighteen nineteen".split()
+    )
+}
+_TENS = {word: 10 * n for n, word in enumerate("twenty thirty forty fifty sixty seventy eighty ninety".split(), 2)}
+_SCALES = {"thousand": 1000, "million": 1_000_000}
+_ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6, "seventh": 7,
+    "eighth": 8, "ninth": 9, "tenth": 10, "eleventh": 11, "twelfth": 12, "thirteenth": 13,
+    "twentieth": 20, "thirtieth": 30, "hundredth": 100,
+}
+_DIGITS = re.compile(r"^\d+(?:,\d{3})*(?:\.\d+)?$")
+_DIGIT_ORDINAL = re.compile(r"^(\d+)(?:st|nd|rd|th)$")
+
+
+def _ordinal(n: int) -> str:
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+@lru_cache(maxsize=65536)
+def _pieces(word: str) -> Tuple[str, ...]:
+    """Lower-case, punctuation-free pieces of one word, contractions expanded."""
+    word = word.lower().replace("’", "'").replace("‘", "'")
+    pieces = []
+    for part in _SPLIT.split(word):
+        part = part.strip(_PUNCT).strip("'")
+        if part in CONTRACTIONS:
+            pieces.extend(CONTRACTIONS[part].split())
+            continue
+        for suffix, expansion in _SUFFIXES:
+            if part.endswith(suffix) and len(part) > len(suffix):
+                part = part[: -len(suffix)] + expansion
+                break
+        pieces.extend(p for p in part.replace("'", "").split() if p)
+    return tuple(pieces)
+
+
+def _number(raw: List[Tuple[str, int, bool]], k: int) -> Tuple[int, int]:
+    """Read the spoken number starting at ``raw[k]``; return ``(end, value)``.
+
+    Only words that make one number are joined: a tens word and a unit
+    ("twenty one"), a unit and "hundred" ("five hundred"), a scale word
+    ("two thousand"), and "and" after a hundred or a scale ("one hundred
+    and five"). Counting ("one two three") gives one number per word, and
+    a word ending in punctuation ends the number. ``end == k`` means
+    ``raw[k]`` is not a number word.
+    """
+    total, hundreds, below, scale = 0, 0, 0, _INF
+    has_tens = has_unit = False
+    end = k
+    while end < len(raw):
+        word, _, closed = raw[end]
+        started = end > k
+        if word in _UNITS:
+            unit = _UNITS[word]
+            if has_unit or (has_tens and not 1 <= unit <= 9) or (started and unit == 0):
+                break
+            below += unit
+            has_unit = True
+        elif word in _TENS:
+            if has_tens or has_unit:
+                break
+            below += _TENS[word]
+            has_tens = True
+        elif word == "hundred":
+            if hundreds or has_tens or (started and not has_unit):
+                break
+            hundreds, below, has_unit = max(below, 1) * 100, 0, False
+        elif word in _SCALES:
+            group = hundreds + below
+            if _SCALES[word] >= scale or (started and not group):
+                break
+            scale = _SCALES[word]
+            total += max(group, 1) * scale
+            hundreds, below, has_tens, has_unit = 0, 0, False, False
+        elif word == "and":
+            following = raw[end + 1][0] if end + 1 < len(raw) else ""
+            if (
+                not started or raw[end - 1][2] or has_tens or has_unit or not (hundreds or total)
+                or (following not in _UNITS and following not in _TENS)
+            ):
+                break
+        else:
+            break
+        end += 1
+        if closed or word == "zero":
+            break
+    return end, total + hundreds + below
+
+
+def tokenize(text: str, skip: frozenset = frozenset()) -> Tuple[List[str], List[str], List[Tuple[int, int]]]:
+    """Split ``text`` into words, normalized tokens and each token's word span.
+
+    Returns ``(words, tokens, spans)``; ``spans[k]`` is the half-open range
+    of ``words`` that token ``k`` came from. Pieces in ``skip`` are dropped.
+    """
+    words = text.split()
+    raw = []  # (piece, word index, whether punctuation follows the piece)
+    for i, word in enumerate(words):
+        pieces = [piece for piece in _pieces(word) if piece not in skip]
+        closed = word.rstrip("'\"’”)")[-1:] in _CLAUSE_END
+        raw.extend((piece, i, closed and n == len(pieces) - 1) for n, piece in enumerate(pieces))
+    tokens: List[str] = []
+    spans: List[Tuple[int, int]] = []
+    k = 0
+    while k < len(raw):
+        piece, owner, _ = raw[k]
+        end, value = _number(raw, k)
+        if end > k:
+            tokens.append(str(value))
+            spans.append((owner, raw[end - 1][1] + 1))
+            k = end
+            continue
+        if _DIGITS.match(piece):
+            piece = piece.replace(",", "")
+        elif piece in _ORDINALS:
+            piece = _ordinal(_ORDINALS[piece])
+        else:
+            match = _DIGIT_ORDINAL.match(piece)
+            if match:
+                piece = _ordinal(int(match.group(1)))
+        tokens.append(piece)
+        spans.append((owner, owner + 1))
+        k += 1
+    return words, tokens, spans
+
+
+def _anchors(expected: List[str], spoken: List[str], k: int = ANCHOR_GRAM) -> List[Tuple[int, int]]:
+    """Increasing ``(i, j)`` pairs where both texts share a unique k-gram.
+
+    Pairs are taken from k-grams that occur exactly once in each text, then
+    cut down to the longest chain increasing in both (patience sorting).
+    """
+    def unique(tokens: List[str]) -> Dict[Tuple[str, ...], int]:
+        seen: Dict[Tuple[str, ...], int] = {}
+        for i in range(len(tokens) - k + 1):
+            gram = tuple(tokens[i:i + k])
+            seen[gram] = -1 if gram in seen else i
+        return seen
+
+    in_spoken = unique(spoken)
+    pairs = [(i, in_spoken.get(gram, -1)) for gram, i in unique(expected).items() if i >= 0]
+    pairs = sorted((i, j) for i, j in pairs if j >= 0)
+
+    tails: List[int] = []  # tails[l]: pair ending the best chain of length l + 1
+    tail_js: List[int] = []
+    parents: List[int] = []
+    for index, (_, j) in enumerate(pairs):
+        length = bisect_left(tail_js, j)
+        parents.append(tails[length - 1] if length else -1)
+        if length == len(tails):
+            tails.append(index)
+            tail_js.append(j)
+        else:
+            tails[length], tail_js[length] = index, j
+    chain = []
+    index = tails[-1] if tails else -1
+    while index >= 0:
+        chain.append(pairs[index])
+        index = parents[index]
+    return chain[::-1]
+
+
+def align_tokens(expected: List[str], spoken: List[str], band: int = BAND) -> List[Tuple[int, int, int]]:
+    """Banded edit-distance alignment of two token lists.
+
+    Returns ``(move, i, j)`` steps in order: ``_DIAG`` pairs ``expected[i]``
+    with ``spoken[j]``, ``_UP`` omits ``expected[i]`` and ``_LEFT`` inserts
+    ``spoken[j]``.
+
+    Between two anchors (shared unique word trigrams) the reader either
+    went straight on or jumped once: skipped ahead, or went back over a
+    line. Row ``i`` therefore covers the diagonal running on from the
+    anchor before it, the diagonal leading into the anchor after it, and
+    everything in between, plus ``band`` cells either side. Rows hold
+    ``2 * band + 1`` cells where the reading is clean and at most
+    ``MAX_JUMP`` more, so the cost stays linear.
+    """
+    n, m = len(expected), len(spoken)
+    guide = [(0, 0)] + [(i + 1, j + 1) for i, j in _anchors(expected, spoken)] + [(n, m)]
+    spans = []
+    for (i0, j0), (i1, j1) in zip(guide, guide[1:]):
+        last = i1 == n
+        for i in range(i0, i1 + last):
+            ahead, behind = j0 + (i - i0), j1 - (i1 - i)
+            spans.append((max(0, min(ahead, behind)), min(m, max(ahead, behind))))
+
+    def window(i: int, prev_lo: int, prev_hi: int) -> Tuple[int, int]:
+        # Stay connected to the previous row; the last row ends at m
+        low, high = spans[i]
+        lo = max(prev_lo, min(low - band, prev_hi))
+        if i == n:
+            return lo, m
+        return lo, max(lo, min(m, high + band, lo + 2 * band + MAX_JUMP))
+
+    lo, hi = window(0, 0, 0)
+    costs = [j * _GAP for j in range(hi + 1)]
+    rows = [(0, [_LEFT] * (hi + 1))]
+    for i in range(1, n + 1):
+        prev_lo, prev = lo, costs
+        prev_hi = prev_lo + len(prev) - 1
+        lo, hi = window(i, prev_lo, prev_hi)
+        word = expected[i - 1]
+        # pad[k] is the previous row's cost at column prev_lo + k - 1
+        pad = [_INF] + prev + [_INF] * (hi - prev_hi + 1)
+        said = spoken[lo - 1:hi] if lo else [None] + spoken[:hi]
+        costs, moves = [], []
+        left = _INF
+        for diag, up, token in zip(pad[lo - prev_lo:], pad[lo - prev_lo + 1:], said):
+            if token != word:
+                diag += _SUBSTITUTION
+            up += _GAP
+            left += _GAP
+            if diag <= up and diag <= left:
+                left = diag
+                moves.append(_DIAG)
+            elif up <= left:
+                left = up
+                moves.append(_UP)
+            else:
+                moves.append(_LEFT)
+            costs.append(left)
+        rows.append((lo, moves))
+
+    steps = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        row_lo, moves = rows[i]
+        move = moves[j - row_lo] if i > 0 else _LEFT
+        if move == _DIAG:
+            i, j = i - 1, j - 1
+            steps.append((_DIAG, i, j))
+        elif move == _UP:
+            i -= 1
+            steps.append((_UP, i, j))
+        else:
+            j -= 1
+            steps.append((_LEFT, i, j))
+    steps.reverse()
+    return steps
+
+
+def align_reading(passage: str, transcription: str, band: int = BAND) -> Dict[str, Any]:
+    """Label each passage word and count the reader's errors.
+
+    ``words`` lists the passage words in order, each as ``{"expected",
+    "spoken", "label"}``, with inserted words (``expected`` is ``None``)
+    where they were spoken. ``similarity`` is ``2 * matches / total``
+    tokens, like ``difflib.SequenceMatcher.ratio``.
+    """
+    expected_words, expected, expected_spans = tokenize(passage)
+    spoken_words, spoken, spoken_spans = tokenize(transcription, FILLERS)
+    steps = align_tokens(expected, spoken, band)
+
+    # Each passage word collects flags from its tokens' steps: 1 read
+    # correctly, 2 misread, 4 skipped; order holds passage word indexes
+    # and [start, end) spans of inserted spoken words, in reading order
+    flags: Dict[int, int] = {}
+    said: Dict[int, List[int]] = {}
+    order: List[Any] = []
+    matches = 0
+    for move, i, j in steps:
+        if move == _LEFT:
+            start, end = spoken_spans[j]
+            if order and isinstance(order[-1], list) and order[-1][1] > start:
+                order[-1][1] = max(order[-1][1], end)
+            else:
+                order.append([start, end])
+            continue
+        if move == _DIAG:
+            flag = 1 if expected[i] == spoken[j] else 2
+            matches += flag == 1
+        else:
+            flag = 4
+        for w in range(*expected_spans[i]):
+            if w not in flags:
+                flags[w] = 0
+                order.append(w)
+            flags[w] |= flag
+            if move == _DIAG:
+                start, end = spoken_spans[j]
+                span = said.setdefault(w, [start, end])
+                span[0], span[1] = min(span[0], start), max(span[1], end)
+
+    def said_text(start: int, end: int) -> str:
+        return " ".join(word.strip(_PUNCT + "'") for word in spoken_words[start:end])
+
+    counts = {CORRECT: 0, SUBSTITUTED: 0, OMITTED: 0, INSERTED: 0}
+    words = []
+    for item in order:
+        if isinstance(item, list):
+            entry = {"expected": None, "spoken": said_text(*item), "label": INSERTED}
+        else:
+            label = {1: CORRECT, 4: OMITTED}.get(flags[item], SUBSTITUTED)
+            span = said.get(item)
+            entry = {
+                "expected": expected_words[item].strip(_PUNCT + "'"),
+                "spoken": said_text(*span) if span else None,
+                "label": label,
+            }
+        counts[entry["label"]] += 1
+        words.append(entry)
+
+    total = len(flags)
+    return {
+        "words": words,
+        "words_correct": counts[CORRECT],
+        "words_total": total,
+        "accuracy": counts[CORRECT] / total if total else 0.0,
+        "similarity": 2 * matches / (len(expected) + len(spoken)) if expected or spoken else 0.0,
+        "substituted": counts[SUBSTITUTED],
+        "omitted": counts[OMITTED],
+        "inserted": counts[INSERTED],
+    }